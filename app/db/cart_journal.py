@@ -0,0 +1,150 @@
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+from app.models.cart_item import CartItem
+from app.models.money import Money
+
+
+class CartJournal:
+    """
+    append-only file of the changes to the open cart, one JSON object per line
+    replaying it after a crash restores the cart items, a torn last line is ignored
+    """
+
+    def __init__(self, path: str, fsync: bool = False) -> None:
+        self.path = path
+        self.__fsync = fsync
+        self.__file: Optional[TextIO] = None
+
+    def add(self, cart_item: CartItem) -> bool:
+        return self.__append(
+            {
+                "op": "add",
+                "id": cart_item.id,
+                "article_id": cart_item.article_id,
+                "article_name": cart_item.article_name,
+                "unit_price": int(cart_item.unit_price),
+                "quantity": cart_item.quantity,
+            }
+        )
+
+    def quantity(self, cart_item_id: int, quantity: int) -> bool:
+        return self.__append(
+            {"op": "quantity", "id": cart_item_id, "quantity": quantity}
+        )
+
+    def remove(self, cart_item_id: int) -> bool:
+        return self.__append({"op": "remove", "id": cart_item_id})
+
+    def checkout(self, token: str) -> bool:
+        """
+        records the checkout token before the cart is stored, see checkout_token
+        """
+        return self.__append({"op": "checkout", "token": token})
+
+    def clear(self) -> None:
+        """
+        empties the journal, used when the cart is checked out or aborted
+        """
+        try:
+            file = self.__open()
+            file.truncate(0)
+            self.__sync(file)
+        except OSError as e:
+            print("Journal Error: ", e)
+
+    def replay(self) -> List[CartItem]:
+        """
+        returns the cart items recorded in the journal, in the order they were added
+        """
+        items: Dict[int, CartItem] = {}
+        for entry in self.__entries():
+            self.__apply(items, entry)
+        return list(items.values())
+
+    def checkout_token(self) -> Optional[str]:
+        """
+        token of the last checkout recorded in the journal, None if the cart was never checked out
+        a lane that crashed after storing the cart finds a cart with this token in the database
+        """
+        token = None
+        for entry in self.__entries():
+            if entry.get("op") == "checkout":
+                token = entry["token"]
+        return token
+
+    def close(self) -> None:
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __entries(self) -> Iterator[Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                for line in file:
+                    # the lane stopped in the middle of a write
+                    if not line.endswith("\n"):
+                        return
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        return
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print("Journal Error: ", e)
+            return
+
+    def __apply(self, items: Dict[int, CartItem], entry: Dict[str, Any]) -> None:
+        match entry.get("op"):
+            case "add":
+                items[entry["id"]] = CartItem(
+                    id=entry["id"],
+                    cart_id=0,
+                    article_id=entry["article_id"],
+                    article_name=entry["article_name"],
+                    unit_price=Money(entry["unit_price"]),
+                    quantity=entry["quantity"],
+                )
+            case "quantity":
+                if entry["id"] in items:
+                    items[entry["id"]].quantity = entry["quantity"]
+            case "remove":
+                items.pop(entry["id"], None)
+
+    def __append(self, entry: Dict[str, Any]) -> bool:
+        """
+        returns False if the entry could not be written, the change must not be made then
+        """
+        try:
+            file = self.__open()
+            file.write(json.dumps(entry) + "\n")
+            self.__sync(file)
+            return True
+        except OSError as e:
+            print("Journal Error: ", e)
+            return False
+
+    def __open(self) -> TextIO:
+        if self.__file is None:
+            self.__drop_torn_tail()
+            self.__file = open(self.path, "a", encoding="utf-8")
+        return self.__file
+
+    def __drop_torn_tail(self) -> None:
+        """
+        cuts off an incomplete last line, so new lines do not get glued to it
+        """
+        try:
+            with open(self.path, "r+b") as file:
+                data = file.read()
+                if data and not data.endswith(b"\n"):
+                    file.truncate(data.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    def __sync(self, file: TextIO) -> None:
+        # flushed lines survive a crash of the lane, fsynced lines a power loss
+        file.flush()
+        if self.__fsync:
+            os.fsync(file.fileno())
@@ -1,121 +1,319 @@
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Iterator, List, Optional, Set
+
+from app.db.db_config import DBConfig
+from app.db.migrations import migrate
+
+
+class Rollback(Exception):
+    """
+    raise inside DB.transaction() to undo that unit of work without an error
+    """
+
+
+class TracedCursor(sqlite3.Cursor):
+    """
+    tells its TracedConnection when a statement is started
+    """
+
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        self.connection.start_statement()
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> sqlite3.Cursor:
+        self.connection.start_statement()
+        return super().executemany(sql, seq_of_parameters)
+
+
+class TracedConnection(sqlite3.Connection):
+    """
+    SQLite reports every trigger program of a statement to the trace callback again,
+    with the SQL of that statement
+    a report with the SQL of the running statement is only passed on if a new statement was
+    started in between, so a write repeated in a loop is still counted every time
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.__callback: Optional[Callable[[str], None]] = None
+        self.__last_sql: Optional[str] = None
+        self.__started = False
+
+    def cursor(self, factory: Any = TracedCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def start_statement(self) -> None:
+        self.__started = True
+
+    def trace_statements(self, callback: Optional[Callable[[str], None]]) -> None:
+        self.__callback = callback
+        self.__last_sql = None
+        self.set_trace_callback(self.__trace if callback is not None else None)
+
+    def __trace(self, sql: str) -> None:
+        if not self.__started and sql == self.__last_sql:
+            return
+        self.__started = False
+        self.__last_sql = sql
+        callback = self.__callback
+        if callback is not None:
+            callback(sql)
 
 
 class DB:
-    def __init__(self, db_name: str = "cashier.db") -> None:
-        self.__db_name = db_name
+    def __init__(
+        self, db_name: Optional[str] = None, config: Optional[DBConfig] = None
+    ) -> None:
+        self.config = config if config is not None else DBConfig()
+        self.__db_name = db_name if db_name is not None else self.config.path
+        self.__in_memory = self.__db_name == ":memory:"
+
+        # one writer connection shared by all repos, guarded by a re-entrant lock
+        self.__write_lock = threading.RLock()
+        self.__write_depth = 0
+        self.__write_owner: Optional[int] = None
+
+        # group commit keeps the transaction open until the timer flushes it
+        self.__pending = False
+        self.__flush_timer: Optional[threading.Timer] = None
+
+        # bounded pool of read-only connections, opened lazily
+        self.__readers: queue.LifoQueue[TracedConnection] = queue.LifoQueue()
+        self.__open_readers: List[TracedConnection] = []
+        self.__busy_readers: Set[sqlite3.Connection] = set()
+        self.__readers_lock = threading.Lock()
 
-        self.conn = sqlite3.connect(self.__db_name)
+        # statements that gave up waiting for a lock held by another connection
+        self.__busy_errors = 0
+        self.__busy_lock = threading.Lock()
+
+        # called with the SQL of every statement, see set_trace
+        self.__trace: Optional[Callable[[str], None]] = None
+
+        self.conn = self.__open(self.__db_name)
+
+        # readers never block the writer and the writer never blocks readers
+        if not self.__in_memory:
+            self.conn.execute("PRAGMA journal_mode = WAL")
+
+        self.__init_schema()
+
+    def __open(self, database: str, uri: bool = False) -> TracedConnection:
+        conn = sqlite3.connect(
+            database,
+            timeout=self.config.busy_timeout / 1000,
+            check_same_thread=False,
+            uri=uri,
+            factory=TracedConnection,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.config.busy_timeout)}")
+        conn.execute(f"PRAGMA synchronous = {self.config.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {int(self.config.cache_size)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.config.mmap_size)}")
+        conn.execute(f"PRAGMA temp_store = {self.config.temp_store}")
 
         # enforce foreign keys for this connection
-        self.conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA foreign_keys = ON")
 
         # get kw for fetchone and fetchall instead of index
-        self.conn.row_factory = sqlite3.Row
+        conn.row_factory = sqlite3.Row
+        conn.trace_statements(self.__trace)
+        return conn
 
-        self.__init_schema()
+    def __open_reader(self) -> TracedConnection:
+        uri = Path(self.__db_name).resolve().as_uri() + "?mode=ro"
+        return self.__open(uri, uri=True)
 
     def __init_schema(self) -> None:
-        cur = self.conn.cursor()
-
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS categories (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS articles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            price FLOAT NOT NULL,
-            category_id INTEGER NOT NULL,
-            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
-        )
-        """)
-
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS carts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            paid BOOL NOT NULL DEFAULT FALSE,
-            paid_at TEXT,
-            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS m2m_carts_articles (
-            id INTEGER PRIMARY KEY NOT NULL,
-            article_id INTERGER NOT NULL,
-            cart_id INTEGER NOT NULL,
-            quantity INTEGER NOT NULL,
-            unit_price float NOT NULL,
-            article_name TEXT NOT NULL,
-            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(article_id) REFERENCES articles(id) ON DELETE CASCADE,
-            FOREIGN KEY(cart_id) REFERENCES carts(id) ON DELETE CASCADE,
-            UNIQUE(article_id, cart_id)
-        )
-        """)
-
-        cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS categories_updated_at
-        AFTER UPDATE ON categories
-        FOR EACH ROW
-        WHEN NEW.updated_at = OLD.updated_at
-        BEGIN
-            UPDATE categories
-            SET updated_at = CURRENT_TIMESTAMP
-            WHERE id = OLD.id;
-        END;
-        """)
-
-        cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS articles_updated_at
-        AFTER UPDATE ON articles
-        FOR EACH ROW
-        WHEN NEW.updated_at = OLD.updated_at
-        BEGIN
-            UPDATE articles
-            SET updated_at = CURRENT_TIMESTAMP
-            WHERE id = OLD.id;
-        END;
-        """)
-
-        cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS carts_updated_at
-        AFTER UPDATE ON carts
-        FOR EACH ROW
-        WHEN NEW.updated_at = OLD.updated_at
-        BEGIN
-            UPDATE carts
-            SET updated_at = CURRENT_TIMESTAMP
-            WHERE id = OLD.id;
-        END;
-        """)
-
-        cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS m2m_carts_articles_updated_at
-        AFTER UPDATE ON m2m_carts_articles
-        FOR EACH ROW
-        WHEN NEW.updated_at = OLD.updated_at
-        BEGIN
-            UPDATE m2m_carts_articles
-            SET updated_at = CURRENT_TIMESTAMP
-            WHERE id = OLD.id;
-        END;
-        """)
-        self.conn.commit()
+        # no DDL at all when the schema version is already current
+        migrate(self.conn)
 
     def connect(self) -> sqlite3.Connection:
         return self.conn
 
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        unit of work on the writer connection, the outermost block commits or rolls back
+        nested blocks are savepoints, an exception only undoes the innermost block it leaves
+        """
+        with self.__write_lock:
+            depth = self.__write_depth
+            self.__write_depth += 1
+            if depth == 0:
+                self.__write_owner = threading.get_ident()
+            try:
+                # group commit may have left the transaction of earlier units open
+                savepoint = None
+                if self.conn.in_transaction:
+                    savepoint = f"unit_{depth}"
+                    self.conn.execute(f"SAVEPOINT {savepoint}")
+                else:
+                    with self.__counting_busy():
+                        self.conn.execute("BEGIN IMMEDIATE")
+
+                try:
+                    yield self.conn
+                except BaseException as e:
+                    if savepoint is None:
+                        self.conn.rollback()
+                    else:
+                        self.conn.execute(f"ROLLBACK TO {savepoint}")
+                        self.conn.execute(f"RELEASE {savepoint}")
+                    if isinstance(e, Rollback):
+                        return
+                    raise
+
+                if savepoint is not None:
+                    self.conn.execute(f"RELEASE {savepoint}")
+                if depth == 0:
+                    self.__commit()
+            finally:
+                self.__write_depth -= 1
+                if depth == 0:
+                    self.__write_owner = None
+
+    def write(self) -> ContextManager[sqlite3.Connection]:
+        """
+        the transaction a repo method runs in, joins the unit of work of the caller
+        """
+        return self.transaction()
+
+    def flush(self) -> None:
+        """
+        commits the units of work held back by group commit
+        """
+        with self.__write_lock:
+            if self.__write_depth > 0:
+                # the outermost unit commits or schedules the flush again
+                return
+            if self.__flush_timer is not None:
+                self.__flush_timer.cancel()
+                self.__flush_timer = None
+            if self.conn.in_transaction:
+                with self.__counting_busy():
+                    self.conn.commit()
+            self.__pending = False
+
+    def __commit(self) -> None:
+        if self.config.group_commit_ms <= 0:
+            with self.__counting_busy():
+                self.conn.commit()
+            return
+
+        self.__pending = True
+        if self.__flush_timer is None:
+            self.__flush_timer = threading.Timer(
+                self.config.group_commit_ms / 1000, self.flush
+            )
+            self.__flush_timer.daemon = True
+            self.__flush_timer.start()
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """
+        yields a read-only connection from the pool and returns it afterwards
+        in-memory databases can not be shared, so reads go through the writer,
+        as do reads inside a transaction or while group commit holds back changes
+        """
+        if (
+            self.__in_memory
+            or self.__pending
+            or self.__write_owner == threading.get_ident()
+        ):
+            with self.__write_lock:
+                self.__busy_readers.add(self.conn)
+                try:
+                    with self.__counting_busy():
+                        yield self.conn
+                finally:
+                    self.__busy_readers.discard(self.conn)
+            return
+
+        conn = self.__checkout_reader()
+        self.__busy_readers.add(conn)
+        try:
+            with self.__counting_busy():
+                yield conn
+        finally:
+            self.__busy_readers.discard(conn)
+            self.__readers.put(conn)
+
+    @property
+    def path(self) -> Optional[str]:
+        """
+        database file, None for an in-memory database
+        """
+        return None if self.__in_memory else self.__db_name
+
+    @property
+    def busy_errors(self) -> int:
+        """
+        number of lock waits that ran out of busy_timeout, a measure of contention between lanes
+        """
+        return self.__busy_errors
+
+    @contextmanager
+    def __counting_busy(self) -> Iterator[None]:
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            if e.sqlite_errorname.startswith(("SQLITE_BUSY", "SQLITE_LOCKED")):
+                with self.__busy_lock:
+                    self.__busy_errors += 1
+            raise
+
+    @property
+    def trace(self) -> Optional[Callable[[str], None]]:
+        return self.__trace
+
+    def set_trace(self, callback: Optional[Callable[[str], None]]) -> None:
+        """
+        calls callback with the SQL of every statement on the writer and all readers, None stops it
+        readers opened later get the callback as well
+        """
+        self.__trace = callback
+        with self.__readers_lock:
+            for conn in [self.conn, *self.__open_readers]:
+                conn.trace_statements(callback)
+
+    def interrupt_reads(self) -> None:
+        """
+        aborts the statements of all connections currently checked out by read()
+        the interrupted statement raises sqlite3.OperationalError in its thread
+        """
+        for conn in list(self.__busy_readers):
+            conn.interrupt()
+
+    def __checkout_reader(self) -> TracedConnection:
+        try:
+            return self.__readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self.__readers_lock:
+            if len(self.__open_readers) < self.config.readers:
+                conn = self.__open_reader()
+                self.__open_readers.append(conn)
+                return conn
+
+        # pool exhausted, wait for another reader to be returned
+        return self.__readers.get(timeout=self.config.busy_timeout / 1000)
+
     def close(self) -> None:
+        self.flush()
+        with self.__readers_lock:
+            for reader in self.__open_readers:
+                reader.close()
+            self.__open_readers = []
         self.conn.close()
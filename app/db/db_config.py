@@ -0,0 +1,53 @@
+import os
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True)
+class DBConfig:
+    """
+    connection settings and PRAGMA profile used by DB
+    """
+
+    path: str = "cashier.db"
+    # number of read-only connections kept in the pool
+    readers: int = 4
+    # milliseconds a connection waits for a lock before raising "database is locked"
+    busy_timeout: int = 5000
+    synchronous: str = "NORMAL"
+    # negative values are KiB, positive values are pages
+    cache_size: int = -16000
+    mmap_size: int = 0
+    temp_store: str = "MEMORY"
+    # commits of units of work finishing within this window are batched, 0 commits each one
+    group_commit_ms: int = 0
+
+    @classmethod
+    def profile(cls, name: str, path: str = "cashier.db") -> "DBConfig":
+        """
+        returns the config of a named PRAGMA profile for the given database path
+        """
+        if name not in PROFILES:
+            raise ValueError(f"Unknown DB profile {name}")
+        return replace(PROFILES[name], path=path)
+
+    @classmethod
+    def from_env(cls) -> "DBConfig":
+        """
+        reads CASHIER_DB_PATH and CASHIER_DB_PROFILE, falls back to the default profile
+        """
+        return cls.profile(
+            os.environ.get("CASHIER_DB_PROFILE", "default"),
+            os.environ.get("CASHIER_DB_PATH", "cashier.db"),
+        )
+
+
+PROFILES = {
+    # WAL + NORMAL only loses the last commits on power loss, never corrupts
+    "default": DBConfig(),
+    # fsync on every commit, for lanes without a UPS
+    "durable": DBConfig(synchronous="FULL"),
+    # large page cache and memory mapped reads for big multi-year databases
+    "fast": DBConfig(cache_size=-65536, mmap_size=268435456),
+    # one fsync for a burst of scans, a crash loses at most the last few milliseconds
+    "batched": DBConfig(group_commit_ms=5),
+}
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.db.db import DB
+
+T = TypeVar("T")
+
+
+class DBExecutor:
+    """
+    runs repo and service calls on one dedicated thread, so the event loop never waits for SQLite
+    calls are executed in submission order, a running call can be interrupted by its tag
+    """
+
+    def __init__(self, db: DB) -> None:
+        self.__db = db
+        self.__pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+        self.__lock = threading.Lock()
+        self.__running_tag: Optional[str] = None
+        self.__pending = 0
+
+    async def run(
+        self, fn: Callable[..., T], *args: Any, tag: Optional[str] = None
+    ) -> T:
+        with self.__lock:
+            self.__pending += 1
+        future = self.__pool.submit(self.__call, tag, fn, args)
+        # also called for a call cancelled before it started, which never runs __call
+        future.add_done_callback(self.__done)
+        return await asyncio.wrap_future(future)
+
+    @property
+    def pending(self) -> int:
+        """
+        calls submitted and not finished yet, the running one included
+        """
+        return self.__pending
+
+    def interrupt(self, tag: str) -> None:
+        """
+        interrupts the reads of the running call if it was submitted with tag
+        """
+        with self.__lock:
+            if self.__running_tag == tag:
+                self.__db.interrupt_reads()
+
+    def shutdown(self) -> None:
+        self.__pool.shutdown(wait=True, cancel_futures=True)
+
+    def __call(self, tag: Optional[str], fn: Callable[..., T], args: tuple) -> T:
+        with self.__lock:
+            self.__running_tag = tag
+        try:
+            return fn(*args)
+        finally:
+            # the lock makes sure an interrupt never hits the next call
+            with self.__lock:
+                self.__running_tag = None
+
+    def __done(self, future: Future) -> None:
+        with self.__lock:
+            self.__pending -= 1
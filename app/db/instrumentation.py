@@ -0,0 +1,195 @@
+import bisect
+import functools
+import json
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, TypeVar
+
+from app.models.operation_stats import LATENCY_BUCKETS_US, OperationStats
+
+T = TypeVar("T")
+
+# string and number literals, digits inside names like sp1 are kept
+# a parameter bound to None shows up as NULL, IS NULL and IS NOT NULL are kept
+LITERALS = re.compile(
+    r"'(?:[^']|'')*'|(?<![\w.])\d+(?:\.\d+)?|(?<!IS\s)(?<!NOT\s)\bNULL\b",
+    re.IGNORECASE,
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_sql(sql: str) -> str:
+    """
+    statement template without literals, the trace gets the SQL with its parameters filled in
+    """
+    return " ".join(LITERALS.sub("?", sql).split())
+
+
+def count_rows(result: Any) -> int:
+    """
+    rows a repo or service method returned, a model or a scalar counts as one
+    """
+    if result is None or isinstance(result, bool):
+        return 0
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    items = getattr(result, "items", None)
+    if isinstance(items, list):
+        return len(items)
+    return 1
+
+
+@dataclass(slots=True)
+class OperationTrace:
+    """
+    statements of one running operation, in the order they were executed
+    """
+
+    name: str
+    templates: List[str] = field(default_factory=list)
+    rows: int = 0
+
+
+class Instrumentation:
+    """
+    statement counts, latency histograms and returned rows per logical operation
+    DB.set_trace feeds the statements, instrument() wraps the operations
+    an operation counts the statements of the operations nested in it as well
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__operations: Dict[str, OperationStats] = {}
+        self.__statements: Counter[str] = Counter()
+        # running operations of the current thread, innermost last
+        self.__local = threading.local()
+
+    def trace(self, sql: str) -> None:
+        """
+        trace callback of the connections, called before every statement
+        DB reports a statement once, not again for each of its trigger programs
+        """
+        template = normalize_sql(sql)
+        with self.__lock:
+            self.__statements[template] += 1
+        for operation in getattr(self.__local, "operations", ()):
+            operation.templates.append(template)
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[OperationTrace]:
+        trace, start = self.__begin(name)
+        failed = True
+        try:
+            yield trace
+            failed = False
+        finally:
+            self.__end(trace, start, failed)
+
+    def wrap(self, name: str, fn: Callable[..., T]) -> Callable[..., T]:
+        # the same as operation(), without a generator on every call
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            trace, start = self.__begin(name)
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                trace.rows = count_rows(result)
+                failed = False
+                return result
+            finally:
+                self.__end(trace, start, failed)
+
+        return wrapper
+
+    def operations(self) -> Dict[str, OperationStats]:
+        with self.__lock:
+            return {
+                name: replace(stats, histogram=list(stats.histogram))
+                for name, stats in self.__operations.items()
+            }
+
+    def statements(self) -> Dict[str, int]:
+        """
+        executions per statement template
+        """
+        with self.__lock:
+            return dict(self.__statements)
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__operations.clear()
+            self.__statements.clear()
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "latency_buckets_us": list(LATENCY_BUCKETS_US),
+                "operations": {
+                    name: {
+                        **asdict(stats),
+                        "mean_us": stats.mean_us,
+                        "p95_us": stats.percentile_us(0.95),
+                        "statements_per_call": stats.statements_per_call,
+                        "rows_per_call": stats.rows_per_call,
+                    }
+                    for name, stats in sorted(self.operations().items())
+                },
+                "statements": dict(
+                    sorted(self.statements().items(), key=lambda item: -item[1])
+                ),
+            },
+            indent=2,
+        )
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_json())
+
+    def __begin(self, name: str) -> Tuple[OperationTrace, int]:
+        operations = getattr(self.__local, "operations", None)
+        if operations is None:
+            operations = self.__local.operations = []
+        trace = OperationTrace(name)
+        operations.append(trace)
+        return trace, time.perf_counter_ns()
+
+    def __end(self, trace: OperationTrace, start: int, failed: bool) -> None:
+        elapsed_us = (time.perf_counter_ns() - start) / 1000
+        self.__local.operations.pop()
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_US, elapsed_us)
+        with self.__lock:
+            stats = self.__operations.get(trace.name)
+            if stats is None:
+                stats = self.__operations[trace.name] = OperationStats()
+            stats.calls += 1
+            stats.errors += failed
+            stats.statements += len(trace.templates)
+            stats.rows += trace.rows
+            stats.total_us += elapsed_us
+            if elapsed_us > stats.max_us:
+                stats.max_us = elapsed_us
+            stats.last_us = elapsed_us
+            stats.histogram[bucket] += 1
+
+
+def instrument(
+    target: T,
+    instrumentation: Instrumentation,
+    prefix: str,
+    exclude: Iterable[str] = (),
+) -> T:
+    """
+    replaces the public methods of a repo or service with timed ones named prefix.method
+    """
+    for name in dir(type(target)):
+        if name.startswith("_") or not callable(getattr(type(target), name)):
+            continue
+        if name in exclude:
+            continue
+        method = getattr(target, name)
+        setattr(target, name, instrumentation.wrap(f"{prefix}.{name}", method))
+    return target
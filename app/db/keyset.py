@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple, TypeVar
+
+from app.models.page import Cursor, Page
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """
+    sort order for keyset pagination, the id breaks ties so the order is stable
+    expression is the SQL to sort by (None sorts by id only),
+    attribute is the model field holding its value
+    """
+
+    expression: Optional[str] = None
+    attribute: Optional[str] = None
+
+    def order_by(self, descending: bool) -> str:
+        direction = "DESC" if descending else "ASC"
+        if self.expression is None:
+            return f"id {direction}"
+        return f"{self.expression} {direction}, id {direction}"
+
+    def after(self, cursor: Cursor, descending: bool) -> Tuple[str, List[Any]]:
+        """
+        condition and parameters for the rows that follow cursor
+        written without row values, so SQLite can seek the sort index
+        """
+        op = "<" if descending else ">"
+        if self.expression is None:
+            return f"id {op} ?", [cursor[0]]
+        value, id = cursor
+        return (
+            f"{self.expression} {op}= ? AND ({self.expression} {op} ? OR id {op} ?)",
+            [value, value, id],
+        )
+
+    def cursor(self, item: Any) -> Cursor:
+        if self.attribute is None:
+            return (item.id,)
+        return (getattr(item, self.attribute), item.id)
+
+    def page(self, rows: Sequence[T], limit: int) -> Page[T]:
+        """
+        builds a page from up to limit + 1 rows, the extra row only tells there is more
+        """
+        if len(rows) > limit:
+            items = list(rows[:limit])
+            return Page(items, self.cursor(items[-1]))
+        return Page(list(rows))
+
+
+BY_ID = SortKey()
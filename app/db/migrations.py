@@ -0,0 +1,657 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: Tuple[str, ...]
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        name="initial schema",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS categories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                price FLOAT NOT NULL,
+                category_id INTEGER NOT NULL,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS carts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                paid BOOL NOT NULL DEFAULT FALSE,
+                paid_at TEXT,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS m2m_carts_articles (
+                id INTEGER PRIMARY KEY NOT NULL,
+                article_id INTERGER NOT NULL,
+                cart_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL,
+                unit_price float NOT NULL,
+                article_name TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY(article_id) REFERENCES articles(id) ON DELETE CASCADE,
+                FOREIGN KEY(cart_id) REFERENCES carts(id) ON DELETE CASCADE,
+                UNIQUE(article_id, cart_id)
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS categories_updated_at
+            AFTER UPDATE ON categories
+            FOR EACH ROW
+            WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE categories
+                SET updated_at = CURRENT_TIMESTAMP
+                WHERE id = OLD.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS articles_updated_at
+            AFTER UPDATE ON articles
+            FOR EACH ROW
+            WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE articles
+                SET updated_at = CURRENT_TIMESTAMP
+                WHERE id = OLD.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS carts_updated_at
+            AFTER UPDATE ON carts
+            FOR EACH ROW
+            WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE carts
+                SET updated_at = CURRENT_TIMESTAMP
+                WHERE id = OLD.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS m2m_carts_articles_updated_at
+            AFTER UPDATE ON m2m_carts_articles
+            FOR EACH ROW
+            WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE m2m_carts_articles
+                SET updated_at = CURRENT_TIMESTAMP
+                WHERE id = OLD.id;
+            END
+            """,
+        ),
+    ),
+    Migration(
+        version=2,
+        name="hot path indexes",
+        statements=(
+            # ArticleRepo.get_all(category_id) and ON DELETE CASCADE from categories
+            "CREATE INDEX IF NOT EXISTS idx_articles_category_id ON articles(category_id)",
+            # LIKE is case insensitive, only a NOCASE index can serve prefix searches
+            "CREATE INDEX IF NOT EXISTS idx_articles_name ON articles(name COLLATE NOCASE)",
+            # CartItemRepo.get_all(cart), the UNIQUE index starts with article_id
+            "CREATE INDEX IF NOT EXISTS idx_m2m_carts_articles_cart_id ON m2m_carts_articles(cart_id)",
+            # paid carts listings, ordered by payment time
+            "CREATE INDEX IF NOT EXISTS idx_carts_paid_paid_at ON carts(paid, paid_at)",
+        ),
+    ),
+    Migration(
+        version=3,
+        name="article full text search",
+        statements=(
+            # external content table, the article rows are not stored twice
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                name,
+                content = 'articles',
+                content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '1 2 3'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert
+            AFTER INSERT ON articles
+            BEGIN
+                INSERT INTO articles_fts (rowid, name) VALUES (NEW.id, NEW.name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete
+            AFTER DELETE ON articles
+            BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, name)
+                VALUES ('delete', OLD.id, OLD.name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS articles_fts_update
+            AFTER UPDATE OF name ON articles
+            BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, name)
+                VALUES ('delete', OLD.id, OLD.name);
+                INSERT INTO articles_fts (rowid, name) VALUES (NEW.id, NEW.name);
+            END
+            """,
+            # index the articles that existed before this migration
+            "INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')",
+        ),
+    ),
+    Migration(
+        version=4,
+        name="prices in minor units",
+        statements=(
+            # the updated_at triggers would otherwise touch every converted row
+            "DROP TRIGGER IF EXISTS articles_updated_at",
+            "DROP TRIGGER IF EXISTS m2m_carts_articles_updated_at",
+            "ALTER TABLE articles ADD COLUMN price_minor INTEGER NOT NULL DEFAULT 0",
+            "UPDATE articles SET price_minor = CAST(ROUND(price * 100) AS INTEGER)",
+            "ALTER TABLE articles DROP COLUMN price",
+            "ALTER TABLE articles RENAME COLUMN price_minor TO price",
+            "ALTER TABLE m2m_carts_articles ADD COLUMN unit_price_minor INTEGER NOT NULL DEFAULT 0",
+            "UPDATE m2m_carts_articles SET unit_price_minor = CAST(ROUND(unit_price * 100) AS INTEGER)",
+            "ALTER TABLE m2m_carts_articles DROP COLUMN unit_price",
+            "ALTER TABLE m2m_carts_articles RENAME COLUMN unit_price_minor TO unit_price",
+            """
+            CREATE TRIGGER IF NOT EXISTS articles_updated_at
+            AFTER UPDATE ON articles
+            FOR EACH ROW
+            WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE articles
+                SET updated_at = CURRENT_TIMESTAMP
+                WHERE id = OLD.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS m2m_carts_articles_updated_at
+            AFTER UPDATE ON m2m_carts_articles
+            FOR EACH ROW
+            WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE m2m_carts_articles
+                SET updated_at = CURRENT_TIMESTAMP
+                WHERE id = OLD.id;
+            END
+            """,
+        ),
+    ),
+    Migration(
+        version=5,
+        name="epoch timestamps",
+        statements=(
+            "DROP TRIGGER IF EXISTS categories_updated_at",
+            "DROP TRIGGER IF EXISTS articles_updated_at",
+            "DROP TRIGGER IF EXISTS carts_updated_at",
+            "DROP TRIGGER IF EXISTS m2m_carts_articles_updated_at",
+            # CURRENT_TIMESTAMP values are UTC, paid_at was written in local time
+            """
+            CREATE TABLE categories_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                updated_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+            )
+            """,
+            """
+            INSERT INTO categories_new (id, name, created_at, updated_at)
+            SELECT
+                id,
+                name,
+                COALESCE(CAST(strftime('%s', created_at) AS INTEGER), 0),
+                COALESCE(CAST(strftime('%s', updated_at) AS INTEGER), 0)
+            FROM categories
+            """,
+            "DROP TABLE categories",
+            "ALTER TABLE categories_new RENAME TO categories",
+            """
+            CREATE TABLE articles_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                price INTEGER NOT NULL,
+                category_id INTEGER NOT NULL,
+                created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                updated_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+            )
+            """,
+            """
+            INSERT INTO articles_new (id, name, price, category_id, created_at, updated_at)
+            SELECT
+                id,
+                name,
+                price,
+                category_id,
+                COALESCE(CAST(strftime('%s', created_at) AS INTEGER), 0),
+                COALESCE(CAST(strftime('%s', updated_at) AS INTEGER), 0)
+            FROM articles
+            """,
+            "DROP TABLE articles",
+            "ALTER TABLE articles_new RENAME TO articles",
+            """
+            CREATE TABLE carts_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                paid BOOL NOT NULL DEFAULT FALSE,
+                paid_at INTEGER,
+                created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                updated_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+            )
+            """,
+            """
+            INSERT INTO carts_new (id, paid, paid_at, created_at, updated_at)
+            SELECT
+                id,
+                paid,
+                CAST(strftime('%s', paid_at, 'utc') AS INTEGER),
+                COALESCE(CAST(strftime('%s', created_at) AS INTEGER), 0),
+                COALESCE(CAST(strftime('%s', updated_at) AS INTEGER), 0)
+            FROM carts
+            """,
+            "DROP TABLE carts",
+            "ALTER TABLE carts_new RENAME TO carts",
+            """
+            CREATE TABLE m2m_carts_articles_new (
+                id INTEGER PRIMARY KEY NOT NULL,
+                article_id INTEGER NOT NULL,
+                cart_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL,
+                unit_price INTEGER NOT NULL,
+                article_name TEXT NOT NULL,
+                created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                updated_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                FOREIGN KEY(article_id) REFERENCES articles(id) ON DELETE CASCADE,
+                FOREIGN KEY(cart_id) REFERENCES carts(id) ON DELETE CASCADE,
+                UNIQUE(article_id, cart_id)
+            )
+            """,
+            """
+            INSERT INTO m2m_carts_articles_new (
+                id, article_id, cart_id, quantity, unit_price, article_name, created_at, updated_at
+            )
+            SELECT
+                id,
+                article_id,
+                cart_id,
+                quantity,
+                unit_price,
+                article_name,
+                COALESCE(CAST(strftime('%s', created_at) AS INTEGER), 0),
+                COALESCE(CAST(strftime('%s', updated_at) AS INTEGER), 0)
+            FROM m2m_carts_articles
+            """,
+            "DROP TABLE m2m_carts_articles",
+            "ALTER TABLE m2m_carts_articles_new RENAME TO m2m_carts_articles",
+            # indexes and triggers were dropped together with the old tables
+            "CREATE INDEX IF NOT EXISTS idx_articles_category_id ON articles(category_id)",
+            "CREATE INDEX IF NOT EXISTS idx_articles_name ON articles(name COLLATE NOCASE)",
+            "CREATE INDEX IF NOT EXISTS idx_m2m_carts_articles_cart_id ON m2m_carts_articles(cart_id)",
+            "CREATE INDEX IF NOT EXISTS idx_carts_paid_paid_at ON carts(paid, paid_at)",
+            """
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert
+            AFTER INSERT ON articles
+            BEGIN
+                INSERT INTO articles_fts (rowid, name) VALUES (NEW.id, NEW.name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete
+            AFTER DELETE ON articles
+            BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, name)
+                VALUES ('delete', OLD.id, OLD.name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS articles_fts_update
+            AFTER UPDATE OF name ON articles
+            BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, name)
+                VALUES ('delete', OLD.id, OLD.name);
+                INSERT INTO articles_fts (rowid, name) VALUES (NEW.id, NEW.name);
+            END
+            """,
+            "INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')",
+            """
+            CREATE TRIGGER IF NOT EXISTS categories_updated_at
+            AFTER UPDATE ON categories
+            FOR EACH ROW
+            WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE categories
+                SET updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+                WHERE id = OLD.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS articles_updated_at
+            AFTER UPDATE ON articles
+            FOR EACH ROW
+            WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE articles
+                SET updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+                WHERE id = OLD.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS carts_updated_at
+            AFTER UPDATE ON carts
+            FOR EACH ROW
+            WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE carts
+                SET updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+                WHERE id = OLD.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS m2m_carts_articles_updated_at
+            AFTER UPDATE ON m2m_carts_articles
+            FOR EACH ROW
+            WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE m2m_carts_articles
+                SET updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+                WHERE id = OLD.id;
+            END
+            """,
+        ),
+    ),
+    Migration(
+        version=6,
+        name="keyset pagination indexes",
+        statements=(
+            # articles of a category paged by name
+            "CREATE INDEX IF NOT EXISTS idx_articles_category_id_name ON articles(category_id, name COLLATE NOCASE)",
+            # carts filtered by paid and paged by id, the index keeps the rowid order
+            "CREATE INDEX IF NOT EXISTS idx_carts_paid ON carts(paid)",
+        ),
+    ),
+    Migration(
+        version=7,
+        name="cart totals",
+        statements=(
+            # sum of the line totals in minor units, kept up to date by the triggers below
+            "ALTER TABLE carts ADD COLUMN total INTEGER NOT NULL DEFAULT 0",
+            """
+            UPDATE carts SET total = COALESCE((
+                SELECT SUM(quantity * unit_price)
+                FROM m2m_carts_articles
+                WHERE cart_id = carts.id
+            ), 0)
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS carts_total_insert
+            AFTER INSERT ON m2m_carts_articles
+            BEGIN
+                UPDATE carts SET total = total + NEW.quantity * NEW.unit_price
+                WHERE id = NEW.cart_id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS carts_total_delete
+            AFTER DELETE ON m2m_carts_articles
+            BEGIN
+                UPDATE carts SET total = total - OLD.quantity * OLD.unit_price
+                WHERE id = OLD.cart_id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS carts_total_update
+            AFTER UPDATE OF cart_id, quantity, unit_price ON m2m_carts_articles
+            BEGIN
+                UPDATE carts SET total = total - OLD.quantity * OLD.unit_price
+                WHERE id = OLD.cart_id;
+                UPDATE carts SET total = total + NEW.quantity * NEW.unit_price
+                WHERE id = NEW.cart_id;
+            END
+            """,
+            # CartFilter min_total and max_total
+            "CREATE INDEX IF NOT EXISTS idx_carts_total ON carts(total)",
+        ),
+    ),
+    Migration(
+        version=8,
+        name="sales aggregates",
+        statements=(
+            # day and hour buckets are local time strings like 2024-01-31 and 2024-01-31 14
+            """
+            CREATE TABLE IF NOT EXISTS sales_daily (
+                day TEXT PRIMARY KEY NOT NULL,
+                revenue INTEGER NOT NULL DEFAULT 0,
+                carts INTEGER NOT NULL DEFAULT 0,
+                items INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS sales_hourly (
+                hour TEXT PRIMARY KEY NOT NULL,
+                revenue INTEGER NOT NULL DEFAULT 0,
+                carts INTEGER NOT NULL DEFAULT 0,
+                items INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+            """,
+            # no foreign keys, the history outlives deleted articles and categories
+            """
+            CREATE TABLE IF NOT EXISTS sales_by_article_daily (
+                day TEXT NOT NULL,
+                article_id INTEGER NOT NULL,
+                article_name TEXT NOT NULL,
+                category_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL DEFAULT 0,
+                revenue INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, article_id)
+            ) WITHOUT ROWID
+            """,
+            # a cart is counted once, when it changes from open to paid
+            """
+            CREATE TRIGGER IF NOT EXISTS carts_sales_paid
+            AFTER UPDATE OF paid ON carts
+            FOR EACH ROW
+            WHEN OLD.paid = 0 AND NEW.paid = 1 AND NEW.paid_at IS NOT NULL
+            BEGIN
+                INSERT INTO sales_daily (day, revenue, carts, items)
+                SELECT
+                    date(NEW.paid_at, 'unixepoch', 'localtime'),
+                    NEW.total,
+                    1,
+                    COALESCE(SUM(quantity), 0)
+                FROM m2m_carts_articles
+                WHERE cart_id = NEW.id
+                ON CONFLICT (day) DO UPDATE SET
+                    revenue = revenue + excluded.revenue,
+                    carts = carts + excluded.carts,
+                    items = items + excluded.items;
+
+                INSERT INTO sales_hourly (hour, revenue, carts, items)
+                SELECT
+                    strftime('%Y-%m-%d %H', NEW.paid_at, 'unixepoch', 'localtime'),
+                    NEW.total,
+                    1,
+                    COALESCE(SUM(quantity), 0)
+                FROM m2m_carts_articles
+                WHERE cart_id = NEW.id
+                ON CONFLICT (hour) DO UPDATE SET
+                    revenue = revenue + excluded.revenue,
+                    carts = carts + excluded.carts,
+                    items = items + excluded.items;
+
+                INSERT INTO sales_by_article_daily (
+                    day, article_id, article_name, category_id, quantity, revenue
+                )
+                SELECT
+                    date(NEW.paid_at, 'unixepoch', 'localtime'),
+                    m.article_id,
+                    m.article_name,
+                    a.category_id,
+                    m.quantity,
+                    m.quantity * m.unit_price
+                FROM m2m_carts_articles m
+                JOIN articles a ON a.id = m.article_id
+                WHERE m.cart_id = NEW.id
+                ON CONFLICT (day, article_id) DO UPDATE SET
+                    article_name = excluded.article_name,
+                    category_id = excluded.category_id,
+                    quantity = quantity + excluded.quantity,
+                    revenue = revenue + excluded.revenue;
+            END
+            """,
+            # backfill from the carts paid before this migration
+            """
+            INSERT INTO sales_daily (day, revenue, carts, items)
+            SELECT
+                date(c.paid_at, 'unixepoch', 'localtime') AS day,
+                SUM(c.total),
+                COUNT(*),
+                SUM((SELECT COALESCE(SUM(quantity), 0) FROM m2m_carts_articles WHERE cart_id = c.id))
+            FROM carts c
+            WHERE c.paid = 1 AND c.paid_at IS NOT NULL
+            GROUP BY day
+            """,
+            """
+            INSERT INTO sales_hourly (hour, revenue, carts, items)
+            SELECT
+                strftime('%Y-%m-%d %H', c.paid_at, 'unixepoch', 'localtime') AS hour,
+                SUM(c.total),
+                COUNT(*),
+                SUM((SELECT COALESCE(SUM(quantity), 0) FROM m2m_carts_articles WHERE cart_id = c.id))
+            FROM carts c
+            WHERE c.paid = 1 AND c.paid_at IS NOT NULL
+            GROUP BY hour
+            """,
+            """
+            INSERT INTO sales_by_article_daily (
+                day, article_id, article_name, category_id, quantity, revenue
+            )
+            SELECT
+                date(c.paid_at, 'unixepoch', 'localtime') AS day,
+                m.article_id,
+                MAX(m.article_name),
+                MAX(a.category_id),
+                SUM(m.quantity),
+                SUM(m.quantity * m.unit_price)
+            FROM carts c
+            JOIN m2m_carts_articles m ON m.cart_id = c.id
+            JOIN articles a ON a.id = m.article_id
+            WHERE c.paid = 1 AND c.paid_at IS NOT NULL
+            GROUP BY day, m.article_id
+            """,
+        ),
+    ),
+    Migration(
+        version=9,
+        name="receipts",
+        statements=(
+            # one snapshot per paid cart, body is the rendered markdown
+            """
+            CREATE TABLE IF NOT EXISTS receipts (
+                cart_id INTEGER PRIMARY KEY NOT NULL,
+                number TEXT NOT NULL UNIQUE,
+                total INTEGER NOT NULL,
+                item_count INTEGER NOT NULL,
+                paid_at INTEGER NOT NULL,
+                body TEXT NOT NULL,
+                created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                FOREIGN KEY(cart_id) REFERENCES carts(id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS receipts_immutable
+            BEFORE UPDATE ON receipts
+            BEGIN
+                SELECT RAISE(ABORT, 'receipts can not be changed');
+            END
+            """,
+        ),
+    ),
+    Migration(
+        version=10,
+        name="article barcodes",
+        statements=(
+            # EAN/UPC or internal code printed on the article, NULL if it has none
+            "ALTER TABLE articles ADD COLUMN barcode TEXT",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_barcode ON articles(barcode) WHERE barcode IS NOT NULL",
+        ),
+    ),
+    Migration(
+        version=11,
+        name="checkout tokens",
+        statements=(
+            # generated by the lane before it stores a cart, tells a replayed journal the cart is stored
+            "ALTER TABLE carts ADD COLUMN token TEXT",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_carts_token ON carts(token) WHERE token IS NOT NULL",
+        ),
+    ),
+]
+
+
+def latest_version(migrations: List[Migration] = MIGRATIONS) -> int:
+    return migrations[-1].version if migrations else 0
+
+
+def migrate(conn: sqlite3.Connection, migrations: List[Migration] = MIGRATIONS) -> int:
+    """
+    applies all migrations newer than PRAGMA user_version, each one in its own transaction
+    returns the schema version of the database afterwards
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= latest_version(migrations):
+        return version
+
+    for migration in migrations:
+        if migration.version <= version:
+            continue
+
+        # foreign keys can only be switched outside of a transaction,
+        # table rebuilds would otherwise cascade deletes into child tables
+        conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+
+            # another process may have migrated while we waited for the lock
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if migration.version <= version:
+                conn.rollback()
+                continue
+
+            for statement in migration.statements:
+                conn.execute(statement)
+
+            if conn.execute("PRAGMA foreign_key_check").fetchone() is not None:
+                raise sqlite3.IntegrityError(
+                    f"Migration {migration.version} ({migration.name}) violates foreign keys"
+                )
+
+            conn.execute(f"PRAGMA user_version = {migration.version}")
+            conn.commit()
+            version = migration.version
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("PRAGMA foreign_keys = ON")
+
+    return version
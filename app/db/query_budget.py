@@ -0,0 +1,73 @@
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List
+
+from app.db.db import DB
+from app.db.instrumentation import Instrumentation
+
+# statements of DB.transaction(), they depend on nesting and group commit, not on the work done
+TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "END", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+@dataclass
+class QueryLog:
+    """
+    statement templates a block issued, without transaction control
+    """
+
+    templates: List[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.templates)
+
+    def repeated(self, repeats: int = 1) -> Dict[str, int]:
+        """
+        templates executed more than repeats times, the same query with other parameters is a likely N+1
+        """
+        return {
+            template: count
+            for template, count in Counter(self.templates).items()
+            if count > repeats
+        }
+
+
+@contextmanager
+def query_budget(db: DB, statements: int, repeats: int = 1) -> Iterator[QueryLog]:
+    """
+    fails with an AssertionError when the block issues more than statements statements
+    or one statement template more than repeats times
+    only statements of the current thread are counted, a trace already set on db keeps working
+    """
+    instrumentation = Instrumentation()
+    previous = db.trace
+
+    def trace_both(sql: str) -> None:
+        instrumentation.trace(sql)
+        if previous is not None:
+            previous(sql)
+
+    db.set_trace(trace_both)
+
+    log = QueryLog()
+    try:
+        with instrumentation.operation("budget") as trace:
+            yield log
+    finally:
+        db.set_trace(previous)
+        log.templates = [
+            template
+            for template in trace.templates
+            if not template.upper().startswith(TRANSACTION_CONTROL)
+        ]
+
+    problems = []
+    if log.count > statements:
+        problems.append(f"{log.count} statements, the budget is {statements}")
+    for template, count in log.repeated(repeats).items():
+        problems.append(f"{count}x {template} (likely N+1)")
+    if problems:
+        raise AssertionError(
+            "\n".join(problems + ["statements:"] + [f"  {t}" for t in log.templates])
+        )
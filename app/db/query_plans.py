@@ -0,0 +1,291 @@
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from app.db.db import DB
+from app.db.instrumentation import Instrumentation
+from app.db.repos.article_repo import ArticleRepo
+from app.db.repos.cart_item_repo import CartItemRepo
+from app.db.repos.cart_repo import CartRepo
+from app.db.repos.category_repo import CategoryRepo
+from app.db.repos.receipt_repo import ReceiptRepo
+from app.db.repos.sales_repo import SalesRepo
+from app.models.cart_filter import CartFilter
+from app.models.money import Money
+from app.models.receipt import Receipt
+from app.models.receipt_item import ReceiptItem
+
+# approved plans, regenerate with python -m app.db.query_plans --update
+BASELINE_PATH = Path(__file__).with_name("query_plans.json")
+
+# rows of a store after a year, the planner gets them as sqlite_stat1 estimates
+REPRESENTATIVE_ROWS = {
+    "categories": 20,
+    "articles": 5000,
+    "carts": 20000,
+    "m2m_carts_articles": 150000,
+    "receipts": 20000,
+    "sales_daily": 365,
+    "sales_hourly": 4380,
+    "sales_by_article_daily": 200000,
+}
+
+# a full scan of these is a regression, the small ones are cheaper to scan than to search
+LARGE_TABLES = {table for table, rows in REPRESENTATIVE_ROWS.items() if rows >= 10000}
+
+STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+SCAN = re.compile(r"^SCAN (\w+)")
+# plans name a table by its alias, FROM carts c shows up as SCAN c
+ALIAS = re.compile(
+    r"\b(?:FROM|JOIN)\s+(\w+)\s+(?:AS\s+)?(?!(?:WHERE|JOIN|LEFT|INNER|CROSS|ON|USING|ORDER|GROUP|LIMIT)\b)(\w+)",
+    re.IGNORECASE,
+)
+
+
+def representative_db() -> DB:
+    """
+    in-memory database with the current schema and the row estimates of REPRESENTATIVE_ROWS
+    """
+    db = DB(":memory:")
+    with db.write() as conn:
+        # creates sqlite_stat1, the tables are still empty
+        conn.execute("ANALYZE")
+        conn.execute("DELETE FROM sqlite_stat1")
+        conn.executemany(
+            "INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (?, NULL, ?)",
+            [(table, str(rows)) for table, rows in REPRESENTATIVE_ROWS.items()],
+        )
+    db.flush()
+    # the planner reads sqlite_stat1 when the schema is loaded
+    db.connect().execute("ANALYZE sqlite_schema")
+    return db
+
+
+def collect_statements(db: DB) -> List[str]:
+    """
+    calls every repo method with its variants and returns the statement templates they issue
+    """
+    instrumentation = Instrumentation()
+    db.set_trace(instrumentation.trace)
+    try:
+        exercise_repos(db)
+    finally:
+        db.set_trace(None)
+    # SQLite runs statements of its own on the shadow tables of articles_fts, they name
+    # them as quoted 'schema'.'table' which the templates turn into ?.?
+    return sorted(
+        template
+        for template in instrumentation.statements()
+        if template.upper().startswith(STATEMENTS) and "?.?" not in template
+    )
+
+
+def exercise_repos(db: DB) -> None:
+    category_repo = CategoryRepo(db)
+    article_repo = ArticleRepo(db)
+    cart_repo = CartRepo(db)
+    cart_item_repo = CartItemRepo(db)
+    receipt_repo = ReceiptRepo(db)
+    sales_repo = SalesRepo(db)
+
+    category_id = category_repo.create("Drinks")
+    assert category_id is not None
+    category = category_repo.get_one(category_id)
+    assert category is not None
+    category_repo.get_all()
+    category_repo.update(category)
+
+    article_id = article_repo.create("Water", Money(150), category_id, "7610000000017")
+    other_id = article_repo.create("Juice", Money(300), category_id)
+    assert article_id is not None and other_id is not None
+    article = article_repo.get_one(article_id)
+    other = article_repo.get_one(other_id)
+    assert article is not None and other is not None
+    article_repo.get_all()
+    article_repo.get_all(category_id)
+    article_repo.get_all(category_id, "wat")
+    article_repo.get_all(search_text="wat")
+    for sort, cursor in (("id", (0,)), ("name", ("", 0))):
+        for descending in (False, True):
+            for page_category in (None, category_id):
+                for after in (None, cursor):
+                    article_repo.get_page(
+                        page_category, after, sort=sort, descending=descending
+                    )
+    article_repo.count_estimate()
+    article_repo.count_estimate(category_id)
+    article_repo.search("wat")
+    article_repo.get_by_barcode("7610000000017")
+    article_repo.get_by_name("Water")
+    article_repo.update(article)
+
+    cart = cart_repo.create()
+    assert cart is not None
+    cart_repo.get_one(cart.id)
+    cart_repo.get_by_token("token")
+    cart_repo.get_total(cart.id)
+    cart_item = cart_item_repo.create(cart, article, 1)
+    assert cart_item is not None
+    cart_item_repo.get_one(cart_item.id)
+    cart_item_repo.update(cart_item)
+    cart_item_repo.get_all(cart)
+    cart_item_repo.get_all()
+    cart_item_repo.get_total(cart)
+    other_cart = cart_repo.create()
+    assert other_cart is not None
+    cart_item_repo.create_many(other_cart, [cart_item])
+
+    filters = [
+        None,
+        CartFilter(paid=False),
+        CartFilter(paid_from=datetime(2024, 1, 1), paid_to=datetime(2025, 1, 1)),
+        CartFilter(min_total=Money(100), max_total=Money(1000)),
+    ]
+    for cart_filter in filters:
+        cart_repo.get_all(cart_filter)
+        cart_repo.count_estimate(cart_filter)
+    pages = (
+        ("id", (0,), None),
+        ("id", (0,), filters[1]),
+        ("paid_at", (0, 0), filters[2]),
+    )
+    for sort, cursor, cart_filter in pages:
+        for descending in (False, True):
+            for after in (None, cursor):
+                cart_repo.get_page(
+                    after, sort=sort, descending=descending, cart_filter=cart_filter
+                )
+
+    cart.paid = True
+    cart.paid_at = datetime(2024, 1, 1, 12, 0)
+    cart_repo.mark_paid(cart)
+    cart_repo.update(cart)
+    receipt = Receipt(cart.paid_at, [ReceiptItem(article.name, 1, article.price)])
+    receipt_repo.create(cart, "20240101-000001", receipt, "receipt")
+    receipt_repo.get_one(cart.id)
+
+    day = date(2024, 1, 1)
+    sales_repo.get_daily(day, day)
+    sales_repo.get_hourly(day)
+    sales_repo.get_by_article(day, day)
+    sales_repo.get_by_article(day, day, 10)
+    sales_repo.get_by_category(day, day)
+
+    cart_item_repo.delete(cart_item)
+    cart_repo.delete(other_cart)
+    article_repo.delete(other)
+    category_repo.delete(category)
+
+
+def explain(conn: sqlite3.Connection, template: str) -> List[str]:
+    """
+    EXPLAIN QUERY PLAN of a template, its placeholders are bound to NULL
+    """
+    rows = conn.execute(
+        "EXPLAIN QUERY PLAN " + template, [None] * template.count("?")
+    ).fetchall()
+    return [row["detail"] for row in rows]
+
+
+def query_plans(db: Optional[DB] = None) -> Dict[str, List[str]]:
+    """
+    plan of every repo statement against the representative database
+    """
+    if db is None:
+        db = representative_db()
+        try:
+            return query_plans(db)
+        finally:
+            db.close()
+    statements = collect_statements(db)
+    with db.read() as conn:
+        return {template: explain(conn, template) for template in statements}
+
+
+def scanned_tables(template: str, plan: List[str]) -> Set[str]:
+    aliases = {alias: table for table, alias in ALIAS.findall(template)}
+    tables = set()
+    for detail in plan:
+        match = SCAN.match(detail)
+        if match is not None:
+            tables.add(aliases.get(match.group(1), match.group(1)))
+    return tables
+
+
+def regressions(
+    baseline: Dict[str, List[str]], plans: Dict[str, List[str]]
+) -> List[str]:
+    """
+    statements that scan a large table their approved plan did not scan
+    """
+    problems = []
+    for template, plan in plans.items():
+        approved = scanned_tables(template, baseline.get(template, []))
+        for table in sorted((scanned_tables(template, plan) & LARGE_TABLES) - approved):
+            problems.append(f"new SCAN {table}: {template}\n  " + "\n  ".join(plan))
+    return problems
+
+
+def changes(baseline: Dict[str, List[str]], plans: Dict[str, List[str]]) -> List[str]:
+    """
+    all differences to the baseline, new and removed statements included
+    """
+    lines = []
+    for template in sorted(baseline.keys() | plans.keys()):
+        if template not in plans:
+            lines.append(f"removed: {template}")
+        elif template not in baseline:
+            lines.append(f"new: {template}\n  " + "\n  ".join(plans[template]))
+        elif baseline[template] != plans[template]:
+            lines.append(
+                f"changed: {template}\n  - "
+                + "\n  - ".join(baseline[template])
+                + "\n  + "
+                + "\n  + ".join(plans[template])
+            )
+    return lines
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, List[str]]:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_baseline(plans: Dict[str, List[str]], path: Path = BASELINE_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(plans, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.db.query_plans",
+        description="compares the query plans of all repo statements to the approved baseline",
+    )
+    parser.add_argument(
+        "--update", action="store_true", help="approve the current plans"
+    )
+    args = parser.parse_args()
+
+    plans = query_plans()
+    if args.update:
+        save_baseline(plans)
+        print(f"{len(plans)} plans written to {BASELINE_PATH}")
+        return 0
+
+    baseline = load_baseline()
+    for line in changes(baseline, plans):
+        print(line)
+    problems = regressions(baseline, plans)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
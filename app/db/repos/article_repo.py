@@ -1,50 +1,90 @@
+import re
+import sqlite3
 from typing import List, Optional
 from app.db.db import DB
-from app.db.repos.category_repo import CategoryRepo
+from app.db.keyset import BY_ID, SortKey
+from app.db.row_factory import row_factory
 from app.models.article import Article
-from datetime import datetime
+from app.models.money import Money
+from app.models.page import Cursor, Page
+
+ARTICLE_ROW = row_factory(
+    Article,
+    ("id", "name", "price", "category_id", "created_ts", "updated_ts", "barcode"),
+    converters={"price": Money},
+)
+
+ARTICLE_SORT_KEYS = {
+    "id": BY_ID,
+    "name": SortKey("name COLLATE NOCASE", "name"),
+}
+
+
+def normalize_barcode(barcode: Optional[str]) -> Optional[str]:
+    """
+    scanners may send surrounding whitespace, an empty code means no barcode
+    """
+    if barcode is None:
+        return None
+    return barcode.strip() or None
 
 
 class ArticleRepo:
-    def __init__(self, db: DB, category_repo: CategoryRepo) -> None:
+    def __init__(self, db: DB) -> None:
         self.db = db
-        self.category_repo = category_repo
 
-    def create(self, name: str, price: float, category_id: int) -> int | None:
+    def create(
+        self,
+        name: str,
+        price: Money,
+        category_id: int,
+        barcode: Optional[str] = None,
+    ) -> int | None:
+        article = self._create(name, price, category_id, barcode)
+        return article.id if article is not None else None
+
+    def _create(
+        self,
+        name: str,
+        price: Money,
+        category_id: int,
+        barcode: Optional[str] = None,
+    ) -> Article | None:
+        """
+        inserts the article and returns it hydrated by the same statement
+        """
         try:
-            if not self.category_repo.get_one(category_id):
-                raise ValueError(f"Category with id {category_id} not found")
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
+                cur.row_factory = ARTICLE_ROW
                 cur.execute(
-                    "INSERT INTO articles (name, price, category_id) VALUES(?,?,?)",
-                    (name, price, category_id),
+                    "INSERT INTO articles (name, price, category_id, barcode) VALUES(?,?,?,?) RETURNING id, name, price, category_id, created_at, updated_at, barcode",
+                    (name, price, category_id, normalize_barcode(barcode)),
                 )
-                return cur.lastrowid
+                return cur.fetchone()
+        except sqlite3.IntegrityError as e:
+            if e.sqlite_errorname == "SQLITE_CONSTRAINT_UNIQUE":
+                print(f"Article with barcode {barcode} already exists")
+            elif e.sqlite_errorname == "SQLITE_CONSTRAINT_FOREIGNKEY":
+                # the foreign key replaces a lookup of the category
+                print(f"Category with id {category_id} not found")
+            else:
+                print("Database Error: ", e)
+            return None
         except Exception as e:
             print("Database Error: ", e)
             return None
 
     def get_one(self, id: int) -> Article | None:
         try:
-            with self.db.connect() as conn:
+            with self.db.read() as conn:
                 cur = conn.cursor()
+                cur.row_factory = ARTICLE_ROW
                 cur.execute(
-                    "SELECT id, name, price, category_id, created_at, updated_at FROM articles WHERE id = ?",
+                    "SELECT id, name, price, category_id, created_at, updated_at, barcode FROM articles WHERE id = ?",
                     (id,),
                 )
-                row = cur.fetchone()
-                if row is None:
-                    return None
-
-                return Article(
-                    id=row["id"],
-                    name=row["name"],
-                    price=row["price"],
-                    category_id=row["category_id"],
-                    created_at=datetime.fromisoformat(row["created_at"]),
-                    updated_at=datetime.fromisoformat(row["updated_at"]),
-                )
+                return cur.fetchone()
         except Exception as e:
             print("Database Error: ", e)
             return None
@@ -53,60 +93,234 @@ class ArticleRepo:
         self, category_id=None, search_text: Optional[str] = None
     ) -> List[Article]:
         try:
-            with self.db.connect() as conn:
+            return self._get_all(category_id, search_text)
+        except Exception as e:
+            print("Database Error: ", e)
+            return []
+
+    def _get_all(
+        self, category_id: Optional[int], search_text: Optional[str]
+    ) -> List[Article]:
+        """
+        get_all without the error handling, raises what the query raises
+        """
+        with self.db.read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = ARTICLE_ROW
+            query = "SELECT id, name, price, category_id, created_at, updated_at, barcode FROM articles"
+            params = []
+
+            if category_id is not None:
+                query += " WHERE category_id = ?"
+                params.append(category_id)
+
+            if search_text is not None:
+                query += " AND" if "WHERE" in query else " WHERE"
+                query += " name LIKE ?"
+                params.append(f"%{search_text}%")
+
+            cur.execute(query, params)
+            return cur.fetchall()
+
+    def get_page(
+        self,
+        category_id: Optional[int] = None,
+        after: Optional[Cursor] = None,
+        limit: int = 100,
+        sort: str = "id",
+        descending: bool = False,
+    ) -> Page[Article]:
+        """
+        returns up to limit articles following the cursor of the previous page
+        sort is one of ARTICLE_SORT_KEYS, the cost does not grow with the page number
+        """
+        sort_key = ARTICLE_SORT_KEYS.get(sort)
+        if sort_key is None:
+            raise ValueError(f"Unknown sort key {sort!r}")
+        try:
+            with self.db.read() as conn:
                 cur = conn.cursor()
-                query = "SELECT id, name, price, category_id, created_at, updated_at FROM articles"
+                cur.row_factory = ARTICLE_ROW
+                conditions = []
                 params = []
 
                 if category_id is not None:
-                    if self.category_repo.get_one(category_id) is None:
-                        raise ValueError(f"Category with id {category_id} not found")
-                    else:
-                        query += " WHERE category_id = ?"
-                        params.append(category_id)
+                    conditions.append("category_id = ?")
+                    params.append(category_id)
 
-                if search_text is not None:
-                    query += " AND" if "WHERE" in query else " WHERE"
-                    query += " name LIKE ?"
-                    params.append(f"%{search_text}%")
+                if after is not None:
+                    condition, after_params = sort_key.after(after, descending)
+                    conditions.append(condition)
+                    params.extend(after_params)
+
+                query = "SELECT id, name, price, category_id, created_at, updated_at, barcode FROM articles"
+                if conditions:
+                    query += " WHERE " + " AND ".join(conditions)
+                query += f" ORDER BY {sort_key.order_by(descending)} LIMIT ?"
+                params.append(limit + 1)
 
                 cur.execute(query, params)
-                rows = cur.fetchall()
-                articles = []
-                for row in rows:
-                    articles.append(
-                        Article(
-                            id=row["id"],
-                            name=row["name"],
-                            price=row["price"],
-                            category_id=row["category_id"],
-                            created_at=datetime.fromisoformat(row["created_at"]),
-                            updated_at=datetime.fromisoformat(row["updated_at"]),
-                        )
+                return sort_key.page(cur.fetchall(), limit)
+        except Exception as e:
+            print("DB Error: ", e)
+            return Page([])
+
+    def count_estimate(self, category_id: Optional[int] = None) -> int:
+        """
+        number of articles for scroll bars and page counts
+        without a category this is the highest id, deleted articles are included
+        """
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                if category_id is None:
+                    cur.execute("SELECT COALESCE(MAX(id), 0) FROM articles")
+                else:
+                    cur.execute(
+                        "SELECT COUNT(*) FROM articles WHERE category_id = ?",
+                        (category_id,),
                     )
-                return articles
+                return cur.fetchone()[0]
         except Exception as e:
-            print("Database Error: ", e)
+            print("DB Error: ", e)
+            return 0
+
+    def search(self, search_text: str, limit: int = 50) -> List[Article]:
+        """
+        full text search on the article names, every word is matched as a prefix
+        results are ranked by bm25, best match first
+        raises the OperationalError of a query interrupted by DB.interrupt_reads
+        """
+        try:
+            return self._search(search_text, limit)
+        except sqlite3.OperationalError as e:
+            # the search was superseded, an empty result would pass for a real one
+            if e.sqlite_errorname == "SQLITE_INTERRUPT":
+                raise
+            print("DB Error: ", e)
+            return []
+        except Exception as e:
+            print("DB Error: ", e)
+            return []
+
+    def _search(self, search_text: str, limit: int) -> List[Article]:
+        """
+        search without the error handling, raises what the query raises
+        """
+        match = self.__match_expression(search_text)
+        if match is None:
             return []
+        with self.db.read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = ARTICLE_ROW
+            cur.execute(
+                """
+                SELECT a.id, a.name, a.price, a.category_id, a.created_at, a.updated_at, a.barcode
+                FROM articles_fts
+                JOIN articles a ON a.id = articles_fts.rowid
+                WHERE articles_fts MATCH ?
+                ORDER BY articles_fts.rank, a.id
+                LIMIT ?
+                """,
+                (match, limit),
+            )
+            return cur.fetchall()
+
+    def get_by_barcode(self, barcode: str) -> Article | None:
+        """
+        returns the article with this barcode, looked up by its unique index
+        """
+        code = normalize_barcode(barcode)
+        if code is None:
+            return None
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.row_factory = ARTICLE_ROW
+                cur.execute(
+                    "SELECT id, name, price, category_id, created_at, updated_at, barcode FROM articles WHERE barcode = ?",
+                    (code,),
+                )
+                return cur.fetchone()
+        except Exception as e:
+            print("DB Error: ", e)
+            return None
+
+    def get_by_name(self, name: str) -> List[Article]:
+        """
+        returns the articles with exactly this name, compared case insensitive
+        """
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.row_factory = ARTICLE_ROW
+                cur.execute(
+                    "SELECT id, name, price, category_id, created_at, updated_at, barcode FROM articles WHERE name = ? COLLATE NOCASE",
+                    (name.strip(),),
+                )
+                return cur.fetchall()
+        except Exception as e:
+            print("DB Error: ", e)
+            return []
+
+    def invalidate_category(self, category_id: int) -> None:
+        """
+        called after a category and its articles were deleted by cascade
+        the plain repo keeps no state, see CachedArticleRepo
+        """
+        return
+
+    def __match_expression(self, search_text: str) -> Optional[str]:
+        # quote every word so user input can never be parsed as FTS5 syntax
+        words = re.findall(r"\w+", search_text)
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
 
     def update(self, article: Article) -> bool:
+        return self._update(article) is not None
+
+    def _update(self, article: Article) -> Article | None:
+        """
+        returns the updated row, None if the article does not exist or violates a constraint
+        updated_at is set by the statement, RETURNING does not see what the trigger writes
+        """
         try:
-            if self.category_repo.get_one(article.category_id) is None:
-                raise ValueError(f"Category with ID {article.category_id} not found")
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
+                cur.row_factory = ARTICLE_ROW
                 cur.execute(
-                    "UPDATE articles SET name = ?, price = ?, category_id = ? WHERE id = ?",
-                    (article.name, article.price, article.category_id, article.id),
+                    """
+                    UPDATE articles
+                    SET name = ?, price = ?, category_id = ?, barcode = ?,
+                        updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+                    WHERE id = ?
+                    RETURNING id, name, price, category_id, created_at, updated_at, barcode
+                    """,
+                    (
+                        article.name,
+                        article.price,
+                        article.category_id,
+                        normalize_barcode(article.barcode),
+                        article.id,
+                    ),
                 )
-                return cur.rowcount == 1
+                return cur.fetchone()
+        except sqlite3.IntegrityError as e:
+            if e.sqlite_errorname == "SQLITE_CONSTRAINT_UNIQUE":
+                print(f"Article with barcode {article.barcode} already exists")
+            elif e.sqlite_errorname == "SQLITE_CONSTRAINT_FOREIGNKEY":
+                print(f"Category with ID {article.category_id} not found")
+            else:
+                print("DB Error: ", e)
+            return None
         except Exception as e:
             print("DB Error: ", e)
-            return False
+            return None
 
     def delete(self, article: Article) -> bool:
         try:
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
                 cur.execute("DELETE FROM articles WHERE id = ?", (article.id,))
                 return cur.rowcount == 1
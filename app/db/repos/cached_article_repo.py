@@ -0,0 +1,238 @@
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, List, Optional, Set, Tuple
+from app.db.db import DB
+from app.db.repos.article_repo import ArticleRepo, normalize_barcode
+from app.models.article import Article
+from app.models.cache_stats import CacheStats
+from app.models.money import Money
+
+
+class CachedArticleRepo(ArticleRepo):
+    """
+    ArticleRepo that keeps the catalog in memory
+    articles are indexed by id, category, normalized name and barcode,
+    writes through this repo update the indexes so reads never see stale rows
+    """
+
+    def __init__(
+        self,
+        db: DB,
+        max_articles: Optional[int] = None,
+        max_searches: int = 256,
+    ) -> None:
+        super().__init__(db)
+        self.__max_articles = max_articles
+        self.__max_searches = max_searches
+
+        # least recently used article first
+        self.__by_id: OrderedDict[int, Article] = OrderedDict()
+        self.__by_category: Dict[int, Set[int]] = {}
+        self.__by_name: Dict[str, Set[int]] = {}
+        self.__by_barcode: Dict[str, int] = {}
+
+        # a category (or the catalog) is complete when all its articles are cached
+        self.__complete_categories: Set[int] = set()
+        self.__complete = False
+
+        # search text and limit -> ranked article ids
+        self.__searches: OrderedDict[Tuple[str, int], List[int]] = OrderedDict()
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.__hits,
+            misses=self.__misses,
+            evictions=self.__evictions,
+            size=len(self.__by_id),
+        )
+
+    def clear(self) -> None:
+        self.__by_id.clear()
+        self.__by_category.clear()
+        self.__by_name.clear()
+        self.__by_barcode.clear()
+        self.__complete_categories.clear()
+        self.__complete = False
+        self.__searches.clear()
+
+    def warm(self) -> None:
+        """
+        loads the whole catalog, so scans are answered from memory from the first one
+        """
+        self.get_all()
+
+    def create(
+        self,
+        name: str,
+        price: Money,
+        category_id: int,
+        barcode: Optional[str] = None,
+    ) -> int | None:
+        article = super()._create(name, price, category_id, barcode)
+        if article is None:
+            return None
+        self.__searches.clear()
+        self.__store(article)
+        return article.id
+
+    def get_one(self, id: int) -> Article | None:
+        article = self.__by_id.get(id)
+        if article is not None:
+            self.__hits += 1
+            self.__by_id.move_to_end(id)
+            return replace(article)
+
+        self.__misses += 1
+        article = super().get_one(id)
+        if article is not None:
+            self.__store(article)
+            return replace(article)
+        return None
+
+    def _get_all(
+        self, category_id: Optional[int], search_text: Optional[str]
+    ) -> List[Article]:
+        # below the error handling of get_all, a failed query raises before the
+        # cache is marked complete
+        if search_text is not None:
+            self.__misses += 1
+            return super()._get_all(category_id, search_text)
+
+        if self.__complete or category_id in self.__complete_categories:
+            self.__hits += 1
+            if category_id is None:
+                ids = sorted(self.__by_id)
+            else:
+                ids = sorted(self.__by_category.get(category_id, ()))
+            return [replace(self.__by_id[id]) for id in ids]
+
+        self.__misses += 1
+        articles = super()._get_all(category_id, None)
+        for article in articles:
+            self.__store(article)
+
+        # only mark complete if nothing was evicted while loading
+        if all(article.id in self.__by_id for article in articles):
+            if category_id is None:
+                self.__complete = True
+                self.__complete_categories.update(self.__by_category)
+            else:
+                self.__complete_categories.add(category_id)
+
+        return [replace(article) for article in articles]
+
+    def get_by_barcode(self, barcode: str) -> Article | None:
+        code = normalize_barcode(barcode)
+        if code is None:
+            return None
+        id = self.__by_barcode.get(code)
+        if id is not None:
+            self.__hits += 1
+            self.__by_id.move_to_end(id)
+            return replace(self.__by_id[id])
+
+        # even a complete cache asks the unique index, another lane may have added the article
+        self.__misses += 1
+        article = super().get_by_barcode(code)
+        if article is not None:
+            self.__store(article)
+            return replace(article)
+        return None
+
+    def get_by_name(self, name: str) -> List[Article]:
+        key = self.__normalize(name)
+        if self.__complete:
+            self.__hits += 1
+            ids = sorted(self.__by_name.get(key, ()))
+            return [replace(self.__by_id[id]) for id in ids]
+
+        self.__misses += 1
+        articles = super().get_by_name(name)
+        for article in articles:
+            self.__store(article)
+        return [replace(article) for article in articles]
+
+    def _search(self, search_text: str, limit: int) -> List[Article]:
+        # below the error handling of search, a failed or interrupted query raises
+        # before its result is cached
+        key = (self.__normalize(search_text), limit)
+        ids = self.__searches.get(key)
+        if ids is not None and all(id in self.__by_id for id in ids):
+            self.__hits += 1
+            self.__searches.move_to_end(key)
+            return [replace(self.__by_id[id]) for id in ids]
+
+        self.__misses += 1
+        articles = super()._search(search_text, limit)
+        for article in articles:
+            self.__store(article)
+        self.__searches[key] = [article.id for article in articles]
+        if len(self.__searches) > self.__max_searches:
+            self.__searches.popitem(last=False)
+        return [replace(article) for article in articles]
+
+    def update(self, article: Article) -> bool:
+        updated = super()._update(article)
+        if updated is None:
+            return False
+        self.__searches.clear()
+        self.__store(updated)
+        return True
+
+    def delete(self, article: Article) -> bool:
+        deleted = super().delete(article)
+        if deleted:
+            self.__searches.clear()
+            self.__remove(article.id)
+        return deleted
+
+    def invalidate_category(self, category_id: int) -> None:
+        self.__searches.clear()
+        for id in list(self.__by_category.get(category_id, ())):
+            self.__remove(id)
+        self.__by_category.pop(category_id, None)
+        self.__complete_categories.discard(category_id)
+
+    def __normalize(self, text: str) -> str:
+        return " ".join(text.casefold().split())
+
+    def __store(self, article: Article) -> None:
+        previous = self.__by_id.get(article.id)
+        if previous is not None:
+            self.__unindex(previous)
+
+        self.__by_id[article.id] = article
+        self.__by_id.move_to_end(article.id)
+        self.__by_category.setdefault(article.category_id, set()).add(article.id)
+        self.__by_name.setdefault(self.__normalize(article.name), set()).add(article.id)
+        if article.barcode is not None:
+            self.__by_barcode[article.barcode] = article.id
+
+        if self.__max_articles is not None:
+            while len(self.__by_id) > self.__max_articles:
+                _, evicted = self.__by_id.popitem(last=False)
+                self.__unindex(evicted)
+                self.__complete = False
+                self.__complete_categories.discard(evicted.category_id)
+                self.__evictions += 1
+
+    def __remove(self, id: int) -> None:
+        article = self.__by_id.pop(id, None)
+        if article is not None:
+            self.__unindex(article)
+
+    def __unindex(self, article: Article) -> None:
+        category_ids = self.__by_category.get(article.category_id)
+        if category_ids is not None:
+            category_ids.discard(article.id)
+        name_ids = self.__by_name.get(self.__normalize(article.name))
+        if name_ids is not None:
+            name_ids.discard(article.id)
+            if not name_ids:
+                del self.__by_name[self.__normalize(article.name)]
+        if self.__by_barcode.get(article.barcode) == article.id:
+            del self.__by_barcode[article.barcode]
@@ -1,81 +1,107 @@
-from datetime import datetime
 import sqlite3
 from typing import List, Optional
 from app.db.db import DB
-from app.db.repos.article_repo import ArticleRepo
-from app.db.repos.cart_repo import CartRepo
+from app.db.row_factory import row_factory
 from app.models.cart import Cart
 from app.models.article import Article
+from app.models.money import Money
 from app.models.cart_item import CartItem
 
+CART_ITEM_ROW = row_factory(
+    CartItem,
+    (
+        "id",
+        "article_id",
+        "cart_id",
+        "quantity",
+        "unit_price",
+        "article_name",
+        "created_ts",
+        "updated_ts",
+    ),
+    converters={"unit_price": Money},
+)
+
 
 class CartItemRepo:
-    def __init__(self, db: DB, cart_repo: CartRepo, article_repo: ArticleRepo) -> None:
+    def __init__(self, db: DB) -> None:
         self.db = db
-        self.cart_repo = cart_repo
-        self.article_repo = article_repo
 
-    def create(self, cart: Cart, article: Article, quantity: int) -> int | None:
+    def create(self, cart: Cart, article: Article, quantity: int) -> Optional[CartItem]:
+        """
+        inserts the cart item and returns it hydrated by the same statement
+        missing carts or articles are reported by the foreign keys
+        """
         try:
-            if (
-                self.cart_repo.get_one(cart.id) is None
-                or self.article_repo.get_one(article.id) is None
-            ):
-                print(
-                    f"Cart with id {cart.id} or article with id {article.id} does not extist"
-                )
-                return None
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
+                cur.row_factory = CART_ITEM_ROW
                 cur.execute(
-                    "INSERT INTO m2m_carts_articles (article_id, cart_id, quantity, unit_price, article_name) VALUES (?, ?, ?, ?, ?)",
+                    "INSERT INTO m2m_carts_articles (article_id, cart_id, quantity, unit_price, article_name) VALUES (?, ?, ?, ?, ?) RETURNING id, article_id, cart_id, quantity, unit_price, article_name, created_at, updated_at",
                     (article.id, cart.id, quantity, article.price, article.name),
                 )
-                return cur.lastrowid
-        except sqlite3.IntegrityError:
-            print(
-                f"CartItem for cart id {cart.id} and article id {article.id}, already exists"
-            )
+                return cur.fetchone()
+        except sqlite3.IntegrityError as e:
+            if e.sqlite_errorname == "SQLITE_CONSTRAINT_FOREIGNKEY":
+                print(
+                    f"Cart with id {cart.id} or article with id {article.id} does not extist"
+                )
+            else:
+                print(
+                    f"CartItem for cart id {cart.id} and article id {article.id}, already exists"
+                )
             return None
         except Exception as e:
             print("DB Error: ", e)
             return None
 
+    def create_many(self, cart: Cart, cart_items: List[CartItem]) -> bool:
+        """
+        inserts all cart items into cart with one prepared statement
+        the ids of cart_items are ignored, the database assigns new ones
+        """
+        try:
+            with self.db.write() as conn:
+                conn.executemany(
+                    "INSERT INTO m2m_carts_articles (article_id, cart_id, quantity, unit_price, article_name) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            item.article_id,
+                            cart.id,
+                            item.quantity,
+                            item.unit_price,
+                            item.article_name,
+                        )
+                        for item in cart_items
+                    ],
+                )
+                return True
+        except sqlite3.IntegrityError as e:
+            print(f"CartItems for cart id {cart.id} could not be created: ", e)
+            return False
+        except Exception as e:
+            print("DB Error: ", e)
+            return False
+
     def get_one(self, cart_item_id: int) -> Optional[CartItem]:
         try:
-            with self.db.connect() as conn:
+            with self.db.read() as conn:
                 cur = conn.cursor()
+                cur.row_factory = CART_ITEM_ROW
                 cur.execute(
                     "SELECT id, article_id, cart_id, quantity, unit_price, article_name, created_at, updated_at FROM m2m_carts_articles WHERE id =?",
                     (cart_item_id,),
                 )
-                row = cur.fetchone()
-
-                if row is None:
-                    return None
-
-                return CartItem(
-                    id=row["id"],
-                    article_id=row["article_id"],
-                    cart_id=row["cart_id"],
-                    quantity=row["quantity"],
-                    unit_price=row["unit_price"],
-                    article_name=row["article_name"],
-                    created_at=datetime.fromisoformat(row["created_at"]),
-                    updated_at=datetime.fromisoformat(row["updated_at"]),
-                )
-
+                return cur.fetchone()
         except Exception as e:
             print("DB Error: ", e)
             return None
 
     def get_all(self, cart: Optional[Cart] = None) -> List[CartItem]:
         try:
-            if cart is not None and self.cart_repo.get_one(cart.id) is None:
-                print(f"Cart with id {cart.id} does not exist")
-                return []
-            with self.db.connect() as conn:
+            with self.db.read() as conn:
                 cur = conn.cursor()
+                cur.row_factory = CART_ITEM_ROW
                 if cart is not None:
                     cur.execute(
                         "SELECT id, article_id, cart_id, quantity, unit_price, article_name, created_at, updated_at from m2m_carts_articles WHERE cart_id = ?",
@@ -85,29 +111,30 @@ class CartItemRepo:
                     cur.execute(
                         "SELECT id, article_id, cart_id, quantity, unit_price, article_name, created_at, updated_at from m2m_carts_articles"
                     )
-                rows = cur.fetchall()
-                cart_items = []
-                for row in rows:
-                    cart_items.append(
-                        CartItem(
-                            id=row["id"],
-                            article_id=row["article_id"],
-                            cart_id=row["cart_id"],
-                            quantity=row["quantity"],
-                            unit_price=row["unit_price"],
-                            article_name=row["article_name"],
-                            created_at=datetime.fromisoformat(row["created_at"]),
-                            updated_at=datetime.fromisoformat(row["updated_at"]),
-                        )
-                    )
-                return cart_items
+                return cur.fetchall()
         except Exception as e:
             print("DB Error: ", e)
             return []
 
+    def get_total(self, cart: Cart) -> Money:
+        """
+        sum of all line totals of the cart, computed by SQLite in integer minor units
+        """
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    "SELECT COALESCE(SUM(quantity * unit_price), 0) AS total FROM m2m_carts_articles WHERE cart_id = ?",
+                    (cart.id,),
+                )
+                return Money(cur.fetchone()["total"])
+        except Exception as e:
+            print("DB Error: ", e)
+            return Money(0)
+
     def update(self, cart_item: CartItem) -> bool:
         try:
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
                 cur.execute(
                     "UPDATE m2m_carts_articles SET quantity = ?, unit_price = ? WHERE id = ?",
@@ -120,7 +147,7 @@ class CartItemRepo:
 
     def delete(self, cart_item: CartItem) -> bool:
         try:
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
                 cur.execute(
                     "DELETE from m2m_carts_articles WHERE id = ?", (cart_item.id,)
@@ -1,19 +1,44 @@
-from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 from app.db.db import DB
+from app.db.keyset import BY_ID, SortKey
+from app.db.row_factory import row_factory
 from app.models.cart import Cart
+from app.models.cart_filter import CartFilter
+from app.models.money import Money
+from app.models.page import Cursor, Page
+
+CART_ROW = row_factory(
+    Cart,
+    ("id", "paid", "paid_ts", "created_ts", "updated_ts"),
+    converters={"paid": bool},
+    defaults={"items": list},
+)
+
+CART_SORT_KEYS = {
+    "id": BY_ID,
+    # only for paid carts, unpaid ones have no paid_at to continue from
+    "paid_at": SortKey("paid_at", "paid_ts"),
+}
 
 
 class CartRepo:
     def __init__(self, db: DB) -> None:
         self.db = db
 
-    def create(self) -> Optional[int]:
+    def create(self, token: Optional[str] = None) -> Optional[Cart]:
+        """
+        inserts an empty cart and returns it hydrated by the same statement
+        token is the checkout token of a lane, see get_by_token
+        """
         try:
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
-                cur.execute("INSERT INTO carts DEFAULT VALUES")
-                return cur.lastrowid
+                cur.row_factory = CART_ROW
+                cur.execute(
+                    "INSERT INTO carts (token) VALUES (?) RETURNING id, paid, paid_at, created_at, updated_at",
+                    (token,),
+                )
+                return cur.fetchone()
 
         except Exception as e:
             print("DB Error: ", e)
@@ -21,79 +46,167 @@ class CartRepo:
 
     def get_one(self, cart_id: int) -> Optional[Cart]:
         try:
-            with self.db.connect() as conn:
+            with self.db.read() as conn:
                 cur = conn.cursor()
+                cur.row_factory = CART_ROW
                 cur.execute(
                     "SELECT id, paid, paid_at, created_at, updated_at FROM carts WHERE id = ?",
                     (cart_id,),
                 )
-                row = cur.fetchone()
-
-                if row is None:
-                    return None
-
-                items = []
-
-                paid_at = (
-                    datetime.fromisoformat(row["paid_at"])
-                    if row["paid_at"] is not None
-                    else None
-                )
-
-                return Cart(
-                    id=row["id"],
-                    paid=row["paid"],
-                    paid_at=paid_at,
-                    created_at=datetime.fromisoformat(row["created_at"]),
-                    updated_at=datetime.fromisoformat(row["updated_at"]),
-                    items=items,
-                )
+                return cur.fetchone()
 
         except Exception as e:
             print("DB Error: ", e)
             return None
 
-    def get_all(self) -> List[Cart]:
+    def get_by_token(self, token: str) -> Optional[Cart]:
+        """
+        returns the cart created with this checkout token, looked up by its unique index
+        """
         try:
-            with self.db.connect() as conn:
+            with self.db.read() as conn:
                 cur = conn.cursor()
+                cur.row_factory = CART_ROW
                 cur.execute(
-                    "SELECT id, paid, paid_at, created_at, updated_at FROM carts"
+                    "SELECT id, paid, paid_at, created_at, updated_at FROM carts WHERE token = ?",
+                    (token,),
                 )
+                return cur.fetchone()
 
-                rows = cur.fetchall()
-                carts = []
+        except Exception as e:
+            print("DB Error: ", e)
+            return None
 
-                for row in rows:
-                    paid_at = (
-                        datetime.fromisoformat(row["paid_at"])
-                        if row["paid_at"] is not None
-                        else None
-                    )
-                    carts.append(
-                        Cart(
-                            id=row["id"],
-                            paid=row["paid"],
-                            paid_at=paid_at,
-                            created_at=datetime.fromisoformat(row["created_at"]),
-                            updated_at=datetime.fromisoformat(row["updated_at"]),
-                            items=[],
-                        )
-                    )
+    def get_total(self, cart_id: int) -> Money:
+        """
+        total of the cart kept by the carts_total triggers, Money(0) if it does not exist
+        """
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT total FROM carts WHERE id = ?", (cart_id,))
+                row = cur.fetchone()
+                return Money(row["total"]) if row is not None else Money(0)
 
-                return carts
+        except Exception as e:
+            print("DB Error: ", e)
+            return Money(0)
+
+    def get_all(self, cart_filter: Optional[CartFilter] = None) -> List[Cart]:
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.row_factory = CART_ROW
+                conditions, params = self.__where(cart_filter)
+                query = "SELECT id, paid, paid_at, created_at, updated_at FROM carts"
+                if conditions:
+                    query += " WHERE " + " AND ".join(conditions)
+                # the filters may pick an index, keep the listing in id order
+                query += " ORDER BY id"
+                cur.execute(query, params)
+                return cur.fetchall()
 
         except Exception as e:
             print("DB Error: ", e)
             return []
 
+    def get_page(
+        self,
+        after: Optional[Cursor] = None,
+        limit: int = 100,
+        sort: str = "id",
+        descending: bool = False,
+        cart_filter: Optional[CartFilter] = None,
+    ) -> Page[Cart]:
+        """
+        returns up to limit carts following the cursor of the previous page
+        sort is one of CART_SORT_KEYS, the cost does not grow with the page number
+        """
+        sort_key = CART_SORT_KEYS.get(sort)
+        if sort_key is None:
+            raise ValueError(f"Unknown sort key {sort!r}")
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.row_factory = CART_ROW
+                conditions, params = self.__where(cart_filter)
+
+                if after is not None:
+                    condition, after_params = sort_key.after(after, descending)
+                    conditions.append(condition)
+                    params.extend(after_params)
+
+                query = "SELECT id, paid, paid_at, created_at, updated_at FROM carts"
+                if conditions:
+                    query += " WHERE " + " AND ".join(conditions)
+                query += f" ORDER BY {sort_key.order_by(descending)} LIMIT ?"
+                params.append(limit + 1)
+
+                cur.execute(query, params)
+                return sort_key.page(cur.fetchall(), limit)
+
+        except Exception as e:
+            print("DB Error: ", e)
+            return Page([])
+
+    def count_estimate(self, cart_filter: Optional[CartFilter] = None) -> int:
+        """
+        number of carts for scroll bars and page counts
+        without a filter this is the highest id, deleted carts are included
+        """
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                conditions, params = self.__where(cart_filter)
+                if conditions:
+                    cur.execute(
+                        "SELECT COUNT(*) FROM carts WHERE " + " AND ".join(conditions),
+                        params,
+                    )
+                else:
+                    cur.execute("SELECT COALESCE(MAX(id), 0) FROM carts")
+                return cur.fetchone()[0]
+
+        except Exception as e:
+            print("DB Error: ", e)
+            return 0
+
+    def __where(self, cart_filter: Optional[CartFilter]) -> Tuple[List[str], List[Any]]:
+        conditions: List[str] = []
+        params: List[Any] = []
+        if cart_filter is None:
+            return conditions, params
+
+        paid = cart_filter.paid
+        # only paid carts have a paid_at, the equality lets the range use idx_carts_paid_paid_at
+        if paid is None and (
+            cart_filter.paid_from is not None or cart_filter.paid_to is not None
+        ):
+            paid = True
+        if paid is not None:
+            conditions.append("paid = ?")
+            params.append(paid)
+        if cart_filter.paid_from is not None:
+            conditions.append("paid_at >= ?")
+            params.append(int(cart_filter.paid_from.timestamp()))
+        if cart_filter.paid_to is not None:
+            conditions.append("paid_at < ?")
+            params.append(int(cart_filter.paid_to.timestamp()))
+        if cart_filter.min_total is not None:
+            conditions.append("total >= ?")
+            params.append(cart_filter.min_total)
+        if cart_filter.max_total is not None:
+            conditions.append("total <= ?")
+            params.append(cart_filter.max_total)
+        return conditions, params
+
     def update(self, cart: Cart) -> bool:
         try:
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
                 cur.execute(
                     "UPDATE carts SET paid = ?, paid_at = ? WHERE id = ?",
-                    (cart.paid, cart.paid_at, cart.id),
+                    (cart.paid, cart.paid_ts, cart.id),
                 )
 
                 return cur.rowcount == 1
@@ -102,9 +215,26 @@ class CartRepo:
             print("DB Error: ", e)
             return False
 
+    def mark_paid(self, cart: Cart) -> bool:
+        """
+        sets paid and paid_at of an open cart, False if the cart is missing or already paid
+        """
+        try:
+            with self.db.write() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    "UPDATE carts SET paid = 1, paid_at = ? WHERE id = ? AND paid = 0",
+                    (cart.paid_ts, cart.id),
+                )
+                return cur.rowcount == 1
+
+        except Exception as e:
+            print("DB Error: ", e)
+            return False
+
     def delete(self, cart: Cart) -> bool:
         try:
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
                 cur.execute("DELETE FROM carts WHERE id = ?", (cart.id,))
                 return cur.rowcount == 1
@@ -1,8 +1,10 @@
 import sqlite3
 from typing import List
 from app.db.db import DB
+from app.db.row_factory import row_factory
 from app.models.category import Category
-from datetime import datetime
+
+CATEGORY_ROW = row_factory(Category, ("id", "name", "created_ts", "updated_ts"))
 
 
 class CategoryRepo:
@@ -11,7 +13,7 @@ class CategoryRepo:
 
     def create(self, name: str) -> int | None:
         try:
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
                 cur.execute("INSERT INTO categories (name) VALUES(?)", (name,))
                 return cur.lastrowid
@@ -21,49 +23,32 @@ class CategoryRepo:
 
     def get_one(self, id: int) -> Category | None:
         try:
-            with self.db.connect() as conn:
+            with self.db.read() as conn:
                 cur = conn.cursor()
+                cur.row_factory = CATEGORY_ROW
                 cur.execute(
                     "SELECT id, name, created_at, updated_at FROM categories WHERE id = ?",
                     (id,),
                 )
-                row = cur.fetchone()
-                if row is None:
-                    return None
-                return Category(
-                    id=row["id"],
-                    name=row["name"],
-                    created_at=datetime.fromisoformat(row["created_at"]),
-                    updated_at=datetime.fromisoformat(row["updated_at"]),
-                )
+                return cur.fetchone()
         except Exception as e:
             print("DB Error: ", e)
             return None
 
     def get_all(self) -> List[Category]:
         try:
-            with self.db.connect() as conn:
-                categories = []
+            with self.db.read() as conn:
                 cur = conn.cursor()
+                cur.row_factory = CATEGORY_ROW
                 cur.execute("SELECT id, name, created_at, updated_at FROM categories")
-                rows = cur.fetchall()
-                for row in rows:
-                    categories.append(
-                        Category(
-                            id=row["id"],
-                            name=row["name"],
-                            created_at=datetime.fromisoformat(row["created_at"]),
-                            updated_at=datetime.fromisoformat(row["updated_at"]),
-                        )
-                    )
-                return categories
+                return cur.fetchall()
         except sqlite3.Error as e:
             print("DB Error: ", e)
             return []
 
     def update(self, category: Category) -> bool:
         try:
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
                 cur.execute(
                     "UPDATE categories SET name = ? WHERE id = ?",
@@ -76,7 +61,7 @@ class CategoryRepo:
 
     def delete(self, category: Category) -> bool:
         try:
-            with self.db.connect() as conn:
+            with self.db.write() as conn:
                 cur = conn.cursor()
                 cur.execute("DELETE from categories WHERE id = ?", (category.id,))
                 return cur.rowcount == 1
@@ -0,0 +1,67 @@
+from typing import Optional
+from app.db.db import DB
+from app.db.row_factory import row_factory
+from app.models.cart import Cart
+from app.models.money import Money
+from app.models.receipt import Receipt
+from app.models.receipt_record import ReceiptRecord
+
+RECEIPT_ROW = row_factory(
+    ReceiptRecord,
+    ("cart_id", "number", "total", "item_count", "paid_ts", "body"),
+    converters={"total": Money},
+)
+
+
+class ReceiptRepo:
+    def __init__(self, db: DB) -> None:
+        self.db = db
+
+    def create(
+        self, cart: Cart, number: str, receipt: Receipt, body: str
+    ) -> Optional[ReceiptRecord]:
+        """
+        stores the receipt of a paid cart, a cart can only have one receipt
+        """
+        if cart.paid_ts is None:
+            print(f"Cart with id {cart.id} has no paid_at")
+            return None
+        try:
+            with self.db.write() as conn:
+                cur = conn.cursor()
+                cur.row_factory = RECEIPT_ROW
+                cur.execute(
+                    """
+                    INSERT INTO receipts (cart_id, number, total, item_count, paid_at, body)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    RETURNING cart_id, number, total, item_count, paid_at, body
+                    """,
+                    (
+                        cart.id,
+                        number,
+                        receipt.total(),
+                        sum(item.quantity for item in receipt.items),
+                        cart.paid_ts,
+                        body,
+                    ),
+                )
+                return cur.fetchone()
+
+        except Exception as e:
+            print("DB Error: ", e)
+            return None
+
+    def get_one(self, cart_id: int) -> Optional[ReceiptRecord]:
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.row_factory = RECEIPT_ROW
+                cur.execute(
+                    "SELECT cart_id, number, total, item_count, paid_at, body FROM receipts WHERE cart_id = ?",
+                    (cart_id,),
+                )
+                return cur.fetchone()
+
+        except Exception as e:
+            print("DB Error: ", e)
+            return None
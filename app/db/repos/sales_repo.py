@@ -0,0 +1,122 @@
+from datetime import date
+from typing import List, Optional
+from app.db.db import DB
+from app.db.row_factory import row_factory
+from app.models.article_sales import ArticleSales
+from app.models.category_sales import CategorySales
+from app.models.money import Money
+from app.models.sales_summary import SalesSummary
+
+SALES_SUMMARY_ROW = row_factory(
+    SalesSummary,
+    ("period", "revenue", "carts", "items"),
+    converters={"revenue": Money},
+)
+ARTICLE_SALES_ROW = row_factory(
+    ArticleSales,
+    ("article_id", "article_name", "category_id", "quantity", "revenue"),
+    converters={"revenue": Money},
+)
+CATEGORY_SALES_ROW = row_factory(
+    CategorySales,
+    ("category_id", "category_name", "quantity", "revenue"),
+    converters={"revenue": Money},
+)
+
+
+class SalesRepo:
+    """
+    reads the sales tables, the triggers of migration 8 fill them when a cart is paid
+    all date ranges are inclusive and use local time days
+    """
+
+    def __init__(self, db: DB) -> None:
+        self.db = db
+
+    def get_daily(self, day_from: date, day_to: date) -> List[SalesSummary]:
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.row_factory = SALES_SUMMARY_ROW
+                cur.execute(
+                    "SELECT day, revenue, carts, items FROM sales_daily WHERE day BETWEEN ? AND ? ORDER BY day",
+                    (day_from.isoformat(), day_to.isoformat()),
+                )
+                return cur.fetchall()
+        except Exception as e:
+            print("DB Error: ", e)
+            return []
+
+    def get_hourly(self, day: date) -> List[SalesSummary]:
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.row_factory = SALES_SUMMARY_ROW
+                # every hour of the day sorts between "day" and "day ~"
+                cur.execute(
+                    "SELECT hour, revenue, carts, items FROM sales_hourly WHERE hour BETWEEN ? AND ? ORDER BY hour",
+                    (day.isoformat(), f"{day.isoformat()} ~"),
+                )
+                return cur.fetchall()
+        except Exception as e:
+            print("DB Error: ", e)
+            return []
+
+    def get_by_article(
+        self, day_from: date, day_to: date, limit: Optional[int] = None
+    ) -> List[ArticleSales]:
+        """
+        best selling articles first, name and category are the ones of the latest sale
+        """
+        # with a single MAX() SQLite takes the bare columns from the row of the latest day,
+        # the row factory ignores the trailing MAX(day)
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.row_factory = ARTICLE_SALES_ROW
+                cur.execute(
+                    """
+                    SELECT
+                        article_id,
+                        article_name,
+                        category_id,
+                        SUM(quantity),
+                        SUM(revenue) AS revenue,
+                        MAX(day)
+                    FROM sales_by_article_daily
+                    WHERE day BETWEEN ? AND ?
+                    GROUP BY article_id
+                    ORDER BY revenue DESC, article_id
+                    LIMIT ?
+                    """,
+                    (
+                        day_from.isoformat(),
+                        day_to.isoformat(),
+                        limit if limit is not None else -1,
+                    ),
+                )
+                return cur.fetchall()
+        except Exception as e:
+            print("DB Error: ", e)
+            return []
+
+    def get_by_category(self, day_from: date, day_to: date) -> List[CategorySales]:
+        try:
+            with self.db.read() as conn:
+                cur = conn.cursor()
+                cur.row_factory = CATEGORY_SALES_ROW
+                cur.execute(
+                    """
+                    SELECT s.category_id, c.name, SUM(s.quantity), SUM(s.revenue) AS revenue
+                    FROM sales_by_article_daily s
+                    LEFT JOIN categories c ON c.id = s.category_id
+                    WHERE s.day BETWEEN ? AND ?
+                    GROUP BY s.category_id
+                    ORDER BY revenue DESC, s.category_id
+                    """,
+                    (day_from.isoformat(), day_to.isoformat()),
+                )
+                return cur.fetchall()
+        except Exception as e:
+            print("DB Error: ", e)
+            return []
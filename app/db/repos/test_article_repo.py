@@ -1,9 +1,12 @@
+import contextlib
+import io
 import unittest
 
 from app.db.db import DB
 from app.models.article import Article
 from app.db.repos.article_repo import ArticleRepo
 from app.db.repos.category_repo import CategoryRepo
+from app.models.money import Money
 
 
 class TestArticleRepo(unittest.TestCase):
@@ -11,23 +14,42 @@ class TestArticleRepo(unittest.TestCase):
         self.db = DB(":memory:")
         self.category_repo = CategoryRepo(self.db)
         self.category_id = self.category_repo.create("Testcategory")
-        self.article_repo = ArticleRepo(self.db, self.category_repo)
+        self.article_repo = ArticleRepo(self.db)
 
     def tearDown(self) -> None:
         self.db.close()
 
     def test_create(self):
         assert self.category_id is not None
-        article_id = self.article_repo.create("Testarticle", 1.5, self.category_id)
+        article_id = self.article_repo.create(
+            "Testarticle", Money(150), self.category_id
+        )
         self.assertEqual(article_id, 1)
 
+    def test_create_constraint_errors(self):
+        assert self.category_id is not None
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertIsNone(self.article_repo.create("Testarticle", Money(150), 999))
+            self.assertIsNone(
+                self.article_repo.create(None, Money(150), self.category_id)  # type: ignore
+            )
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "Category with id 999 not found")
+        self.assertIn("NOT NULL constraint failed: articles.name", lines[1])
+
     def test_get_one(self):
         assert self.category_id is not None
-        article_id = self.article_repo.create("Testarticle", 1.5, self.category_id)
+        article_id = self.article_repo.create(
+            "Testarticle", Money(150), self.category_id
+        )
         assert article_id is not None
         result = self.article_repo.get_one(article_id)
         expected = Article(
-            id=article_id, name="Testarticle", price=1.5, category_id=self.category_id
+            id=article_id,
+            name="Testarticle",
+            price=Money(150),
+            category_id=self.category_id,
         )
         self.assertEqual(result, expected)
 
@@ -36,15 +58,21 @@ class TestArticleRepo(unittest.TestCase):
 
     def test_get_all_without_category(self):
         assert self.category_id is not None
-        self.article_repo.create("Testarticle 1", 1.50, self.category_id)
-        self.article_repo.create("Testarticle 2", 1.80, self.category_id)
+        self.article_repo.create("Testarticle 1", Money(150), self.category_id)
+        self.article_repo.create("Testarticle 2", Money(180), self.category_id)
         articles = self.article_repo.get_all()
         expected = [
             Article(
-                id=1, name="Testarticle 1", price=1.50, category_id=self.category_id
+                id=1,
+                name="Testarticle 1",
+                price=Money(150),
+                category_id=self.category_id,
             ),
             Article(
-                id=2, name="Testarticle 2", price=1.80, category_id=self.category_id
+                id=2,
+                name="Testarticle 2",
+                price=Money(180),
+                category_id=self.category_id,
             ),
         ]
         self.assertEqual(articles, expected)
@@ -55,16 +83,20 @@ class TestArticleRepo(unittest.TestCase):
         assert self.category_id is not None
         assert category_2 is not None
 
-        self.article_repo.create("Testarticle 1", 1.50, self.category_id)
-        self.article_repo.create("Testarticle 2", 1.80, self.category_id)
-        self.article_repo.create("Testarticle 3", 1.80, category_2)
-        self.article_repo.create("Testarticle 4", 1.90, category_2)
+        self.article_repo.create("Testarticle 1", Money(150), self.category_id)
+        self.article_repo.create("Testarticle 2", Money(180), self.category_id)
+        self.article_repo.create("Testarticle 3", Money(180), category_2)
+        self.article_repo.create("Testarticle 4", Money(190), category_2)
 
         articles = self.article_repo.get_all(category_id=category_2)
 
         expected = [
-            Article(id=3, name="Testarticle 3", price=1.80, category_id=category_2),
-            Article(id=4, name="Testarticle 4", price=1.90, category_id=category_2),
+            Article(
+                id=3, name="Testarticle 3", price=Money(180), category_id=category_2
+            ),
+            Article(
+                id=4, name="Testarticle 4", price=Money(190), category_id=category_2
+            ),
         ]
 
         self.assertEqual(articles, expected)
@@ -72,13 +104,16 @@ class TestArticleRepo(unittest.TestCase):
     def test_get_all_with_search_text(self):
         assert self.category_id is not None
 
-        self.article_repo.create("Testarticle 1", 1.50, self.category_id)
-        self.article_repo.create("Testarticle 2", 1.80, self.category_id)
+        self.article_repo.create("Testarticle 1", Money(150), self.category_id)
+        self.article_repo.create("Testarticle 2", Money(180), self.category_id)
 
         articles = self.article_repo.get_all(search_text="1")
         expected = [
             Article(
-                id=1, name="Testarticle 1", price=1.50, category_id=self.category_id
+                id=1,
+                name="Testarticle 1",
+                price=Money(150),
+                category_id=self.category_id,
             ),
         ]
 
@@ -87,28 +122,32 @@ class TestArticleRepo(unittest.TestCase):
     def test_update(self):
         assert self.category_id is not None
 
-        article_id = self.article_repo.create("Testarticle", 1.45, self.category_id)
+        article_id = self.article_repo.create(
+            "Testarticle", Money(145), self.category_id
+        )
         assert article_id is not None
 
         article = self.article_repo.get_one(article_id)
         assert article is not None
 
         article.name = "Testarticle 2"
-        article.price = 2.05
+        article.price = Money(205)
         updated = self.article_repo.update(article)
         assert updated is True
 
         article_updated = self.article_repo.get_one(article_id)
         assert article_updated is not None
         expected = Article(
-            id=1, name="Testarticle 2", price=2.05, category_id=self.category_id
+            id=1, name="Testarticle 2", price=Money(205), category_id=self.category_id
         )
         self.assertEqual(article_updated, expected)
 
     def test_delete(self):
         assert self.category_id is not None
 
-        article_id = self.article_repo.create("Testarticle", 1.45, self.category_id)
+        article_id = self.article_repo.create(
+            "Testarticle", Money(145), self.category_id
+        )
         assert article_id is not None
 
         article = self.article_repo.get_one(article_id)
@@ -118,3 +157,160 @@ class TestArticleRepo(unittest.TestCase):
         assert deleted is True
 
         self.assertIsNone(self.article_repo.get_one(article_id))
+
+    def test_search_prefix(self):
+        assert self.category_id is not None
+
+        self.article_repo.create("Mineral Water", Money(150), self.category_id)
+        self.article_repo.create("Orange Juice", Money(280), self.category_id)
+
+        articles = self.article_repo.search("min wat")
+        expected = [
+            Article(
+                id=1,
+                name="Mineral Water",
+                price=Money(150),
+                category_id=self.category_id,
+            ),
+        ]
+
+        self.assertEqual(articles, expected)
+
+    def test_search_ranking_and_limit(self):
+        assert self.category_id is not None
+
+        self.article_repo.create(
+            "Apple Juice Large Bottle", Money(300), self.category_id
+        )
+        self.article_repo.create("Apple", Money(100), self.category_id)
+        self.article_repo.create("Apple Pie", Money(400), self.category_id)
+
+        articles = self.article_repo.search("apple", limit=2)
+
+        self.assertEqual([article.id for article in articles], [2, 3])
+
+    def test_search_follows_updates_and_deletes(self):
+        assert self.category_id is not None
+
+        article_id = self.article_repo.create("Coffee", Money(350), self.category_id)
+        assert article_id is not None
+        article = self.article_repo.get_one(article_id)
+        assert article is not None
+
+        article.name = "Espresso"
+        self.article_repo.update(article)
+        self.assertEqual(self.article_repo.search("coffee"), [])
+        self.assertEqual(self.article_repo.search("espr"), [article])
+
+        self.article_repo.delete(article)
+        self.assertEqual(self.article_repo.search("espr"), [])
+
+    def test_search_ignores_query_syntax(self):
+        assert self.category_id is not None
+
+        self.article_repo.create("Tea", Money(200), self.category_id)
+
+        self.assertEqual(self.article_repo.search('"'), [])
+        self.assertEqual(len(self.article_repo.search("tea OR NEAR(")), 0)
+
+    def test_get_by_name(self):
+        assert self.category_id is not None
+
+        self.article_repo.create("Mineral Water", Money(150), self.category_id)
+        self.article_repo.create("Mineral Water Large", Money(250), self.category_id)
+
+        articles = self.article_repo.get_by_name("mineral water")
+        expected = [
+            Article(
+                id=1,
+                name="Mineral Water",
+                price=Money(150),
+                category_id=self.category_id,
+            ),
+        ]
+
+        self.assertEqual(articles, expected)
+
+    def test_get_by_barcode(self):
+        assert self.category_id is not None
+
+        article_id = self.article_repo.create(
+            "Mineral Water", Money(150), self.category_id, " 7610000000017\n"
+        )
+        self.article_repo.create("Bread", Money(300), self.category_id)
+
+        article = self.article_repo.get_by_barcode("7610000000017")
+        assert article is not None
+        self.assertEqual(article.id, article_id)
+        self.assertEqual(article.barcode, "7610000000017")
+        self.assertIsNone(self.article_repo.get_by_barcode("4000000000000"))
+        self.assertIsNone(self.article_repo.get_by_barcode(" "))
+
+    def test_barcode_unique(self):
+        assert self.category_id is not None
+
+        self.article_repo.create("Water", Money(150), self.category_id, "123")
+        self.assertIsNone(
+            self.article_repo.create("Other", Money(150), self.category_id, "123")
+        )
+
+        # articles without a barcode do not collide
+        self.assertIsNotNone(
+            self.article_repo.create("A", Money(100), self.category_id, "")
+        )
+        self.assertIsNotNone(
+            self.article_repo.create("B", Money(100), self.category_id)
+        )
+
+        article = self.article_repo.get_by_barcode("123")
+        assert article is not None
+        article.barcode = "456"
+        self.assertTrue(self.article_repo.update(article))
+        self.assertIsNone(self.article_repo.get_by_barcode("123"))
+        self.assertIsNotNone(self.article_repo.get_by_barcode("456"))
+
+    def test_get_page(self):
+        assert self.category_id is not None
+        other_category_id = self.category_repo.create("Other")
+        assert other_category_id is not None
+        for name in ["delta", "Alpha", "charlie", "bravo", "alpha"]:
+            self.article_repo.create(name, Money(100), self.category_id)
+        self.article_repo.create("echo", Money(100), other_category_id)
+
+        first = self.article_repo.get_page(limit=4)
+        self.assertEqual([article.id for article in first.items], [1, 2, 3, 4])
+        self.assertEqual(first.next_cursor, (4,))
+        second = self.article_repo.get_page(after=first.next_cursor, limit=4)
+        self.assertEqual([article.id for article in second.items], [5, 6])
+        self.assertFalse(second.has_more)
+
+        # ties on the name are broken by the id, pages never overlap
+        names = []
+        cursor = None
+        while True:
+            page = self.article_repo.get_page(
+                self.category_id, after=cursor, limit=2, sort="name"
+            )
+            names += [article.name for article in page.items]
+            if not page.has_more:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(names, ["Alpha", "alpha", "bravo", "charlie", "delta"])
+
+        page = self.article_repo.get_page(limit=3, sort="name", descending=True)
+        self.assertEqual(
+            [article.name for article in page.items], ["echo", "delta", "charlie"]
+        )
+
+    def test_get_page_unknown_sort(self):
+        with self.assertRaises(ValueError):
+            self.article_repo.get_page(sort="price")
+
+    def test_count_estimate(self):
+        assert self.category_id is not None
+        self.assertEqual(self.article_repo.count_estimate(), 0)
+        self.article_repo.create("Mineral Water", Money(150), self.category_id)
+        self.article_repo.create("Orange Juice", Money(250), self.category_id)
+        self.assertEqual(self.article_repo.count_estimate(), 2)
+        self.assertEqual(self.article_repo.count_estimate(self.category_id), 2)
+        self.assertEqual(self.article_repo.count_estimate(self.category_id + 1), 0)
@@ -0,0 +1,265 @@
+import sqlite3
+import unittest
+
+from app.db.db import DB
+from app.db.repos.article_repo import ArticleRepo
+from app.db.repos.cached_article_repo import CachedArticleRepo
+from app.db.repos.category_repo import CategoryRepo
+from app.models.article import Article
+from app.models.money import Money
+
+
+class TestCachedArticleRepo(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = DB(":memory:")
+        self.category_repo = CategoryRepo(self.db)
+        self.category_id = self.category_repo.create("Testcategory")
+        self.category2_id = self.category_repo.create("Testcategory 2")
+        assert self.category_id is not None
+        assert self.category2_id is not None
+        self.article_repo = CachedArticleRepo(self.db)
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_get_one_hit(self):
+        assert self.category_id is not None
+        article_id = self.article_repo.create(
+            "Testarticle", Money(150), self.category_id
+        )
+        assert article_id is not None
+
+        first = self.article_repo.get_one(article_id)
+        second = self.article_repo.get_one(article_id)
+
+        expected = Article(
+            id=article_id,
+            name="Testarticle",
+            price=Money(150),
+            category_id=self.category_id,
+        )
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+        self.assertEqual(self.article_repo.stats().hits, 2)
+        self.assertEqual(self.article_repo.stats().misses, 0)
+
+    def test_returned_articles_are_copies(self):
+        assert self.category_id is not None
+        article_id = self.article_repo.create(
+            "Testarticle", Money(150), self.category_id
+        )
+        assert article_id is not None
+
+        article = self.article_repo.get_one(article_id)
+        assert article is not None
+        article.name = "Changed"
+
+        cached = self.article_repo.get_one(article_id)
+        assert cached is not None
+        self.assertEqual(cached.name, "Testarticle")
+
+    def test_failed_warm_does_not_complete(self):
+        assert self.category_id is not None
+        ArticleRepo(self.db).create("Mineral Water", Money(150), self.category_id)
+
+        conn = self.db.connect()
+        conn.set_progress_handler(lambda: 1, 1)
+        try:
+            self.article_repo.warm()
+        finally:
+            conn.set_progress_handler(None, 1)
+
+        articles = self.article_repo.get_all()
+        self.assertEqual([article.name for article in articles], ["Mineral Water"])
+        self.assertEqual(len(self.article_repo.get_all(self.category_id)), 1)
+
+    def test_get_all_by_category_served_from_memory(self):
+        assert self.category_id is not None
+        assert self.category2_id is not None
+        self.article_repo.create("Testarticle 1", Money(150), self.category_id)
+        self.article_repo.create("Testarticle 2", Money(180), self.category2_id)
+
+        first = self.article_repo.get_all(self.category2_id)
+        second = self.article_repo.get_all(self.category2_id)
+
+        expected = [
+            Article(
+                id=2,
+                name="Testarticle 2",
+                price=Money(180),
+                category_id=self.category2_id,
+            )
+        ]
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+        self.assertEqual(self.article_repo.stats().misses, 1)
+
+    def test_update_is_written_through(self):
+        assert self.category_id is not None
+        assert self.category2_id is not None
+        article_id = self.article_repo.create(
+            "Testarticle", Money(150), self.category_id
+        )
+        assert article_id is not None
+        self.article_repo.get_all()
+
+        article = self.article_repo.get_one(article_id)
+        assert article is not None
+        article.name = "Renamed"
+        article.category_id = self.category2_id
+        self.assertTrue(self.article_repo.update(article))
+
+        self.assertEqual(self.article_repo.get_all(self.category_id), [])
+        self.assertEqual(self.article_repo.get_all(self.category2_id), [article])
+        self.assertEqual(self.article_repo.get_by_name("renamed"), [article])
+
+    def test_update_caches_the_stored_row(self):
+        assert self.category_id is not None
+        article_id = self.article_repo.create(
+            "Testarticle", Money(150), self.category_id, " 7610000000017 "
+        )
+        assert article_id is not None
+        with self.db.write() as conn:
+            conn.execute("UPDATE articles SET updated_at = 0")
+        # the cache holds the row returned by the insert
+        article = self.article_repo.get_one(article_id)
+        assert article is not None
+        self.assertEqual(self.article_repo.stats().misses, 0)
+        self.assertEqual(article.barcode, "7610000000017")
+
+        article.price = Money(200)
+        self.assertTrue(self.article_repo.update(article))
+
+        cached = self.article_repo.get_one(article_id)
+        stored = ArticleRepo(self.db).get_one(article_id)
+        assert cached is not None and stored is not None
+        self.assertEqual(cached, stored)
+        self.assertEqual(cached.updated_ts, stored.updated_ts)
+        self.assertNotEqual(cached.updated_ts, 0)
+
+    def test_delete_is_written_through(self):
+        assert self.category_id is not None
+        article_id = self.article_repo.create(
+            "Testarticle", Money(150), self.category_id
+        )
+        assert article_id is not None
+        self.assertEqual(len(self.article_repo.search("test")), 1)
+
+        article = self.article_repo.get_one(article_id)
+        assert article is not None
+        self.assertTrue(self.article_repo.delete(article))
+
+        self.assertIsNone(self.article_repo.get_one(article_id))
+        self.assertEqual(self.article_repo.search("test"), [])
+
+    def test_search_hit(self):
+        assert self.category_id is not None
+        self.article_repo.create("Mineral Water", Money(150), self.category_id)
+
+        first = self.article_repo.search("min")
+        second = self.article_repo.search("  MIN ")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.article_repo.stats().hits, 1)
+
+    def test_interrupted_search_is_not_cached(self):
+        assert self.category_id is not None
+        self.article_repo.create("Mineral Water", Money(150), self.category_id)
+
+        # the in-memory database reads on its writer connection
+        conn = self.db.connect()
+        conn.set_progress_handler(lambda: 1, 1)
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                self.article_repo.search("min")
+        finally:
+            conn.set_progress_handler(None, 1)
+
+        articles = self.article_repo.search("min")
+        self.assertEqual([article.name for article in articles], ["Mineral Water"])
+        self.assertEqual(self.article_repo.stats().hits, 0)
+        self.assertEqual(self.article_repo.stats().misses, 2)
+
+    def test_invalidate_category(self):
+        assert self.category_id is not None
+        article_id = self.article_repo.create(
+            "Testarticle", Money(150), self.category_id
+        )
+        assert article_id is not None
+        self.article_repo.get_all()
+
+        category = self.category_repo.get_one(self.category_id)
+        assert category is not None
+        self.category_repo.delete(category)
+        self.article_repo.invalidate_category(self.category_id)
+
+        self.assertIsNone(self.article_repo.get_one(article_id))
+        self.assertEqual(self.article_repo.get_all(), [])
+
+    def test_get_by_barcode_served_from_memory(self):
+        assert self.category_id is not None
+        article_id = self.article_repo.create(
+            "Testarticle", Money(150), self.category_id, "7610000000017"
+        )
+        self.article_repo.create("Other", Money(250), self.category_id)
+        self.article_repo.warm()
+        self.assertEqual(self.article_repo.stats().misses, 1)
+
+        article = self.article_repo.get_by_barcode("7610000000017")
+        assert article is not None
+        self.assertEqual(article.id, article_id)
+        self.assertEqual(self.article_repo.stats().misses, 1)
+
+        article.barcode = "4000000000000"
+        self.assertTrue(self.article_repo.update(article))
+        self.assertIsNotNone(self.article_repo.get_by_barcode("4000000000000"))
+        self.assertEqual(self.article_repo.stats().misses, 1)
+
+        self.assertTrue(self.article_repo.delete(article))
+        self.assertIsNone(self.article_repo.get_by_barcode("4000000000000"))
+
+    def test_get_by_barcode_of_another_lane(self):
+        assert self.category_id is not None
+        self.article_repo.warm()
+        # written by another lane, this repo does not see the insert
+        article_id = ArticleRepo(self.db).create(
+            "Testarticle", Money(150), self.category_id, "7610000000017"
+        )
+
+        article = self.article_repo.get_by_barcode("7610000000017")
+        assert article is not None
+        self.assertEqual(article.id, article_id)
+        self.assertIsNotNone(self.article_repo.get_by_barcode("7610000000017"))
+        self.assertEqual(self.article_repo.stats().misses, 2)
+
+    def test_get_by_barcode_miss(self):
+        assert self.category_id is not None
+        article_id = self.article_repo.create(
+            "Testarticle", Money(150), self.category_id, "123"
+        )
+        self.article_repo.clear()
+
+        article = self.article_repo.get_by_barcode("123")
+        assert article is not None
+        self.assertEqual(article.id, article_id)
+        self.assertIsNotNone(self.article_repo.get_by_barcode("123"))
+        self.assertEqual(self.article_repo.stats().misses, 1)
+
+    def test_memory_bound_evicts_least_recently_used(self):
+        assert self.category_id is not None
+        article_repo = CachedArticleRepo(self.db, max_articles=2)
+        id1 = article_repo.create("Testarticle 1", Money(100), self.category_id)
+        id2 = article_repo.create("Testarticle 2", Money(200), self.category_id)
+        assert id1 is not None
+        assert id2 is not None
+
+        # touch article 1 so article 2 becomes the eviction candidate
+        article_repo.get_one(id1)
+        article_repo.create("Testarticle 3", Money(300), self.category_id)
+
+        stats = article_repo.stats()
+        self.assertEqual(stats.size, 2)
+        self.assertEqual(stats.evictions, 1)
+
+        self.assertIsNotNone(article_repo.get_one(id2))
+        self.assertEqual(article_repo.stats().misses, 1)
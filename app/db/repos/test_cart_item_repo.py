@@ -6,21 +6,26 @@ from app.db.repos.cart_item_repo import CartItemRepo
 from app.db.repos.cart_repo import CartRepo
 from app.db.repos.category_repo import CategoryRepo
 from app.models.cart_item import CartItem
+from app.models.money import Money
 
 
 class TestCartItemRepo(unittest.TestCase):
     def setUp(self) -> None:
         self.db = DB(":memory:")
         self.category_repo = CategoryRepo(self.db)
-        self.article_repo = ArticleRepo(self.db, self.category_repo)
+        self.article_repo = ArticleRepo(self.db)
         self.cart_repo = CartRepo(self.db)
-        self.cart_item_repo = CartItemRepo(self.db, self.cart_repo, self.article_repo)
+        self.cart_item_repo = CartItemRepo(self.db)
 
         self.category_id = self.category_repo.create("Testcategory")
         assert self.category_id is not None
 
-        self.article1_id = self.article_repo.create("Article 1", 1.5, self.category_id)
-        self.article2_id = self.article_repo.create("Article 2", 2.0, self.category_id)
+        self.article1_id = self.article_repo.create(
+            "Article 1", Money(150), self.category_id
+        )
+        self.article2_id = self.article_repo.create(
+            "Article 2", Money(200), self.category_id
+        )
 
         assert self.article1_id is not None
         assert self.article2_id is not None
@@ -28,13 +33,8 @@ class TestCartItemRepo(unittest.TestCase):
         self.article1 = self.article_repo.get_one(self.article1_id)
         self.article2 = self.article_repo.get_one(self.article2_id)
 
-        self.cart_id1 = self.cart_repo.create()
-        self.cart_id2 = self.cart_repo.create()
-        assert self.cart_id1 is not None
-        assert self.cart_id2 is not None
-
-        self.cart1 = self.cart_repo.get_one(self.cart_id1)
-        self.cart2 = self.cart_repo.get_one(self.cart_id2)
+        self.cart1 = self.cart_repo.create()
+        self.cart2 = self.cart_repo.create()
 
     def tearDown(self) -> None:
         self.db.close()
@@ -43,24 +43,90 @@ class TestCartItemRepo(unittest.TestCase):
         assert self.cart1 is not None
         assert self.article1 is not None
 
-        cart_item_id = self.cart_item_repo.create(self.cart1, self.article1, 2)
-        self.assertEqual(cart_item_id, 1)
+        cart_item = self.cart_item_repo.create(self.cart1, self.article1, 2)
+        expected = CartItem(
+            id=1,
+            article_id=self.article1.id,
+            cart_id=self.cart1.id,
+            quantity=2,
+            article_name=self.article1.name,
+            unit_price=Money(150),
+        )
+
+        self.assertEqual(cart_item, expected)
+        assert cart_item is not None
+        self.assertIsNotNone(cart_item.created_at)
+
+    def test_create_missing_article(self):
+        assert self.cart1 is not None
+        assert self.article1 is not None
+
+        self.article1.id = 99
+        self.assertIsNone(self.cart_item_repo.create(self.cart1, self.article1, 2))
+
+    def test_create_duplicate(self):
+        assert self.cart1 is not None
+        assert self.article1 is not None
+
+        self.assertIsNotNone(self.cart_item_repo.create(self.cart1, self.article1, 2))
+        self.assertIsNone(self.cart_item_repo.create(self.cart1, self.article1, 2))
+
+    def test_create_many(self):
+        assert self.cart1 is not None
+        assert self.article1 is not None
+        assert self.article2 is not None
+
+        items = [
+            CartItem(
+                id=0,
+                article_id=article.id,
+                cart_id=0,
+                quantity=quantity,
+                unit_price=article.price,
+                article_name=article.name,
+            )
+            for article, quantity in ((self.article1, 2), (self.article2, 1))
+        ]
+        self.assertTrue(self.cart_item_repo.create_many(self.cart1, items))
+
+        stored = self.cart_item_repo.get_all(self.cart1)
+        self.assertEqual(
+            [(item.article_id, item.quantity) for item in stored],
+            [(self.article1.id, 2), (self.article2.id, 1)],
+        )
+        self.assertEqual(self.cart_item_repo.get_total(self.cart1), Money(500))
+
+    def test_create_many_duplicate(self):
+        assert self.cart1 is not None
+        assert self.article1 is not None
+
+        item = CartItem(
+            id=0,
+            article_id=self.article1.id,
+            cart_id=0,
+            quantity=1,
+            unit_price=self.article1.price,
+            article_name=self.article1.name,
+        )
+        self.assertFalse(self.cart_item_repo.create_many(self.cart1, [item, item]))
+        # nothing of the batch is kept
+        self.assertEqual(self.cart_item_repo.get_all(self.cart1), [])
 
     def test_get_one(self):
         assert self.cart1 is not None
         assert self.article1 is not None
 
-        cart_item_id = self.cart_item_repo.create(self.cart1, self.article1, 2)
-        assert cart_item_id is not None
+        cart_item = self.cart_item_repo.create(self.cart1, self.article1, 2)
+        assert cart_item is not None
 
-        cart = self.cart_item_repo.get_one(cart_item_id)
+        cart = self.cart_item_repo.get_one(cart_item.id)
         expected = CartItem(
             id=1,
             article_id=self.article1.id,
             cart_id=self.cart1.id,
             quantity=2,
             article_name=self.article1.name,
-            unit_price=1.5,
+            unit_price=Money(150),
         )
 
         self.assertEqual(cart, expected)
@@ -74,13 +140,13 @@ class TestCartItemRepo(unittest.TestCase):
         assert self.article1 is not None
         assert self.article2 is not None
 
-        cart1_item1_id = self.cart_item_repo.create(self.cart1, self.article1, 2)
-        cart1_item2_id = self.cart_item_repo.create(self.cart1, self.article2, 4)
-        cart2_item1_id = self.cart_item_repo.create(self.cart2, self.article1, 2)
+        cart1_item1 = self.cart_item_repo.create(self.cart1, self.article1, 2)
+        cart1_item2 = self.cart_item_repo.create(self.cart1, self.article2, 4)
+        cart2_item1 = self.cart_item_repo.create(self.cart2, self.article1, 2)
 
-        assert cart1_item1_id is not None
-        assert cart1_item2_id is not None
-        assert cart2_item1_id is not None
+        assert cart1_item1 is not None
+        assert cart1_item2 is not None
+        assert cart2_item1 is not None
 
         cart_items = self.cart_item_repo.get_all()
         expected = [
@@ -118,13 +184,13 @@ class TestCartItemRepo(unittest.TestCase):
         assert self.article1 is not None
         assert self.article2 is not None
 
-        cart1_item1_id = self.cart_item_repo.create(self.cart1, self.article1, 2)
-        cart1_item2_id = self.cart_item_repo.create(self.cart1, self.article2, 4)
-        cart2_item1_id = self.cart_item_repo.create(self.cart2, self.article1, 2)
+        cart1_item1 = self.cart_item_repo.create(self.cart1, self.article1, 2)
+        cart1_item2 = self.cart_item_repo.create(self.cart1, self.article2, 4)
+        cart2_item1 = self.cart_item_repo.create(self.cart2, self.article1, 2)
 
-        assert cart1_item1_id is not None
-        assert cart1_item2_id is not None
-        assert cart2_item1_id is not None
+        assert cart1_item1 is not None
+        assert cart1_item2 is not None
+        assert cart2_item1 is not None
 
         cart_items = self.cart_item_repo.get_all(self.cart1)
 
@@ -156,14 +222,14 @@ class TestCartItemRepo(unittest.TestCase):
         assert self.cart1 is not None
         assert self.article1 is not None
 
-        cart_item_id = self.cart_item_repo.create(self.cart1, self.article1, 2)
-        assert cart_item_id is not None
+        cart_item = self.cart_item_repo.create(self.cart1, self.article1, 2)
+        assert cart_item is not None
 
-        cart = self.cart_item_repo.get_one(cart_item_id)
+        cart = self.cart_item_repo.get_one(cart_item.id)
         assert cart is not None
 
         cart.quantity = 9
-        cart.unit_price = 3
+        cart.unit_price = Money(300)
 
         updated = self.cart_item_repo.update(cart)
         self.assertTrue(updated)
@@ -175,7 +241,7 @@ class TestCartItemRepo(unittest.TestCase):
             cart_id=self.cart1.id,
             quantity=9,
             article_name=self.article1.name,
-            unit_price=3,
+            unit_price=Money(300),
         )
 
         self.assertEqual(cart_updated, expexted)
@@ -184,13 +250,27 @@ class TestCartItemRepo(unittest.TestCase):
         assert self.cart1 is not None
         assert self.article1 is not None
 
-        cart_item_id = self.cart_item_repo.create(self.cart1, self.article1, 2)
-        assert cart_item_id is not None
+        cart_item = self.cart_item_repo.create(self.cart1, self.article1, 2)
+        assert cart_item is not None
 
-        cart = self.cart_item_repo.get_one(cart_item_id)
+        cart = self.cart_item_repo.get_one(cart_item.id)
         assert cart is not None
 
         deleted = self.cart_item_repo.delete(cart)
         self.assertTrue(deleted)
 
         self.assertIsNone(self.cart_item_repo.get_one(cart.id))
+
+    def test_get_total(self):
+        assert self.cart1 is not None
+        assert self.article1 is not None
+        assert self.article2 is not None
+
+        self.cart_item_repo.create(self.cart1, self.article1, 3)
+        self.cart_item_repo.create(self.cart1, self.article2, 1)
+
+        total = self.cart_item_repo.get_total(self.cart1)
+
+        self.assertEqual(total, Money(650))
+        self.assertIsInstance(total, Money)
+        self.assertEqual(str(total), "6.50")
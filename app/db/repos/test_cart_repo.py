@@ -1,41 +1,49 @@
+from datetime import datetime
 import unittest
 
 from app.db.db import DB
 from app.db.repos.article_repo import ArticleRepo
+from app.db.repos.cart_item_repo import CartItemRepo
 from app.db.repos.cart_repo import CartRepo
 from app.db.repos.category_repo import CategoryRepo
 from app.models.cart import Cart
+from app.models.cart_filter import CartFilter
+from app.models.money import Money
 
 
 class TestCartRepo(unittest.TestCase):
     def setUp(self) -> None:
         self.db = DB(":memory:")
         self.category_repo = CategoryRepo(self.db)
-        self.article_repo = ArticleRepo(self.db, self.category_repo)
+        self.article_repo = ArticleRepo(self.db)
         self.cart_repo = CartRepo(self.db)
 
         self.category_id = self.category_repo.create("Testcategory")
         assert self.category_id is not None
 
         self.article1_id = self.article_repo.create(
-            "Testarticle1", 1.50, self.category_id
+            "Testarticle1", Money(150), self.category_id
         )
         self.article2_id = self.article_repo.create(
-            "Testarticle2", 1.80, self.category_id
+            "Testarticle2", Money(180), self.category_id
         )
 
     def tearDown(self) -> None:
         self.db.close()
 
     def test_create(self):
-        cart_id = self.cart_repo.create()
-        self.assertEqual(cart_id, 1)
+        cart = self.cart_repo.create()
+        expected = Cart(id=1, paid=False, items=[])
+
+        self.assertEqual(cart, expected)
+        assert cart is not None
+        self.assertIsNotNone(cart.created_at)
 
     def test_get_one(self):
-        cart_id = self.cart_repo.create()
-        assert cart_id is not None
+        created = self.cart_repo.create()
+        assert created is not None
 
-        cart = self.cart_repo.get_one(cart_id)
+        cart = self.cart_repo.get_one(created.id)
         expected = Cart(id=1, paid=False, items=[])
 
         self.assertEqual(cart, expected)
@@ -44,11 +52,11 @@ class TestCartRepo(unittest.TestCase):
         self.assertIsNone(self.cart_repo.get_one(99))
 
     def test_get_all(self):
-        cart1_id = self.cart_repo.create()
-        cart2_id = self.cart_repo.create()
+        cart1 = self.cart_repo.create()
+        cart2 = self.cart_repo.create()
 
-        assert cart1_id is not None
-        assert cart2_id is not None
+        assert cart1 is not None
+        assert cart2 is not None
 
         cart = self.cart_repo.get_all()
         expected = [
@@ -62,10 +70,7 @@ class TestCartRepo(unittest.TestCase):
         self.assertEqual(self.cart_repo.get_all(), [])
 
     def test_update(self):
-        cart_id = self.cart_repo.create()
-        assert cart_id is not None
-
-        cart = self.cart_repo.get_one(cart_id)
+        cart = self.cart_repo.create()
         assert cart is not None
 
         cart.paid = True
@@ -73,16 +78,133 @@ class TestCartRepo(unittest.TestCase):
         updated = self.cart_repo.update(cart)
         self.assertTrue(updated)
 
-        cart_updated = self.cart_repo.get_one(cart_id)
+        cart_updated = self.cart_repo.get_one(cart.id)
         expected = Cart(id=1, paid=True, items=[])
 
         self.assertEqual(cart_updated, expected)
 
-    def test_delete(self):
-        cart_id = self.cart_repo.create()
-        assert cart_id is not None
+    def test_paid_at_round_trip(self):
+        cart = self.cart_repo.create()
+        assert cart is not None
+
+        paid_at = datetime(2024, 1, 1, 12, 30, 15, 123456)
+        cart.paid = True
+        cart.paid_at = paid_at
+        self.assertTrue(self.cart_repo.update(cart))
+
+        cart_updated = self.cart_repo.get_one(cart.id)
+        assert cart_updated is not None
+        self.assertEqual(cart_updated.paid_ts, int(paid_at.timestamp()))
+        self.assertEqual(cart_updated.paid_at, paid_at.replace(microsecond=0))
+
+    def test_timestamps_are_parsed_lazily(self):
+        created = self.cart_repo.create()
+        assert created is not None
+
+        cart = self.cart_repo.get_one(created.id)
+        assert cart is not None
+        self.assertIsInstance(cart.created_ts, int)
+        self.assertIsNone(cart._created_at)
+
+        created_at = cart.created_at
+        assert created_at is not None
+        self.assertIs(cart._created_at, created_at)
+        self.assertEqual(int(created_at.timestamp()), cart.created_ts)
+
+    def test_get_page(self):
+        carts = [self.cart_repo.create() for _ in range(5)]
+        for cart in carts[1::2]:
+            assert cart is not None
+            cart.paid = True
+            cart.paid_at = datetime(2024, 1, 1, 12, 0)
+            self.cart_repo.update(cart)
+
+        first = self.cart_repo.get_page(limit=3, descending=True)
+        self.assertEqual([cart.id for cart in first.items], [5, 4, 3])
+        self.assertEqual(first.next_cursor, (3,))
+        second = self.cart_repo.get_page(after=first.next_cursor, descending=True)
+        self.assertEqual([cart.id for cart in second.items], [2, 1])
+        self.assertFalse(second.has_more)
+
+        paid = self.cart_repo.get_page(cart_filter=CartFilter(paid=True))
+        self.assertEqual([cart.id for cart in paid.items], [2, 4])
+        self.assertTrue(all(cart.paid for cart in paid.items))
+
+        self.assertEqual(self.cart_repo.count_estimate(), 5)
+        self.assertEqual(self.cart_repo.count_estimate(CartFilter(paid=True)), 2)
+
+    def test_get_all_filtered(self):
+        cart_item_repo = CartItemRepo(self.db)
+        article1 = self.article_repo.get_one(self.article1_id)
+        article2 = self.article_repo.get_one(self.article2_id)
+        assert article1 is not None and article2 is not None
+
+        carts = []
+        for day, quantity in [(1, 1), (2, 2), (3, 4)]:
+            cart = self.cart_repo.create()
+            assert cart is not None
+            cart_item_repo.create(cart, article1, quantity)
+            cart.paid = True
+            cart.paid_at = datetime(2024, 1, day, 12, 0)
+            self.cart_repo.update(cart)
+            carts.append(cart)
+        open_cart = self.cart_repo.create()
+        assert open_cart is not None
+        cart_item_repo.create(open_cart, article2, 1)
+
+        def ids(cart_filter):
+            return [cart.id for cart in self.cart_repo.get_all(cart_filter)]
+
+        self.assertEqual(ids(CartFilter(paid=False)), [open_cart.id])
+        self.assertEqual(ids(CartFilter(paid=True)), [cart.id for cart in carts])
+
+        # paid_to is exclusive, the range alone excludes open carts
+        self.assertEqual(
+            ids(
+                CartFilter(paid_from=datetime(2024, 1, 2), paid_to=datetime(2024, 1, 3))
+            ),
+            [carts[1].id],
+        )
+
+        # totals are 150, 300, 600 and 180 for the open cart
+        self.assertEqual(
+            ids(CartFilter(min_total=Money(180), max_total=Money(300))),
+            [carts[1].id, open_cart.id],
+        )
+        self.assertEqual(
+            ids(CartFilter(paid=True, min_total=Money(300))),
+            [carts[1].id, carts[2].id],
+        )
+
+    def test_total_follows_cart_items(self):
+        cart_item_repo = CartItemRepo(self.db)
+        article1 = self.article_repo.get_one(self.article1_id)
+        article2 = self.article_repo.get_one(self.article2_id)
+        assert article1 is not None and article2 is not None
+        cart = self.cart_repo.create()
+        assert cart is not None
+
+        def total():
+            with self.db.read() as conn:
+                row = conn.execute(
+                    "SELECT total FROM carts WHERE id = ?", (cart.id,)
+                ).fetchone()
+                return row[0]
+
+        item1 = cart_item_repo.create(cart, article1, 2)
+        item2 = cart_item_repo.create(cart, article2, 1)
+        assert item1 is not None and item2 is not None
+        self.assertEqual(total(), 480)
 
-        cart = self.cart_repo.get_one(cart_id)
+        item1.quantity = 3
+        cart_item_repo.update(item1)
+        self.assertEqual(total(), 630)
+
+        cart_item_repo.delete(item2)
+        self.assertEqual(total(), 450)
+
+    def test_delete(self):
+        cart = self.cart_repo.create()
         assert cart is not None
 
         deleted = self.cart_repo.delete(cart)
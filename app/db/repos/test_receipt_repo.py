@@ -0,0 +1,94 @@
+from datetime import datetime
+import sqlite3
+import unittest
+
+from app.db.db import DB, Rollback
+from app.db.repos.cart_repo import CartRepo
+from app.db.repos.receipt_repo import ReceiptRepo
+from app.models.money import Money
+from app.models.receipt import Receipt
+from app.models.receipt_item import ReceiptItem
+from app.models.receipt_record import ReceiptRecord
+
+
+class TestReceiptRepo(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = DB(":memory:")
+        self.cart_repo = CartRepo(self.db)
+        self.receipt_repo = ReceiptRepo(self.db)
+
+        self.paid_at = datetime(2024, 1, 1, 12, 30)
+        self.receipt = Receipt(
+            self.paid_at,
+            [ReceiptItem("Water", 2, Money(150)), ReceiptItem("Bread", 1, Money(400))],
+        )
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_create(self):
+        cart = self.cart_repo.create()
+        assert cart is not None
+        cart.paid_at = self.paid_at
+
+        record = self.receipt_repo.create(cart, "20240101-000001", self.receipt, "body")
+        expected = ReceiptRecord(
+            cart_id=cart.id,
+            number="20240101-000001",
+            total=Money(700),
+            item_count=3,
+            paid_ts=int(self.paid_at.timestamp()),
+            body="body",
+        )
+        self.assertEqual(record, expected)
+        self.assertEqual(self.receipt_repo.get_one(cart.id), expected)
+
+    def test_create_paid_cart(self):
+        cart = self.cart_repo.create()
+        assert cart is not None
+        cart.paid_at = self.paid_at
+        self.receipt_repo.create(cart, "20240101-000001", self.receipt, "first")
+
+        self.assertIsNone(
+            self.receipt_repo.create(cart, "20240101-000002", self.receipt, "second")
+        )
+        record = self.receipt_repo.get_one(cart.id)
+        assert record is not None
+        self.assertEqual(record.body, "first")
+
+    def test_create_rolls_back_unit(self):
+        cart = self.cart_repo.create()
+        other = self.cart_repo.create()
+        assert cart is not None and other is not None
+        cart.paid_at = self.paid_at
+        other.paid_at = self.paid_at
+        self.receipt_repo.create(cart, "20240101-000001", self.receipt, "body")
+
+        # the duplicate number fails after the cart update, which must be undone
+        with self.db.transaction():
+            self.assertTrue(self.cart_repo.mark_paid(other))
+            record = self.receipt_repo.create(
+                other, "20240101-000001", self.receipt, "body"
+            )
+            self.assertIsNone(record)
+            raise Rollback()
+        other_cart = self.cart_repo.get_one(other.id)
+        assert other_cart is not None
+        self.assertFalse(other_cart.paid)
+
+    def test_receipts_are_immutable(self):
+        cart = self.cart_repo.create()
+        assert cart is not None
+        cart.paid_at = self.paid_at
+        self.receipt_repo.create(cart, "20240101-000001", self.receipt, "body")
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.db.write() as conn:
+                conn.execute("UPDATE receipts SET body = 'changed'")
+
+    def test_get_one_negative(self):
+        self.assertIsNone(self.receipt_repo.get_one(999))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+from datetime import date, datetime
+import unittest
+
+from app.db.db import DB
+from app.db.repos.article_repo import ArticleRepo
+from app.db.repos.cart_item_repo import CartItemRepo
+from app.db.repos.cart_repo import CartRepo
+from app.db.repos.category_repo import CategoryRepo
+from app.db.repos.sales_repo import SalesRepo
+from app.models.article_sales import ArticleSales
+from app.models.category_sales import CategorySales
+from app.models.money import Money
+from app.models.sales_summary import SalesSummary
+
+
+class TestSalesRepo(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = DB(":memory:")
+        self.category_repo = CategoryRepo(self.db)
+        self.article_repo = ArticleRepo(self.db)
+        self.cart_repo = CartRepo(self.db)
+        self.cart_item_repo = CartItemRepo(self.db)
+        self.sales_repo = SalesRepo(self.db)
+
+        self.drinks_id = self.category_repo.create("Drinks")
+        self.food_id = self.category_repo.create("Food")
+        assert self.drinks_id is not None
+        assert self.food_id is not None
+
+        water_id = self.article_repo.create("Water", Money(150), self.drinks_id)
+        bread_id = self.article_repo.create("Bread", Money(400), self.food_id)
+        assert water_id is not None
+        assert bread_id is not None
+        self.water = self.article_repo.get_one(water_id)
+        self.bread = self.article_repo.get_one(bread_id)
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def pay(self, paid_at: datetime, water: int, bread: int):
+        cart = self.cart_repo.create()
+        assert cart is not None
+        assert self.water is not None and self.bread is not None
+        if water:
+            self.cart_item_repo.create(cart, self.water, water)
+        if bread:
+            self.cart_item_repo.create(cart, self.bread, bread)
+        cart.paid = True
+        cart.paid_at = paid_at
+        self.assertTrue(self.cart_repo.update(cart))
+        return cart
+
+    def test_get_daily(self):
+        self.pay(datetime(2024, 1, 1, 9, 15), water=2, bread=1)
+        self.pay(datetime(2024, 1, 1, 17, 45), water=1, bread=0)
+        self.pay(datetime(2024, 1, 2, 10, 0), water=0, bread=2)
+
+        self.assertEqual(
+            self.sales_repo.get_daily(date(2024, 1, 1), date(2024, 1, 2)),
+            [
+                SalesSummary("2024-01-01", Money(850), 2, 4),
+                SalesSummary("2024-01-02", Money(800), 1, 2),
+            ],
+        )
+        self.assertEqual(
+            self.sales_repo.get_daily(date(2024, 1, 3), date(2024, 1, 31)), []
+        )
+
+    def test_get_hourly(self):
+        self.pay(datetime(2024, 1, 1, 9, 15), water=2, bread=1)
+        self.pay(datetime(2024, 1, 1, 9, 45), water=1, bread=0)
+        self.pay(datetime(2024, 1, 1, 17, 0), water=0, bread=1)
+        self.pay(datetime(2024, 1, 2, 9, 0), water=0, bread=1)
+
+        self.assertEqual(
+            self.sales_repo.get_hourly(date(2024, 1, 1)),
+            [
+                SalesSummary("2024-01-01 09", Money(850), 2, 4),
+                SalesSummary("2024-01-01 17", Money(400), 1, 1),
+            ],
+        )
+
+    def test_cart_is_counted_once(self):
+        cart = self.pay(datetime(2024, 1, 1, 9, 15), water=2, bread=0)
+
+        # saving the paid cart again must not add it a second time
+        self.assertTrue(self.cart_repo.update(cart))
+        self.assertEqual(
+            self.sales_repo.get_daily(date(2024, 1, 1), date(2024, 1, 1)),
+            [SalesSummary("2024-01-01", Money(300), 1, 2)],
+        )
+
+    def test_get_by_article_and_category(self):
+        assert self.water is not None and self.bread is not None
+        self.pay(datetime(2024, 1, 1, 9, 15), water=2, bread=1)
+        self.pay(datetime(2024, 1, 2, 9, 15), water=4, bread=0)
+
+        self.assertEqual(
+            self.sales_repo.get_by_article(date(2024, 1, 1), date(2024, 1, 2)),
+            [
+                ArticleSales(self.water.id, "Water", self.drinks_id, 6, Money(900)),
+                ArticleSales(self.bread.id, "Bread", self.food_id, 1, Money(400)),
+            ],
+        )
+        self.assertEqual(
+            len(self.sales_repo.get_by_article(date(2024, 1, 1), date(2024, 1, 2), 1)),
+            1,
+        )
+
+        # the sales stay after the category is gone
+        category = self.category_repo.get_one(self.food_id)
+        assert category is not None
+        self.category_repo.delete(category)
+        self.assertEqual(
+            self.sales_repo.get_by_category(date(2024, 1, 1), date(2024, 1, 1)),
+            [
+                CategorySales(self.food_id, None, 1, Money(400)),
+                CategorySales(self.drinks_id, "Drinks", 2, Money(300)),
+            ],
+        )
+
+    def test_get_by_article_uses_latest_name_and_category(self):
+        assert self.bread is not None
+        self.pay(datetime(2024, 1, 1, 9, 15), water=0, bread=1)
+        self.bread.name = "Baguette"
+        self.bread.category_id = self.drinks_id
+        self.assertTrue(self.article_repo.update(self.bread))
+        self.pay(datetime(2024, 1, 2, 9, 15), water=0, bread=1)
+
+        self.assertEqual(
+            self.sales_repo.get_by_article(date(2024, 1, 1), date(2024, 1, 2)),
+            [ArticleSales(self.bread.id, "Baguette", self.drinks_id, 2, Money(800))],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import sqlite3
+from typing import Any, Callable, Dict, Optional, Sequence, Type, TypeVar
+
+T = TypeVar("T")
+
+RowFactory = Callable[[sqlite3.Cursor, tuple], T]
+
+
+def row_factory(
+    model: Type[T],
+    fields: Sequence[str],
+    converters: Optional[Dict[str, Callable[[Any], Any]]] = None,
+    defaults: Optional[Dict[str, Callable[[], Any]]] = None,
+) -> RowFactory[T]:
+    """
+    compiles a row factory that builds model straight from the row tuple
+    fields are the model fields in the order of the selected columns,
+    converters wrap a column value, defaults are called once per row (e.g. list)
+    """
+    converters = converters or {}
+    defaults = defaults or {}
+    namespace: Dict[str, Any] = {"model": model}
+    arguments = []
+
+    for index, name in enumerate(fields):
+        if name in converters:
+            namespace[f"convert_{name}"] = converters[name]
+            arguments.append(f"{name}=convert_{name}(row[{index}])")
+        else:
+            arguments.append(f"{name}=row[{index}]")
+
+    for name, default in defaults.items():
+        namespace[f"default_{name}"] = default
+        arguments.append(f"{name}=default_{name}()")
+
+    source = f"def factory(cursor, row):\n    return model({', '.join(arguments)})\n"
+    exec(compile(source, f"<row_factory {model.__name__}>", "exec"), namespace)
+    return namespace["factory"]
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from app.db.cart_journal import CartJournal
+from app.models.cart_item import CartItem
+from app.models.money import Money
+
+
+def cart_item(id: int, article_id: int, quantity: int) -> CartItem:
+    return CartItem(
+        id=id,
+        cart_id=0,
+        article_id=article_id,
+        quantity=quantity,
+        unit_price=Money(100 * article_id),
+        article_name=f"Article {article_id}",
+    )
+
+
+class TestCartJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cart.journal")
+        self.journal = CartJournal(self.path)
+
+    def tearDown(self) -> None:
+        self.journal.close()
+        self.tmp.cleanup()
+
+    def test_replay_missing_file(self):
+        self.assertEqual(self.journal.replay(), [])
+
+    def test_replay(self):
+        self.journal.add(cart_item(1, 1, 1))
+        self.journal.add(cart_item(2, 2, 1))
+        self.journal.add(cart_item(3, 3, 1))
+        self.journal.quantity(1, 4)
+        self.journal.remove(2)
+
+        replayed = CartJournal(self.path).replay()
+
+        self.assertEqual(replayed, [cart_item(1, 1, 4), cart_item(3, 3, 1)])
+        self.assertIsInstance(replayed[0].unit_price, Money)
+
+    def test_clear(self):
+        self.journal.add(cart_item(1, 1, 1))
+        self.journal.clear()
+        self.assertEqual(self.journal.replay(), [])
+
+        self.journal.add(cart_item(1, 2, 1))
+        self.assertEqual(self.journal.replay(), [cart_item(1, 2, 1)])
+
+    def test_checkout_token(self):
+        self.assertIsNone(self.journal.checkout_token())
+        self.journal.add(cart_item(1, 1, 1))
+        self.journal.checkout("first")
+        self.journal.checkout("second")
+
+        journal = CartJournal(self.path)
+        self.assertEqual(journal.checkout_token(), "second")
+        self.assertEqual(journal.replay(), [cart_item(1, 1, 1)])
+
+        self.journal.clear()
+        self.assertIsNone(journal.checkout_token())
+
+    def test_write_error(self):
+        journal = CartJournal(os.path.join(self.tmp.name, "missing", "cart.journal"))
+        self.assertFalse(journal.add(cart_item(1, 1, 1)))
+        self.assertTrue(self.journal.add(cart_item(1, 1, 1)))
+
+    def test_torn_last_line(self):
+        self.journal.add(cart_item(1, 1, 1))
+        self.journal.close()
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write('{"op": "add", "id": 2, "artic')
+
+        journal = CartJournal(self.path, fsync=True)
+        self.assertEqual(journal.replay(), [cart_item(1, 1, 1)])
+
+        # new lines are not glued to the torn one
+        journal.add(cart_item(2, 2, 1))
+        self.assertEqual(journal.replay(), [cart_item(1, 1, 1), cart_item(2, 2, 1)])
+        journal.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,11 @@
+import os
+import sqlite3
+import tempfile
+import time
 import unittest
 
-from app.db.db import DB
+from app.db.db import DB, Rollback
+from app.db.db_config import DBConfig
 
 
 class TestDB(unittest.TestCase):
@@ -30,3 +35,166 @@ class TestDB(unittest.TestCase):
         self.assertIsNotNone(cur.fetchone())
 
         conn.close()
+
+
+class TestDBFile(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cashier.db")
+        self.db = DB(config=DBConfig(path=self.path, readers=2))
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_wal_mode(self):
+        mode = self.db.connect().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_pragmas_from_config(self):
+        with self.db.read() as conn:
+            busy_timeout = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+            foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+        self.assertEqual(busy_timeout, 5000)
+        self.assertEqual(foreign_keys, 1)
+
+    def test_reader_is_read_only(self):
+        with self.db.read() as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO categories (name) VALUES ('x')")
+
+    def test_reader_sees_committed_writes(self):
+        with self.db.write() as conn:
+            conn.execute("INSERT INTO categories (name) VALUES ('x')")
+        with self.db.read() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_reader_pool_is_reused(self):
+        with self.db.read() as first:
+            pass
+        with self.db.read() as second:
+            pass
+        self.assertIs(first, second)
+
+    def test_busy_errors_are_counted(self):
+        # a second lane on the same file, it gives up waiting after 50 ms
+        other = DB(config=DBConfig(path=self.path, busy_timeout=50))
+        try:
+            with self.db.write():
+                with self.assertRaises(sqlite3.OperationalError):
+                    with other.write():
+                        pass
+            self.assertEqual(other.busy_errors, 1)
+            self.assertEqual(self.db.busy_errors, 0)
+
+            with other.write() as conn:
+                conn.execute("INSERT INTO categories (name) VALUES ('x')")
+            self.assertEqual(other.busy_errors, 1)
+        finally:
+            other.close()
+
+    def test_nested_write_rolls_back_as_a_whole(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.write() as conn:
+                conn.execute("INSERT INTO categories (name) VALUES ('x')")
+                with self.db.write() as inner:
+                    inner.execute("INSERT INTO categories (name) VALUES ('y')")
+                raise RuntimeError()
+        with self.db.read() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def count_categories(self) -> int:
+        # a separate connection only sees what is committed
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_nested_transaction_is_a_savepoint(self):
+        with self.db.transaction() as conn:
+            conn.execute("INSERT INTO categories (name) VALUES ('x')")
+            with self.assertRaises(RuntimeError):
+                with self.db.transaction() as inner:
+                    inner.execute("INSERT INTO categories (name) VALUES ('y')")
+                    raise RuntimeError()
+            # reads inside the unit see its uncommitted rows
+            with self.db.read() as reader:
+                names = reader.execute("SELECT name FROM categories").fetchall()
+            self.assertEqual([name[0] for name in names], ["x"])
+            self.assertEqual(self.count_categories(), 0)
+        self.assertEqual(self.count_categories(), 1)
+
+    def test_rollback_is_silent(self):
+        with self.db.transaction() as conn:
+            conn.execute("INSERT INTO categories (name) VALUES ('x')")
+            with self.db.transaction() as inner:
+                inner.execute("INSERT INTO categories (name) VALUES ('y')")
+                raise Rollback()
+        with self.db.transaction() as conn:
+            conn.execute("INSERT INTO categories (name) VALUES ('z')")
+            raise Rollback()
+        self.assertEqual(self.count_categories(), 1)
+
+
+class TestDBGroupCommit(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cashier.db")
+        self.db = DB(config=DBConfig(path=self.path, group_commit_ms=50))
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.tmp.cleanup()
+
+    def count_categories(self) -> int:
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_units_are_committed_together(self):
+        for name in ["x", "y", "z"]:
+            with self.db.write() as conn:
+                conn.execute("INSERT INTO categories (name) VALUES (?)", (name,))
+        self.assertEqual(self.count_categories(), 0)
+
+        # reads of this DB see the held back units
+        with self.db.read() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+        self.assertEqual(count, 3)
+
+        self.db.flush()
+        self.assertEqual(self.count_categories(), 3)
+
+    def test_timer_flushes(self):
+        with self.db.write() as conn:
+            conn.execute("INSERT INTO categories (name) VALUES ('x')")
+        deadline = time.monotonic() + 5
+        while self.count_categories() == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.count_categories(), 1)
+
+    def test_failed_unit_keeps_earlier_units(self):
+        with self.db.write() as conn:
+            conn.execute("INSERT INTO categories (name) VALUES ('x')")
+        with self.assertRaises(RuntimeError):
+            with self.db.write() as conn:
+                conn.execute("INSERT INTO categories (name) VALUES ('y')")
+                raise RuntimeError()
+        self.db.flush()
+        self.assertEqual(self.count_categories(), 1)
+
+
+class TestDBConfig(unittest.TestCase):
+    def test_profile(self):
+        config = DBConfig.profile("durable", "lane.db")
+        self.assertEqual(config.path, "lane.db")
+        self.assertEqual(config.synchronous, "FULL")
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            DBConfig.profile("unknown")
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from app.db.db import DB
+from app.db.executor import DBExecutor
+
+
+class TestDBExecutor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DB(os.path.join(self.tmp.name, "cashier.db"))
+        self.executor = DBExecutor(self.db)
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+        self.db.close()
+        self.tmp.cleanup()
+
+    async def test_run_on_db_thread(self):
+        name = await self.executor.run(lambda: threading.current_thread().name)
+        self.assertNotEqual(name, threading.current_thread().name)
+        self.assertTrue(name.startswith("db"))
+
+    async def test_run_in_order(self):
+        calls = []
+        await asyncio.gather(*(self.executor.run(calls.append, i) for i in range(10)))
+        self.assertEqual(calls, list(range(10)))
+
+    async def test_pending(self):
+        release = threading.Event()
+        blocked = asyncio.ensure_future(self.executor.run(release.wait))
+        queued = asyncio.ensure_future(self.executor.run(lambda: 1))
+        await asyncio.sleep(0)
+        self.assertEqual(self.executor.pending, 2)
+        release.set()
+        await asyncio.gather(blocked, queued)
+        self.assertEqual(self.executor.pending, 0)
+
+    async def test_pending_after_cancel(self):
+        release = threading.Event()
+        blocked = asyncio.ensure_future(self.executor.run(release.wait))
+        queued = asyncio.ensure_future(self.executor.run(lambda: 1))
+        await asyncio.sleep(0)
+        # a cancelled worker cancels its call before the DB thread starts it
+        queued.cancel()
+        release.set()
+        await blocked
+        with self.assertRaises(asyncio.CancelledError):
+            await queued
+        self.assertEqual(self.executor.pending, 0)
+
+    async def test_interrupt(self):
+        started = threading.Event()
+
+        def slow_query():
+            with self.db.read() as conn:
+                started.set()
+                conn.execute(
+                    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+                    "SELECT count(*) FROM c"
+                ).fetchone()
+
+        task = asyncio.ensure_future(self.executor.run(slow_query, tag="search"))
+        await asyncio.to_thread(started.wait)
+
+        # a different tag must not touch the running query
+        self.executor.interrupt("other")
+        self.assertFalse(task.done())
+
+        # sqlite ignores an interrupt that arrives before the statement started
+        while not task.done():
+            self.executor.interrupt("search")
+            await asyncio.sleep(0.01)
+        with self.assertRaises(sqlite3.OperationalError):
+            await task
+
+        # the executor keeps working after an interrupt
+        self.assertEqual(await self.executor.run(lambda: 1), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+import unittest
+
+from app.db.db import DB
+from app.db.db_config import DBConfig
+from app.db.instrumentation import Instrumentation, instrument, normalize_sql
+from app.db.repos.category_repo import CategoryRepo
+from app.models.operation_stats import LATENCY_BUCKETS_US, OperationStats
+
+
+class TestNormalizeSql(unittest.TestCase):
+    def test_literals_are_replaced(self):
+        self.assertEqual(
+            normalize_sql(
+                "SELECT * FROM articles\n  WHERE name = 'it''s' AND price > 2.5 AND id = 12"
+            ),
+            "SELECT * FROM articles WHERE name = ? AND price > ? AND id = ?",
+        )
+
+    def test_null_parameters_are_replaced(self):
+        self.assertEqual(
+            normalize_sql("INSERT INTO articles (name, barcode) VALUES('Water',NULL)"),
+            "INSERT INTO articles (name, barcode) VALUES(?,?)",
+        )
+        self.assertEqual(
+            normalize_sql("SELECT id FROM articles WHERE barcode IS NOT NULL"),
+            "SELECT id FROM articles WHERE barcode IS NOT NULL",
+        )
+        self.assertEqual(
+            normalize_sql("SELECT id FROM carts WHERE paid_at is null"),
+            "SELECT id FROM carts WHERE paid_at is null",
+        )
+
+    def test_identifiers_with_digits_are_kept(self):
+        self.assertEqual(
+            normalize_sql("SAVEPOINT sp1"),
+            "SAVEPOINT sp1",
+        )
+
+
+class TestOperationStats(unittest.TestCase):
+    def test_percentile_is_a_bucket_bound(self):
+        stats = OperationStats(calls=10, max_us=250000)
+        stats.histogram[0] = 9
+        stats.histogram[-1] = 1
+        self.assertEqual(stats.percentile_us(0.5), LATENCY_BUCKETS_US[0])
+        self.assertEqual(stats.percentile_us(1.0), 250000)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = DB(":memory:")
+        self.instrumentation = Instrumentation()
+        self.db.set_trace(self.instrumentation.trace)
+        self.category_repo = instrument(
+            CategoryRepo(self.db), self.instrumentation, "repo.category"
+        )
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_statements_and_rows_per_operation(self):
+        self.category_repo.create("Drinks")
+        self.category_repo.create("Food")
+        self.category_repo.get_all()
+
+        operations = self.instrumentation.operations()
+        self.assertEqual(operations["repo.category.create"].calls, 2)
+        self.assertGreaterEqual(operations["repo.category.create"].statements, 2)
+        self.assertEqual(operations["repo.category.get_all"].calls, 1)
+        self.assertEqual(operations["repo.category.get_all"].statements, 1)
+        self.assertEqual(operations["repo.category.get_all"].rows, 2)
+        self.assertEqual(sum(operations["repo.category.get_all"].histogram), 1)
+
+    def test_nested_operations_count_inner_statements(self):
+        with self.instrumentation.operation("ui.setup") as trace:
+            self.category_repo.create("Drinks")
+            self.category_repo.get_all()
+        operations = self.instrumentation.operations()
+        self.assertEqual(
+            operations["ui.setup"].statements,
+            operations["repo.category.create"].statements
+            + operations["repo.category.get_all"].statements,
+        )
+        self.assertEqual(
+            trace.templates[-1],
+            "SELECT id, name, created_at, updated_at FROM categories",
+        )
+
+    def test_errors_are_counted(self):
+        with self.assertRaises(RuntimeError):
+            with self.instrumentation.operation("failing"):
+                raise RuntimeError()
+        self.assertEqual(self.instrumentation.operations()["failing"].errors, 1)
+
+    def test_statement_templates(self):
+        self.category_repo.get_one(1)
+        self.category_repo.get_one(2)
+        templates = [
+            template
+            for template, count in self.instrumentation.statements().items()
+            if count == 2 and "WHERE id = ?" in template
+        ]
+        self.assertEqual(len(templates), 1)
+
+    def test_set_trace_none_stops_tracing(self):
+        self.db.set_trace(None)
+        self.category_repo.get_all()
+        self.assertEqual(self.instrumentation.statements(), {})
+        self.assertEqual(
+            self.instrumentation.operations()["repo.category.get_all"].statements, 0
+        )
+
+    def test_dump(self):
+        self.category_repo.get_all()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "instrumentation.json")
+            self.instrumentation.dump(path)
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        self.assertEqual(data["operations"]["repo.category.get_all"]["calls"], 1)
+        self.assertEqual(
+            len(data["operations"]["repo.category.get_all"]["histogram"]),
+            len(LATENCY_BUCKETS_US) + 1,
+        )
+
+    def test_reset(self):
+        self.category_repo.get_all()
+        self.instrumentation.reset()
+        self.assertEqual(self.instrumentation.operations(), {})
+        self.assertEqual(self.instrumentation.statements(), {})
+
+
+class TestInstrumentationFile(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DB(config=DBConfig(path=os.path.join(self.tmp.name, "cashier.db")))
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_readers_opened_later_are_traced(self):
+        instrumentation = Instrumentation()
+        self.db.set_trace(instrumentation.trace)
+        with instrumentation.operation("read") as trace:
+            with self.db.read() as conn:
+                conn.execute("SELECT COUNT(*) FROM categories").fetchone()
+        self.assertEqual(trace.templates, ["SELECT COUNT(*) FROM categories"])
@@ -0,0 +1,167 @@
+from datetime import datetime
+import sqlite3
+import unittest
+
+from app.db.db import DB
+from app.db.migrations import MIGRATIONS, Migration, latest_version, migrate
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = sqlite3.connect(":memory:")
+        self.addCleanup(self.conn.close)
+
+    def user_version(self) -> int:
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def index_names(self) -> set:
+        rows = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def test_fresh_database(self):
+        version = migrate(self.conn)
+        self.assertEqual(version, latest_version())
+        self.assertEqual(self.user_version(), latest_version())
+        self.assertTrue(
+            {
+                "idx_articles_category_id",
+                "idx_articles_name",
+                "idx_m2m_carts_articles_cart_id",
+                "idx_carts_paid_paid_at",
+                "idx_articles_category_id_name",
+                "idx_carts_paid",
+                "idx_carts_total",
+                "idx_articles_barcode",
+                "idx_carts_token",
+            }.issubset(self.index_names())
+        )
+
+    def test_legacy_database_keeps_data(self):
+        # a database created before versioning has the tables but user_version 0
+        for statement in MIGRATIONS[0].statements:
+            self.conn.execute(statement)
+        self.conn.execute("INSERT INTO categories (name) VALUES ('Drinks')")
+        self.conn.commit()
+
+        migrate(self.conn)
+
+        self.assertEqual(self.user_version(), latest_version())
+        names = self.conn.execute("SELECT name FROM categories").fetchall()
+        self.assertEqual(names, [("Drinks",)])
+
+    def test_prices_converted_to_minor_units(self):
+        migrate(self.conn, MIGRATIONS[:3])
+        self.conn.execute("INSERT INTO categories (name) VALUES ('Drinks')")
+        self.conn.execute(
+            "INSERT INTO articles (name, price, category_id) VALUES ('Water', 1.15, 1)"
+        )
+        self.conn.execute("INSERT INTO carts DEFAULT VALUES")
+        self.conn.execute(
+            "INSERT INTO m2m_carts_articles (article_id, cart_id, quantity, unit_price, article_name) VALUES (1, 1, 2, 1.15, 'Water')"
+        )
+        self.conn.commit()
+
+        migrate(self.conn)
+
+        price = self.conn.execute(
+            "SELECT price, typeof(price) FROM articles"
+        ).fetchone()
+        unit_price = self.conn.execute(
+            "SELECT unit_price FROM m2m_carts_articles"
+        ).fetchone()
+        self.assertEqual(price, (115, "integer"))
+        self.assertEqual(unit_price, (115,))
+
+        # existing carts get their total backfilled
+        total = self.conn.execute("SELECT total FROM carts").fetchone()
+        self.assertEqual(total, (230,))
+
+    def test_timestamps_converted_to_epoch(self):
+        migrate(self.conn, MIGRATIONS[:4])
+        self.conn.execute(
+            "INSERT INTO categories (name, created_at) VALUES ('Drinks', '2024-01-01 12:00:00')"
+        )
+        self.conn.execute("INSERT INTO carts (paid, paid_at) VALUES (1, NULL)")
+        self.conn.commit()
+
+        migrate(self.conn)
+
+        created_at = self.conn.execute("SELECT created_at FROM categories").fetchone()
+        paid_at = self.conn.execute("SELECT paid_at FROM carts").fetchone()
+        self.assertEqual(created_at, (1704110400,))
+        self.assertEqual(paid_at, (None,))
+
+        # the updated_at trigger keeps working on the rebuilt tables
+        self.conn.execute("UPDATE categories SET name = 'Food'")
+        updated_at = self.conn.execute("SELECT updated_at FROM categories").fetchone()
+        self.assertGreater(updated_at[0], 1704110400)
+
+    def test_sales_backfilled(self):
+        migrate(self.conn, MIGRATIONS[:7])
+        self.conn.execute("INSERT INTO categories (name) VALUES ('Drinks')")
+        self.conn.execute(
+            "INSERT INTO articles (name, price, category_id) VALUES ('Water', 150, 1)"
+        )
+        paid_at = int(datetime(2024, 1, 1, 12, 0).timestamp())
+        self.conn.execute(
+            "INSERT INTO carts (paid, paid_at) VALUES (1, ?), (0, NULL)", (paid_at,)
+        )
+        self.conn.execute(
+            "INSERT INTO m2m_carts_articles (article_id, cart_id, quantity, unit_price, article_name) VALUES (1, 1, 2, 150, 'Water'), (1, 2, 5, 150, 'Water')"
+        )
+        self.conn.commit()
+
+        migrate(self.conn)
+
+        self.assertEqual(
+            self.conn.execute("SELECT * FROM sales_daily").fetchall(),
+            [("2024-01-01", 300, 1, 2)],
+        )
+        self.assertEqual(
+            self.conn.execute("SELECT * FROM sales_hourly").fetchall(),
+            [("2024-01-01 12", 300, 1, 2)],
+        )
+        self.assertEqual(
+            self.conn.execute("SELECT * FROM sales_by_article_daily").fetchall(),
+            [("2024-01-01", 1, "Water", 1, 2, 300)],
+        )
+
+    def test_current_database_skips_ddl(self):
+        migrate(self.conn)
+
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        migrate(self.conn)
+        self.conn.set_trace_callback(None)
+
+        self.assertEqual(statements, ["PRAGMA user_version"])
+
+    def test_failed_migration_rolls_back(self):
+        migrate(self.conn)
+        broken = MIGRATIONS + [
+            Migration(
+                version=latest_version() + 1,
+                name="broken",
+                statements=(
+                    "CREATE TABLE scratch (id INTEGER)",
+                    "INSERT INTO missing_table VALUES (1)",
+                ),
+            )
+        ]
+
+        with self.assertRaises(sqlite3.OperationalError):
+            migrate(self.conn, broken)
+
+        self.assertEqual(self.user_version(), latest_version())
+        scratch = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'scratch'"
+        ).fetchone()
+        self.assertIsNone(scratch)
+
+    def test_db_runs_migrations(self):
+        db = DB(":memory:")
+        self.addCleanup(db.close)
+        version = db.connect().execute("PRAGMA user_version").fetchone()[0]
+        self.assertEqual(version, latest_version())
@@ -0,0 +1,73 @@
+import unittest
+
+from app.db.db import DB
+from app.db.instrumentation import Instrumentation
+from app.db.query_budget import query_budget
+from app.db.repos.category_repo import CategoryRepo
+
+
+class TestQueryBudget(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = DB(":memory:")
+        self.category_repo = CategoryRepo(self.db)
+        self.category_id = self.category_repo.create("Drinks")
+        assert self.category_id is not None
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_within_budget(self):
+        with query_budget(self.db, 2) as log:
+            self.category_repo.get_one(self.category_id)
+            self.category_repo.get_all()
+        self.assertEqual(log.count, 2)
+
+    def test_transaction_control_is_not_counted(self):
+        with query_budget(self.db, 1) as log:
+            with self.db.transaction():
+                self.category_repo.create("Food")
+        self.assertEqual(log.count, 1)
+
+    def test_over_budget(self):
+        with self.assertRaises(AssertionError) as context:
+            with query_budget(self.db, 1, repeats=5):
+                self.category_repo.get_all()
+                self.category_repo.get_all()
+        self.assertIn("2 statements, the budget is 1", str(context.exception))
+
+    def test_repeated_statement_is_flagged(self):
+        other_id = self.category_repo.create("Food")
+        assert other_id is not None
+        with self.assertRaises(AssertionError) as context:
+            with query_budget(self.db, 10):
+                for id in (self.category_id, other_id):
+                    self.category_repo.get_one(id)
+        self.assertIn(
+            "2x SELECT id, name, created_at, updated_at FROM categories WHERE id = ? (likely N+1)",
+            str(context.exception),
+        )
+
+    def test_trigger_programs_are_not_counted(self):
+        # every insert into carts fires triggers, they must not look like extra statements
+        with query_budget(self.db, 1) as log:
+            self.db.connect().execute("INSERT INTO carts DEFAULT VALUES")
+        self.assertEqual(log.count, 1)
+
+    def test_repeated_write_is_counted(self):
+        # the same update in a loop, each one fires the updated_at trigger
+        with query_budget(self.db, 2, repeats=2) as log:
+            with self.db.write() as conn:
+                for _ in range(2):
+                    conn.execute(
+                        "UPDATE categories SET name = 'Snacks' WHERE id = ?",
+                        (self.category_id,),
+                    )
+        self.assertEqual(log.count, 2)
+
+    def test_previous_trace_is_kept(self):
+        instrumentation = Instrumentation()
+        self.db.set_trace(instrumentation.trace)
+        with query_budget(self.db, 1):
+            self.category_repo.get_all()
+        self.assertEqual(self.db.trace, instrumentation.trace)
+        self.assertEqual(sum(instrumentation.statements().values()), 1)
@@ -0,0 +1,51 @@
+import unittest
+
+from app.db.query_plans import (
+    load_baseline,
+    query_plans,
+    regressions,
+    representative_db,
+    scanned_tables,
+)
+
+
+class TestQueryPlans(unittest.TestCase):
+    def test_no_new_scans(self):
+        problems = regressions(load_baseline(), query_plans())
+        self.assertEqual(
+            problems,
+            [],
+            "\n".join(problems)
+            + "\napprove intended plans with python -m app.db.query_plans --update",
+        )
+
+    def test_dropped_index_is_a_regression(self):
+        db = representative_db()
+        try:
+            with db.write() as conn:
+                conn.execute("DROP INDEX idx_m2m_carts_articles_cart_id")
+            problems = regressions(load_baseline(), query_plans(db))
+        finally:
+            db.close()
+        self.assertTrue(
+            any(
+                problem.startswith("new SCAN m2m_carts_articles: ")
+                and "WHERE cart_id = ?" in problem
+                for problem in problems
+            ),
+            problems,
+        )
+
+    def test_scans_of_small_tables_are_allowed(self):
+        template = "SELECT id, name FROM categories WHERE name = ?"
+        self.assertEqual(regressions({}, {template: ["SCAN categories"]}), [])
+
+    def test_aliases_are_resolved(self):
+        template = "SELECT c.id FROM carts c WHERE c.total > ?"
+        self.assertEqual(scanned_tables(template, ["SCAN c"]), {"carts"})
+        self.assertEqual(len(regressions({}, {template: ["SCAN c"]})), 1)
+
+    def test_approved_scans_are_allowed(self):
+        template = "SELECT id FROM carts ORDER BY id LIMIT ?"
+        plans = {template: ["SCAN carts"]}
+        self.assertEqual(regressions(plans, plans), [])
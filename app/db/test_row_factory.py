@@ -0,0 +1,62 @@
+import sqlite3
+import unittest
+
+from app.db.row_factory import row_factory
+from app.models.cart import Cart
+from app.models.category import Category
+from app.models.money import Money
+from app.models.article import Article
+
+
+class TestRowFactory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = sqlite3.connect(":memory:")
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def test_builds_model_from_tuple(self):
+        cur = self.conn.cursor()
+        cur.row_factory = row_factory(
+            Category, ("id", "name", "created_ts", "updated_ts")
+        )
+        cur.execute("SELECT 1, 'Drinks', 10, 20")
+
+        category = cur.fetchone()
+
+        self.assertEqual(category, Category(id=1, name="Drinks"))
+        self.assertEqual(category.created_ts, 10)
+        self.assertEqual(category.updated_ts, 20)
+
+    def test_converters(self):
+        cur = self.conn.cursor()
+        cur.row_factory = row_factory(
+            Article,
+            ("id", "name", "price", "category_id"),
+            converters={"price": Money},
+        )
+        cur.execute("SELECT 1, 'Water', 150, 2")
+
+        article = cur.fetchone()
+
+        self.assertIsInstance(article.price, Money)
+        self.assertEqual(
+            article, Article(id=1, name="Water", price=Money(150), category_id=2)
+        )
+
+    def test_defaults_are_created_per_row(self):
+        cur = self.conn.cursor()
+        cur.row_factory = row_factory(
+            Cart, ("id", "paid"), converters={"paid": bool}, defaults={"items": list}
+        )
+        cur.execute("SELECT 1, 0 UNION ALL SELECT 2, 1")
+
+        first, second = cur.fetchall()
+
+        self.assertEqual(first, Cart(id=1, paid=False, items=[]))
+        self.assertEqual(second, Cart(id=2, paid=True, items=[]))
+        self.assertIsNot(first.items, second.items)
+
+    def test_models_have_no_instance_dict(self):
+        category = Category(id=1, name="Drinks")
+        self.assertFalse(hasattr(category, "__dict__"))
@@ -1,35 +1,45 @@
 from datetime import datetime
 from typing import List
+from app.models.money import Money
 from app.models.receipt import Receipt
 from app.models.receipt_item import ReceiptItem
 
 
 class ReceiptBuilder:
-    def __build_header(self, paid_at: datetime) -> str:
-        return f"### Your purchase from {paid_at.strftime('%d.%m.%Y')}\n\n"
+    def __build_header(self, paid_at: datetime) -> List[str]:
+        return [f"### Your purchase from {paid_at.strftime('%d.%m.%Y')}\n\n"]
 
-    def __build_table_header(self) -> str:
-        header = "| Article | Quantity | Unit Price | Total in CHF |\n"
-        header += "|--|--|--|--|\n"
-        return header
+    def __build_table_header(self) -> List[str]:
+        return [
+            "| Article | Quantity | Unit Price | Total in CHF |\n",
+            "|--|--|--|--|\n",
+        ]
 
-    def __build_table_body(self, items: List[ReceiptItem], total: float) -> str:
-        body = ""
-        for item in items:
-            body += f"| {item.article_name} | {item.quantity} | {item.unit_price} | {item.line_total()} |\n"
-        body += f"|**Total**|||**{total}**|\n\n"
+    def __build_table_body(self, items: List[ReceiptItem], total: Money) -> List[str]:
+        body = [
+            f"| {item.article_name} | {item.quantity} | {item.unit_price} | {item.line_total()} |\n"
+            for item in items
+        ]
+        body.append(f"|**Total**|||**{total}**|\n\n")
         return body
 
-    def __build_footer(self, paid_at: datetime) -> str:
-        footer = f"Paid at: {paid_at.strftime('%d.%m.%Y %H:%M')}\n\n"
-        footer += "Thank you very much for your purchase!"
-        return footer
+    def __build_footer(self, paid_at: datetime) -> List[str]:
+        return [
+            f"Paid at: {paid_at.strftime('%d.%m.%Y %H:%M')}\n\n",
+            "Thank you very much for your purchase!",
+        ]
 
-    def build(self, receipt: Receipt) -> str:
-        md = ""
-        md += self.__build_header(receipt.paid_at)
-        md += self.__build_table_header()
-        md += self.__build_table_body(receipt.items, receipt.total())
-        md += self.__build_footer(receipt.paid_at)
+    def number(self, cart_id: int, paid_at: datetime) -> str:
+        """
+        day of payment and cart id, e.g. 20240131-000042
+        """
+        return f"{paid_at.strftime('%Y%m%d')}-{cart_id:06d}"
 
-        return md
+    def build(self, receipt: Receipt) -> str:
+        # one join instead of growing a string per line
+        return "".join(
+            self.__build_header(receipt.paid_at)
+            + self.__build_table_header()
+            + self.__build_table_body(receipt.items, receipt.total())
+            + self.__build_footer(receipt.paid_at)
+        )
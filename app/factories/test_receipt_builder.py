@@ -1,6 +1,7 @@
 from datetime import datetime
 import unittest
 
+from app.models.money import Money
 from app.models.receipt import Receipt
 from app.models.receipt_item import ReceiptItem
 from app.factories.receipt_builder import ReceiptBuilder
@@ -14,10 +15,10 @@ class TestReceiptBuilder(unittest.TestCase):
 
 | Article | Quantity | Unit Price | Total in CHF |
 |--|--|--|--|
-| Article 1 | 2 | 1.5 | 3.0 |
-| Article 2 | 4 | 2.0 | 8.0 |
-| Article 3 | 3 | 2.5 | 7.5 |
-|**Total**|||**18.5**|
+| Article 1 | 2 | 1.50 | 3.00 |
+| Article 2 | 4 | 2.00 | 8.00 |
+| Article 3 | 3 | 2.50 | 7.50 |
+|**Total**|||**18.50**|
 
 Paid at: {datetime.strftime(fixed_time, "%d.%m.%Y %H:%M")}
 
@@ -25,9 +26,9 @@ Thank you very much for your purchase!
 """
 
         receipt_items = [
-            ReceiptItem("Article 1", 2, 1.5),
-            ReceiptItem("Article 2", 4, 2.0),
-            ReceiptItem("Article 3", 3, 2.5),
+            ReceiptItem("Article 1", 2, Money(150)),
+            ReceiptItem("Article 2", 4, Money(200)),
+            ReceiptItem("Article 3", 3, Money(250)),
         ]
         receipt = Receipt(fixed_time, receipt_items)
 
@@ -1,10 +1,13 @@
 from dataclasses import dataclass
+from typing import Optional
 
 from app.models.base_model import BaseModel
+from app.models.money import Money
 
 
-@dataclass
+@dataclass(slots=True)
 class Article(BaseModel):
     name: str
-    price: float
+    price: Money
     category_id: int
+    barcode: Optional[str] = None
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+from app.models.money import Money
+
+
+@dataclass(frozen=True, slots=True)
+class ArticleSales:
+    article_id: int
+    article_name: str
+    category_id: int
+    quantity: int
+    revenue: Money
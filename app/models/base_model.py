@@ -2,8 +2,28 @@ from dataclasses import dataclass, field
 from datetime import datetime
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class BaseModel:
     id: int
-    created_at: datetime | None = field(default=None, compare=False)
-    updated_at: datetime | None = field(default=None, compare=False)
+    # unix epoch seconds as stored in the database
+    created_ts: int | None = field(default=None, compare=False, repr=False)
+    updated_ts: int | None = field(default=None, compare=False, repr=False)
+    # datetimes are only materialized on first access
+    _created_at: datetime | None = field(
+        default=None, init=False, compare=False, repr=False
+    )
+    _updated_at: datetime | None = field(
+        default=None, init=False, compare=False, repr=False
+    )
+
+    @property
+    def created_at(self) -> datetime | None:
+        if self._created_at is None and self.created_ts is not None:
+            self._created_at = datetime.fromtimestamp(self.created_ts)
+        return self._created_at
+
+    @property
+    def updated_at(self) -> datetime | None:
+        if self._updated_at is None and self.updated_ts is not None:
+            self._updated_at = datetime.fromtimestamp(self.updated_ts)
+        return self._updated_at
@@ -3,13 +3,29 @@ from datetime import datetime
 from typing import List
 from app.models.base_model import BaseModel
 from app.models.cart_item import CartItem
+from app.models.money import Money
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Cart(BaseModel):
     paid: bool
-    paid_at: datetime | None = field(default=None, compare=False)
+    paid_ts: int | None = field(default=None, compare=False, repr=False)
     items: List[CartItem]
+    _paid_at: datetime | None = field(
+        default=None, init=False, compare=False, repr=False
+    )
 
-    def total(self) -> float:
-        return sum([item.unit_price + item.quantity for item in self.items])
+    @property
+    def paid_at(self) -> datetime | None:
+        if self._paid_at is None and self.paid_ts is not None:
+            self._paid_at = datetime.fromtimestamp(self.paid_ts)
+        return self._paid_at
+
+    @paid_at.setter
+    def paid_at(self, value: datetime | None) -> None:
+        # the database keeps whole seconds, so does the model
+        self._paid_at = value.replace(microsecond=0) if value is not None else None
+        self.paid_ts = int(value.timestamp()) if value is not None else None
+
+    def total(self) -> Money:
+        return sum((item.line_total() for item in self.items), Money(0))
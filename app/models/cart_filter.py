@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.models.money import Money
+
+
+@dataclass(frozen=True, slots=True)
+class CartFilter:
+    """
+    conditions for cart listings, None means no condition
+    paid_from is inclusive and paid_to exclusive, a paid_at range only matches paid carts
+    totals are compared inclusive
+    """
+
+    paid: Optional[bool] = None
+    paid_from: Optional[datetime] = None
+    paid_to: Optional[datetime] = None
+    min_total: Optional[Money] = None
+    max_total: Optional[Money] = None
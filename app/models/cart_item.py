@@ -1,12 +1,16 @@
 from dataclasses import dataclass
 
 from app.models.base_model import BaseModel
+from app.models.money import Money
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CartItem(BaseModel):
     cart_id: int
     article_id: int
     quantity: int
-    unit_price: float
+    unit_price: Money
     article_name: str
+
+    def line_total(self) -> Money:
+        return self.unit_price * self.quantity
@@ -3,6 +3,6 @@ from dataclasses import dataclass
 from app.models.base_model import BaseModel
 
 
-@dataclass
+@dataclass(slots=True)
 class Category(BaseModel):
     name: str
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from app.models.money import Money
+
+
+@dataclass(frozen=True, slots=True)
+class CategorySales:
+    category_id: int
+    # None once the category was deleted
+    category_name: Optional[str]
+    quantity: int
+    revenue: Money
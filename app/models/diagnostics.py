@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.models.cache_stats import CacheStats
+from app.models.operation_stats import OperationStats
+
+
+@dataclass(frozen=True, slots=True)
+class Diagnostics:
+    # repo and service calls by name, see Instrumentation
+    operations: Dict[str, OperationStats]
+    statements: int
+    cache: Optional[CacheStats]
+    # bytes, both 0 for an in-memory database
+    db_size: int
+    wal_size: int
+    busy_errors: int
+    # calls waiting for or running on the DB thread
+    pending_calls: int
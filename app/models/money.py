@@ -0,0 +1,64 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+
+class Money(int):
+    """
+    amount in minor units (Rappen), Money(250) is CHF 2.50
+    arithmetic with ints stays exact and keeps the Money type
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, value: str | float | int | Decimal) -> "Money":
+        """
+        converts a major unit amount like "2.5" or 2.5 into Money(250)
+        raises ValueError if the value is not a number
+        """
+        try:
+            amount = Decimal(str(value).strip())
+        except ArithmeticError:
+            raise ValueError(f"{value!r} is not a valid amount")
+        if not amount.is_finite():
+            raise ValueError(f"{value!r} is not a valid amount")
+        minor = (amount * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+        return cls(int(minor))
+
+    def __add__(self, other: object) -> "Money":
+        if isinstance(other, int):
+            return Money(int(self) + int(other))
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other: object) -> "Money":
+        if isinstance(other, int):
+            return Money(int(self) - int(other))
+        return NotImplemented
+
+    def __rsub__(self, other: object) -> "Money":
+        if isinstance(other, int):
+            return Money(int(other) - int(self))
+        return NotImplemented
+
+    def __mul__(self, other: object) -> "Money":
+        # only quantities, Money * Money has no meaning
+        if isinstance(other, int) and not isinstance(other, Money):
+            return Money(int(self) * int(other))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> "Money":
+        return Money(-int(self))
+
+    def __str__(self) -> str:
+        sign = "-" if self < 0 else ""
+        minor = abs(int(self))
+        return f"{sign}{minor // 100}.{minor % 100:02d}"
+
+    def __repr__(self) -> str:
+        return f"Money({int(self)})"
+
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
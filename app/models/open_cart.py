@@ -0,0 +1,85 @@
+from dataclasses import replace
+from typing import Dict, Iterable, Iterator, List, Optional
+from app.models.cart_item import CartItem
+from app.models.money import Money
+
+
+class OpenCart:
+    """
+    items of the cart being checked out, indexed by cart item id and by article id
+    total and item count are updated on every change, so no operation scans the items
+    """
+
+    __slots__ = ("__items", "__by_article", "__total", "__item_count")
+
+    def __init__(self, cart_items: Iterable[CartItem] = ()) -> None:
+        # cart item id -> cart item, in the order they were added
+        self.__items: Dict[int, CartItem] = {}
+        self.__by_article: Dict[int, CartItem] = {}
+        self.__total = Money(0)
+        self.__item_count = 0
+        for cart_item in cart_items:
+            self.add(cart_item)
+
+    @property
+    def total(self) -> Money:
+        return self.__total
+
+    @property
+    def item_count(self) -> int:
+        """
+        number of pieces, the sum of all quantities
+        """
+        return self.__item_count
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def __contains__(self, cart_item_id: object) -> bool:
+        return cart_item_id in self.__items
+
+    def __iter__(self) -> Iterator[CartItem]:
+        return iter(self.__items.values())
+
+    def get(self, cart_item_id: int) -> Optional[CartItem]:
+        return self.__items.get(cart_item_id)
+
+    def get_by_article(self, article_id: int) -> Optional[CartItem]:
+        return self.__by_article.get(article_id)
+
+    def items(self) -> List[CartItem]:
+        """
+        copies of the cart items, changing them does not change the cart
+        """
+        return [replace(cart_item) for cart_item in self.__items.values()]
+
+    def add(self, cart_item: CartItem) -> None:
+        """
+        adds a new line, raises ValueError if its id or article is already in the cart
+        """
+        if cart_item.id in self.__items or cart_item.article_id in self.__by_article:
+            raise ValueError(f"CartItem {cart_item.id} is already in the cart")
+        self.__items[cart_item.id] = cart_item
+        self.__by_article[cart_item.article_id] = cart_item
+        self.__total += cart_item.line_total()
+        self.__item_count += cart_item.quantity
+
+    def set_quantity(self, cart_item_id: int, quantity: int) -> None:
+        cart_item = self.__items[cart_item_id]
+        self.__total += cart_item.unit_price * (quantity - cart_item.quantity)
+        self.__item_count += quantity - cart_item.quantity
+        cart_item.quantity = quantity
+
+    def remove(self, cart_item_id: int) -> Optional[CartItem]:
+        cart_item = self.__items.pop(cart_item_id, None)
+        if cart_item is not None:
+            del self.__by_article[cart_item.article_id]
+            self.__total -= cart_item.line_total()
+            self.__item_count -= cart_item.quantity
+        return cart_item
+
+    def clear(self) -> None:
+        self.__items.clear()
+        self.__by_article.clear()
+        self.__total = Money(0)
+        self.__item_count = 0
@@ -0,0 +1,46 @@
+from dataclasses import dataclass, field
+from typing import List
+
+# upper bounds of the latency histogram buckets in microseconds, the last bucket is open
+LATENCY_BUCKETS_US = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+
+@dataclass
+class OperationStats:
+    calls: int = 0
+    errors: int = 0
+    statements: int = 0
+    rows: int = 0
+    total_us: float = 0.0
+    max_us: float = 0.0
+    last_us: float = 0.0
+    # calls per bucket of LATENCY_BUCKETS_US, the last one counts the slower calls
+    histogram: List[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS_US) + 1)
+    )
+
+    @property
+    def mean_us(self) -> float:
+        return self.total_us / self.calls if self.calls > 0 else 0.0
+
+    @property
+    def statements_per_call(self) -> float:
+        return self.statements / self.calls if self.calls > 0 else 0.0
+
+    @property
+    def rows_per_call(self) -> float:
+        return self.rows / self.calls if self.calls > 0 else 0.0
+
+    def percentile_us(self, q: float) -> float:
+        """
+        upper bound of the bucket holding the q-th call, max_us for the open bucket
+        """
+        if self.calls == 0:
+            return 0.0
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_US, self.histogram):
+            seen += count
+            if seen >= rank:
+                return min(float(bound), self.max_us)
+        return self.max_us
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# sort key values of the last item of a page, the next page starts after it
+Cursor = Tuple[Any, ...]
+
+
+@dataclass(slots=True)
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[Cursor] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
@@ -2,13 +2,14 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List
 
+from app.models.money import Money
 from app.models.receipt_item import ReceiptItem
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Receipt:
     paid_at: datetime = field(compare=False)
     items: List[ReceiptItem]
 
-    def total(self) -> float:
-        return sum([item.line_total() for item in self.items])
+    def total(self) -> Money:
+        return sum((item.line_total() for item in self.items), Money(0))
@@ -1,11 +1,13 @@
 from dataclasses import dataclass
 
+from app.models.money import Money
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class ReceiptItem:
     article_name: str
     quantity: int
-    unit_price: float
+    unit_price: Money
 
-    def line_total(self) -> float:
-        return self.quantity * self.unit_price
+    def line_total(self) -> Money:
+        return self.unit_price * self.quantity
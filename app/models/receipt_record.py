@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from app.models.money import Money
+
+
+@dataclass(frozen=True, slots=True)
+class ReceiptRecord:
+    """
+    stored snapshot of a receipt, written once at checkout
+    """
+
+    cart_id: int
+    number: str
+    total: Money
+    item_count: int
+    paid_ts: int = field(repr=False)
+    body: str = field(repr=False)
+
+    @property
+    def paid_at(self) -> datetime:
+        return datetime.fromtimestamp(self.paid_ts)
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+from app.models.money import Money
+
+
+@dataclass(frozen=True, slots=True)
+class SalesSummary:
+    # a day like 2024-01-31 or an hour like 2024-01-31 14, in local time
+    period: str
+    revenue: Money
+    carts: int
+    items: int
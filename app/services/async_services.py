@@ -0,0 +1,198 @@
+import sqlite3
+from typing import List, Optional
+from app.db.executor import DBExecutor
+from app.models.article import Article
+from app.models.cart import Cart
+from app.models.cart_filter import CartFilter
+from app.models.cart_item import CartItem
+from app.models.category import Category
+from app.models.money import Money
+from app.models.page import Cursor, Page
+from app.models.receipt import Receipt
+from app.services.cart_service import CartService
+from app.services.checkout_service import CheckoutService
+from app.services.inventory_service import InventoryService
+
+
+class AsyncCheckoutService:
+    """
+    awaitable variant of CheckoutService, every call runs on the DB executor thread
+    """
+
+    def __init__(self, checkout_service: CheckoutService, executor: DBExecutor) -> None:
+        self.__checkout_service = checkout_service
+        self.__executor = executor
+        self.__search_generation = 0
+
+    async def search_article(
+        self, search_text: str, limit: int = 50
+    ) -> Optional[List[Article]]:
+        """
+        returns None if a newer search was started before this one finished
+        a newer search interrupts the query of a running older one
+        """
+        self.__search_generation += 1
+        generation = self.__search_generation
+        self.__executor.interrupt("search")
+
+        def search() -> Optional[List[Article]]:
+            # skip searches that became stale while waiting in the queue
+            if generation != self.__search_generation:
+                return None
+            return self.__checkout_service.search_article(search_text, limit)
+
+        try:
+            articles = await self.__executor.run(search, tag="search")
+        except sqlite3.OperationalError as e:
+            if e.sqlite_errorname != "SQLITE_INTERRUPT":
+                raise
+            return None
+        if generation != self.__search_generation:
+            return None
+        return articles
+
+    async def reset(self) -> None:
+        await self.__executor.run(self.__checkout_service.reset)
+
+    async def add_article(self, article: Article, quantity: int) -> bool:
+        return await self.__executor.run(
+            self.__checkout_service.add_article, article, quantity
+        )
+
+    async def add_by_code(self, code: str, quantity: int = 1) -> Optional[CartItem]:
+        return await self.__executor.run(
+            self.__checkout_service.add_by_code, code, quantity
+        )
+
+    async def remove_article(self, cart_item_id: int) -> bool:
+        return await self.__executor.run(
+            self.__checkout_service.remove_article, cart_item_id
+        )
+
+    async def get_cart_items(self) -> List[CartItem]:
+        return await self.__executor.run(self.__checkout_service.get_cart_items)
+
+    async def get_cart_item_by_article(self, article_id: int) -> Optional[CartItem]:
+        return await self.__executor.run(
+            self.__checkout_service.get_cart_item_by_article, article_id
+        )
+
+    async def get_total(self) -> Money:
+        return await self.__executor.run(self.__checkout_service.get_total)
+
+    async def get_item_count(self) -> int:
+        return await self.__executor.run(self.__checkout_service.get_item_count)
+
+    async def checkout(self) -> Optional[Receipt]:
+        return await self.__executor.run(self.__checkout_service.checkout)
+
+
+class AsyncInventoryService:
+    """
+    awaitable variant of InventoryService, every call runs on the DB executor thread
+    """
+
+    def __init__(
+        self, inventory_service: InventoryService, executor: DBExecutor
+    ) -> None:
+        self.__inventory_service = inventory_service
+        self.__executor = executor
+
+    async def create_category(self, name: str) -> Optional[int]:
+        return await self.__executor.run(self.__inventory_service.create_category, name)
+
+    async def delete_category(self, category_id: int) -> bool:
+        return await self.__executor.run(
+            self.__inventory_service.delete_category, category_id
+        )
+
+    async def get_categories(self) -> List[Category]:
+        return await self.__executor.run(self.__inventory_service.get_categories)
+
+    async def get_articles_page(
+        self,
+        category_id: Optional[int] = None,
+        after: Optional[Cursor] = None,
+        limit: int = 100,
+        sort: str = "id",
+        descending: bool = False,
+    ) -> Page[Article]:
+        return await self.__executor.run(
+            self.__inventory_service.get_articles_page,
+            category_id,
+            after,
+            limit,
+            sort,
+            descending,
+        )
+
+    async def count_articles(self, category_id: Optional[int] = None) -> int:
+        return await self.__executor.run(
+            self.__inventory_service.count_articles, category_id
+        )
+
+    async def create_article(
+        self,
+        name: str,
+        price: Money,
+        category_id: int,
+        barcode: Optional[str] = None,
+    ) -> Optional[int]:
+        return await self.__executor.run(
+            self.__inventory_service.create_article, name, price, category_id, barcode
+        )
+
+    async def delete_article(self, article_id: int) -> bool:
+        return await self.__executor.run(
+            self.__inventory_service.delete_article, article_id
+        )
+
+    async def get_articles(self, category_id: Optional[int] = None) -> List[Article]:
+        return await self.__executor.run(
+            self.__inventory_service.get_articles, category_id
+        )
+
+
+class AsyncCartService:
+    """
+    awaitable variant of CartService, every call runs on the DB executor thread
+    """
+
+    def __init__(self, cart_service: CartService, executor: DBExecutor) -> None:
+        self.__cart_service = cart_service
+        self.__executor = executor
+
+    async def get_carts(self, cart_filter: Optional[CartFilter] = None) -> List[Cart]:
+        return await self.__executor.run(self.__cart_service.get_carts, cart_filter)
+
+    async def get_carts_page(
+        self,
+        after: Optional[Cursor] = None,
+        limit: int = 100,
+        sort: str = "id",
+        descending: bool = True,
+        cart_filter: Optional[CartFilter] = None,
+    ) -> Page[Cart]:
+        return await self.__executor.run(
+            self.__cart_service.get_carts_page,
+            after,
+            limit,
+            sort,
+            descending,
+            cart_filter,
+        )
+
+    async def count_carts(self, cart_filter: Optional[CartFilter] = None) -> int:
+        return await self.__executor.run(self.__cart_service.count_carts, cart_filter)
+
+    async def get_cart_items(self, cart_id: int) -> List[CartItem]:
+        return await self.__executor.run(self.__cart_service.get_cart_items, cart_id)
+
+    async def get_cart_total(self, cart_id: int) -> Money:
+        return await self.__executor.run(self.__cart_service.get_cart_total, cart_id)
+
+    async def get_receipt(self, cart_id: int) -> Optional[Receipt]:
+        return await self.__executor.run(self.__cart_service.get_receipt, cart_id)
+
+    async def get_receipt_body(self, cart_id: int) -> Optional[str]:
+        return await self.__executor.run(self.__cart_service.get_receipt_body, cart_id)
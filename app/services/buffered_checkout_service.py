@@ -0,0 +1,133 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+from app.db.cart_journal import CartJournal
+from app.db.db import DB, Rollback
+from app.db.repos.article_repo import ArticleRepo
+from app.db.repos.cart_item_repo import CartItemRepo
+from app.db.repos.cart_repo import CartRepo
+from app.db.repos.receipt_repo import ReceiptRepo
+from app.models.article import Article
+from app.models.cart_item import CartItem
+from app.models.open_cart import OpenCart
+from app.models.receipt import Receipt
+from app.models.receipt_item import ReceiptItem
+from app.services.checkout_service import CheckoutService
+
+
+class BufferedCheckoutService(CheckoutService):
+    """
+    CheckoutService that keeps the open cart in memory and writes it to the database once at checkout
+    every change is appended to the journal first, so a crashed lane restores its open cart
+    cart items get local ids until they are stored
+    """
+
+    def __init__(
+        self,
+        article_repo: ArticleRepo,
+        cart_repo: CartRepo,
+        cart_item_repo: CartItemRepo,
+        receipt_repo: ReceiptRepo,
+        db: DB,
+        journal: CartJournal,
+    ) -> None:
+        super().__init__(article_repo, cart_repo, cart_item_repo, receipt_repo, db)
+        self.__journal = journal
+        restored = journal.replay()
+        token = journal.checkout_token()
+        if token is not None and self.cart_repo.get_by_token(token) is not None:
+            # the lane crashed after the cart was stored, before the journal was cleared
+            journal.clear()
+            restored = []
+        self._cart_items = OpenCart(restored)
+        self.__next_id = max((item.id for item in restored), default=0) + 1
+
+    def reset(self) -> None:
+        self._cart_items.clear()
+        self.__next_id = 1
+        self.__journal.clear()
+
+    def add_article(self, article: Article, quantity: int) -> bool:
+        """
+        adds the article to the open cart, or increments the quantity of its cart item
+        the article is only checked against the database at checkout
+        nothing changes if the journal can not be written
+        """
+        item = self._cart_items.get_by_article(article.id)
+        if item is not None:
+            if not self.__journal.quantity(item.id, item.quantity + quantity):
+                return False
+            self._cart_items.set_quantity(item.id, item.quantity + quantity)
+            return True
+
+        cart_item = CartItem(
+            id=self.__next_id,
+            cart_id=0,
+            article_id=article.id,
+            quantity=quantity,
+            unit_price=article.price,
+            article_name=article.name,
+        )
+        if not self.__journal.add(cart_item):
+            return False
+        self._cart_items.add(cart_item)
+        self.__next_id += 1
+        return True
+
+    def remove_article(self, cart_item_id: int) -> bool:
+        if cart_item_id not in self._cart_items:
+            return False
+        if not self.__journal.remove(cart_item_id):
+            return False
+        self._cart_items.remove(cart_item_id)
+        return True
+
+    def checkout(self) -> Optional[Receipt]:
+        """
+        stores the cart, its items, the paid flag and the receipt in one transaction
+        returns a Receipt Model
+        """
+        if len(self._cart_items) == 0:
+            return None
+
+        paid_at = datetime.now().replace(microsecond=0)
+        receipt = Receipt(
+            paid_at,
+            [
+                ReceiptItem(
+                    article_name=item.article_name,
+                    quantity=item.quantity,
+                    unit_price=item.unit_price,
+                )
+                for item in self._cart_items
+            ],
+        )
+        body = self.receipt_builder.build(receipt)
+
+        # a replayed journal with this token finds the stored cart and is not charged again
+        token = uuid.uuid4().hex
+        if not self.__journal.checkout(token):
+            return None
+
+        paid = False
+        with self.db.transaction():
+            cart = self.cart_repo.create(token)
+            if cart is None:
+                raise Rollback()
+            if not self.cart_item_repo.create_many(cart, list(self._cart_items)):
+                raise Rollback()
+            cart.paid_at = paid_at
+            if not self.cart_repo.mark_paid(cart):
+                raise Rollback()
+            number = self.receipt_builder.number(cart.id, paid_at)
+            if self.receipt_repo.create(cart, number, receipt, body) is None:
+                raise Rollback()
+            paid = True
+
+        if not paid:
+            return None
+
+        # the sale must be on disk before the journal forgets the cart
+        self.db.flush()
+        self.reset()
+        return receipt
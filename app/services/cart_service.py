@@ -1,19 +1,47 @@
 from typing import List, Optional
 from app.db.repos.cart_repo import CartRepo
 from app.db.repos.cart_item_repo import CartItemRepo
+from app.db.repos.receipt_repo import ReceiptRepo
+from app.factories.receipt_builder import ReceiptBuilder
 from app.models.cart import Cart
+from app.models.cart_filter import CartFilter
 from app.models.cart_item import CartItem
+from app.models.money import Money
+from app.models.page import Cursor, Page
 from app.models.receipt import Receipt
 from app.models.receipt_item import ReceiptItem
 
 
 class CartService:
-    def __init__(self, cart_repo: CartRepo, cart_item_repo: CartItemRepo) -> None:
+    def __init__(
+        self,
+        cart_repo: CartRepo,
+        cart_item_repo: CartItemRepo,
+        receipt_repo: ReceiptRepo,
+    ) -> None:
         self.cart_repo = cart_repo
         self.cart_item_repo = cart_item_repo
+        self.receipt_repo = receipt_repo
+        self.receipt_builder = ReceiptBuilder()
 
-    def get_carts(self) -> List[Cart]:
-        return self.cart_repo.get_all()
+    def get_carts(self, cart_filter: Optional[CartFilter] = None) -> List[Cart]:
+        return self.cart_repo.get_all(cart_filter)
+
+    def get_carts_page(
+        self,
+        after: Optional[Cursor] = None,
+        limit: int = 100,
+        sort: str = "id",
+        descending: bool = True,
+        cart_filter: Optional[CartFilter] = None,
+    ) -> Page[Cart]:
+        """
+        newest carts first unless descending is False
+        """
+        return self.cart_repo.get_page(after, limit, sort, descending, cart_filter)
+
+    def count_carts(self, cart_filter: Optional[CartFilter] = None) -> int:
+        return self.cart_repo.count_estimate(cart_filter)
 
     def get_cart_items(self, cart_id: int) -> List[CartItem]:
         cart = self.cart_repo.get_one(cart_id)
@@ -21,10 +49,14 @@ class CartService:
             return []
         return self.cart_item_repo.get_all(cart=cart)
 
+    def get_cart_total(self, cart_id: int) -> Money:
+        return self.cart_repo.get_total(cart_id)
+
     def get_receipt(self, cart_id: int) -> Optional[Receipt]:
         cart = self.cart_repo.get_one(cart_id)
         if cart and cart.paid_at is not None:
-            cart_items = self.get_cart_items(cart.id)
+            # the cart is loaded already, get_cart_items would look it up again
+            cart_items = self.cart_item_repo.get_all(cart=cart)
             receipt_items: List[ReceiptItem] = []
             for cart_item in cart_items:
                 receipt_items.append(
@@ -37,3 +69,16 @@ class CartService:
                 receipt_items,
             )
         return
+
+    def get_receipt_body(self, cart_id: int) -> Optional[str]:
+        """
+        markdown of the receipt stored at checkout
+        carts paid before receipts were stored get theirs built from the cart items
+        """
+        record = self.receipt_repo.get_one(cart_id)
+        if record is not None:
+            return record.body
+        receipt = self.get_receipt(cart_id)
+        if receipt is None:
+            return None
+        return self.receipt_builder.build(receipt)
@@ -1,11 +1,17 @@
+from dataclasses import replace
 from datetime import date, datetime
 from typing import List, Optional
+from app.db.db import DB, Rollback
 from app.db.repos.article_repo import ArticleRepo
 from app.db.repos.cart_item_repo import CartItemRepo
 from app.db.repos.cart_repo import CartRepo
+from app.db.repos.receipt_repo import ReceiptRepo
+from app.factories.receipt_builder import ReceiptBuilder
 from app.models.article import Article
 from app.models.cart import Cart
 from app.models.cart_item import CartItem
+from app.models.money import Money
+from app.models.open_cart import OpenCart
 from app.models.receipt import Receipt
 from app.models.receipt_item import ReceiptItem
 
@@ -16,110 +22,149 @@ class CheckoutService:
         article_repo: ArticleRepo,
         cart_repo: CartRepo,
         cart_item_repo: CartItemRepo,
+        receipt_repo: ReceiptRepo,
+        db: DB,
     ) -> None:
+        self.db = db
         self.article_repo = article_repo
         self.cart_repo = cart_repo
         self.cart_item_repo = cart_item_repo
+        self.receipt_repo = receipt_repo
+        self.receipt_builder = ReceiptBuilder()
         self.__cart: Optional[Cart] = None
-        self.__cart_items: List[CartItem] = []
+        # BufferedCheckoutService restores it from its journal
+        self._cart_items = OpenCart()
 
     def __create_cart(self) -> Cart:
         """
         inserts a new cart into the database and returns the model instance
         """
-        cart_id = self.cart_repo.create()
-        if cart_id is None:
-            raise Exception("Cart could not be created")
-
-        cart = self.cart_repo.get_one(cart_id)
+        cart = self.cart_repo.create()
         if cart is None:
-            raise RuntimeError(f"Cart with id {cart_id} could not be found")
+            raise Exception("Cart could not be created")
 
         return cart
 
     def reset(self) -> None:
         """
-        clears __cart and __cart_items and sets them to the initial state
+        clears __cart and _cart_items and sets them to the initial state
         used when user aborts checkout or the checkout is done
         """
-        self.__cart_items = []
+        self._cart_items.clear()
         self.__cart = self.__create_cart()
 
-    def search_article(self, search_text: str) -> List[Article]:
+    def search_article(self, search_text: str, limit: int = 50) -> List[Article]:
         """
-        returns a list of articles found with the search_text
-        search will be done case insensitive
+        returns at most limit articles whose name words start with the words of search_text
+        search will be done case insensitive, best matches first
         """
-        return self.article_repo.get_all(search_text=search_text)
+        return self.article_repo.search(search_text, limit)
 
     def add_article(self, article: Article, quantity: int) -> bool:
         """
-        creates a new cart_item on the database and appends it to __carts_items
+        creates a new cart_item on the database and appends it to _cart_items
         if a cart_item already exists, the quantity will be incremented accordingly
+        a new cart and its first item are written in one commit
         """
-        if self.__cart is None:
-            self.__cart = self.__create_cart()
-
-        for item in self.__cart_items:
-            if item.article_id == article.id:
-                item.quantity += quantity
-                updated = self.cart_item_repo.update(item)
+        with self.db.transaction():
+            if self.__cart is None:
+                self.__cart = self.__create_cart()
+
+            item = self._cart_items.get_by_article(article.id)
+            if item is not None:
+                updated = self.cart_item_repo.update(
+                    replace(item, quantity=item.quantity + quantity)
+                )
                 if updated:
-                    return True
-                item.quantity -= quantity
-                return False
+                    self._cart_items.set_quantity(item.id, item.quantity + quantity)
+                return updated
 
-        cart_item_id = self.cart_item_repo.create(self.__cart, article, quantity)
-        if cart_item_id is None:
-            return False
+            new_cart_item = self.cart_item_repo.create(self.__cart, article, quantity)
+            if new_cart_item is None:
+                return False
 
-        new_cart_item = self.cart_item_repo.get_one(cart_item_id)
-        if new_cart_item is not None:
-            self.__cart_items.append(new_cart_item)
+            self._cart_items.add(new_cart_item)
             return True
 
-        return False
+    def add_by_code(self, code: str, quantity: int = 1) -> Optional[CartItem]:
+        """
+        adds the article with this barcode, the entry point of the scanner
+        returns the updated cart item, None if the code is unknown or the article could not be added
+        """
+        article = self.article_repo.get_by_barcode(code)
+        if article is None or not self.add_article(article, quantity):
+            return None
+        return self.get_cart_item_by_article(article.id)
 
     def remove_article(self, cart_item_id: int) -> bool:
         """
-        deletes cart_item on the database and removes it from __carts_items
+        deletes cart_item on the database and removes it from _cart_items
+        only items of the open cart can be removed
         """
-        cart_item = self.cart_item_repo.get_one(cart_item_id)
+        cart_item = self._cart_items.get(cart_item_id)
         if cart_item is None:
             return False
 
         deleted = self.cart_item_repo.delete(cart_item)
         if deleted:
-            self.__cart_items.remove(cart_item)
-            return True
-
-        return False
+            self._cart_items.remove(cart_item_id)
+        return deleted
 
     def get_cart_items(self) -> List[CartItem]:
-        if self.__cart is None:
-            return []
-        return self.cart_item_repo.get_all(self.__cart)
+        """
+        served from _cart_items without a query
+        """
+        return self._cart_items.items()
+
+    def get_cart_item_by_article(self, article_id: int) -> Optional[CartItem]:
+        cart_item = self._cart_items.get_by_article(article_id)
+        return replace(cart_item) if cart_item is not None else None
+
+    def get_total(self) -> Money:
+        return self._cart_items.total
+
+    def get_item_count(self) -> int:
+        return self._cart_items.item_count
 
     def checkout(self) -> Optional[Receipt]:
         """
-        updates the cart entity in the database and sets paid = true and paid_at to current timestamp
+        sets paid = true and paid_at to current timestamp on the cart and stores its receipt,
+        both in one transaction
         returns a Receipt Model
         """
-        if self.__cart is not None and len(self.__cart_items) > 0:
-            self.__cart.paid = True
-            self.__cart.paid_at = datetime.now()
-            if self.cart_repo.update(self.__cart):
-                receipt_items = []
-                for item in self.__cart_items:
-                    receipt_items.append(
-                        ReceiptItem(
-                            article_name=item.article_name,
-                            quantity=item.quantity,
-                            unit_price=item.unit_price,
-                        )
+        if self.__cart is not None and len(self._cart_items) > 0:
+            paid_at = datetime.now().replace(microsecond=0)
+            receipt_items = []
+            for item in self._cart_items:
+                receipt_items.append(
+                    ReceiptItem(
+                        article_name=item.article_name,
+                        quantity=item.quantity,
+                        unit_price=item.unit_price,
                     )
-                reciept = Receipt(self.__cart.paid_at, receipt_items)
+                )
+            reciept = Receipt(paid_at, receipt_items)
+
+            self.__cart.paid_at = paid_at
+            number = self.receipt_builder.number(self.__cart.id, paid_at)
+            body = self.receipt_builder.build(reciept)
+
+            # the paid flag and the receipt are committed together or not at all
+            paid = False
+            with self.db.transaction():
+                if not self.cart_repo.mark_paid(self.__cart):
+                    raise Rollback()
+                if self.receipt_repo.create(self.__cart, number, reciept, body) is None:
+                    raise Rollback()
+                paid = True
+
+            if paid:
+                # a sale must be on disk before its receipt is shown
+                self.db.flush()
+                self.__cart.paid = True
                 self.__cart = None
+                self._cart_items.clear()
                 return reciept
+            self.__cart.paid_at = None
 
         return None
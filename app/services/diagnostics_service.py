@@ -0,0 +1,45 @@
+import os
+from typing import Optional
+from app.db.db import DB
+from app.db.executor import DBExecutor
+from app.db.instrumentation import Instrumentation
+from app.db.repos.cached_article_repo import CachedArticleRepo
+from app.models.diagnostics import Diagnostics
+
+
+def file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class DiagnosticsService:
+    """
+    counters of the running app, nothing here queries the database
+    so it can be called from the event loop while the DB thread is busy
+    """
+
+    def __init__(
+        self,
+        db: DB,
+        instrumentation: Instrumentation,
+        article_repo: Optional[CachedArticleRepo] = None,
+        executor: Optional[DBExecutor] = None,
+    ) -> None:
+        self.db = db
+        self.instrumentation = instrumentation
+        self.article_repo = article_repo
+        self.executor = executor
+
+    def get_diagnostics(self) -> Diagnostics:
+        path = self.db.path
+        return Diagnostics(
+            operations=self.instrumentation.operations(),
+            statements=sum(self.instrumentation.statements().values()),
+            cache=self.article_repo.stats() if self.article_repo is not None else None,
+            db_size=file_size(path) if path is not None else 0,
+            wal_size=file_size(path + "-wal") if path is not None else 0,
+            busy_errors=self.db.busy_errors,
+            pending_calls=self.executor.pending if self.executor is not None else 0,
+        )
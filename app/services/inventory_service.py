@@ -3,6 +3,8 @@ from app.db.repos.article_repo import ArticleRepo
 from app.db.repos.category_repo import CategoryRepo
 from app.models.category import Category
 from app.models.article import Article
+from app.models.money import Money
+from app.models.page import Cursor, Page
 
 
 class InventoryService:
@@ -15,17 +17,23 @@ class InventoryService:
 
     def delete_category(self, category_id: int) -> bool:
         category = self.category_repo.get_one(category_id)
-        if category is not None:
-            return self.category_repo.delete(category)
+        if category is not None and self.category_repo.delete(category):
+            # the articles of the category are deleted by cascade
+            self.article_repo.invalidate_category(category_id)
+            return True
         return False
 
     def get_categories(self) -> List[Category]:
         return self.category_repo.get_all()
 
     def create_article(
-        self, name: str, price: float, category_id: int
+        self,
+        name: str,
+        price: Money,
+        category_id: int,
+        barcode: Optional[str] = None,
     ) -> Optional[int]:
-        return self.article_repo.create(name, price, category_id)
+        return self.article_repo.create(name, price, category_id, barcode)
 
     def delete_article(self, article_id: int) -> bool:
         article = self.article_repo.get_one(article_id)
@@ -35,3 +43,16 @@ class InventoryService:
 
     def get_articles(self, category_id: Optional[int] = None) -> List[Article]:
         return self.article_repo.get_all(category_id)
+
+    def get_articles_page(
+        self,
+        category_id: Optional[int] = None,
+        after: Optional[Cursor] = None,
+        limit: int = 100,
+        sort: str = "id",
+        descending: bool = False,
+    ) -> Page[Article]:
+        return self.article_repo.get_page(category_id, after, limit, sort, descending)
+
+    def count_articles(self, category_id: Optional[int] = None) -> int:
+        return self.article_repo.count_estimate(category_id)
@@ -0,0 +1,34 @@
+from datetime import date
+from typing import List
+from app.db.repos.sales_repo import SalesRepo
+from app.models.article_sales import ArticleSales
+from app.models.category_sales import CategorySales
+from app.models.money import Money
+from app.models.sales_summary import SalesSummary
+
+
+class ReportService:
+    def __init__(self, sales_repo: SalesRepo) -> None:
+        self.sales_repo = sales_repo
+
+    def get_daily_sales(self, day_from: date, day_to: date) -> List[SalesSummary]:
+        return self.sales_repo.get_daily(day_from, day_to)
+
+    def get_hourly_sales(self, day: date) -> List[SalesSummary]:
+        return self.sales_repo.get_hourly(day)
+
+    def get_end_of_day(self, day: date) -> SalesSummary:
+        """
+        totals of one day, all zero if nothing was sold
+        """
+        for summary in self.sales_repo.get_daily(day, day):
+            return summary
+        return SalesSummary(day.isoformat(), Money(0), 0, 0)
+
+    def get_top_articles(
+        self, day_from: date, day_to: date, limit: int = 10
+    ) -> List[ArticleSales]:
+        return self.sales_repo.get_by_article(day_from, day_to, limit)
+
+    def get_category_sales(self, day_from: date, day_to: date) -> List[CategorySales]:
+        return self.sales_repo.get_by_category(day_from, day_to)
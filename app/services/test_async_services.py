@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+
+from app.db.db import DB
+from app.db.executor import DBExecutor
+from app.db.repos.article_repo import ArticleRepo
+from app.db.repos.cart_item_repo import CartItemRepo
+from app.db.repos.cart_repo import CartRepo
+from app.db.repos.category_repo import CategoryRepo
+from app.db.repos.receipt_repo import ReceiptRepo
+from app.models.money import Money
+from app.services.async_services import (
+    AsyncCartService,
+    AsyncCheckoutService,
+    AsyncInventoryService,
+)
+from app.services.cart_service import CartService
+from app.services.checkout_service import CheckoutService
+from app.services.inventory_service import InventoryService
+
+
+class TestAsyncServices(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.db = DB(":memory:")
+        self.executor = DBExecutor(self.db)
+
+        category_repo = CategoryRepo(self.db)
+        article_repo = ArticleRepo(self.db)
+        cart_repo = CartRepo(self.db)
+        cart_item_repo = CartItemRepo(self.db)
+        receipt_repo = ReceiptRepo(self.db)
+
+        self.category_id = category_repo.create("Testcategory 1")
+        assert self.category_id is not None
+        article_repo.create("Testarticle 1", Money(200), self.category_id)
+        article_repo.create("Testarticle 2", Money(300), self.category_id)
+
+        self.checkout_service = AsyncCheckoutService(
+            CheckoutService(
+                article_repo, cart_repo, cart_item_repo, receipt_repo, self.db
+            ),
+            self.executor,
+        )
+        self.inventory_service = AsyncInventoryService(
+            InventoryService(category_repo, article_repo), self.executor
+        )
+        self.cart_service = AsyncCartService(
+            CartService(cart_repo, cart_item_repo, receipt_repo), self.executor
+        )
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+        self.db.close()
+
+    async def test_search_article(self):
+        articles = await self.checkout_service.search_article("Testarticle 2")
+        assert articles is not None
+        self.assertEqual([article.name for article in articles], ["Testarticle 2"])
+
+    async def test_search_article_stale(self):
+        first, second = await asyncio.gather(
+            self.checkout_service.search_article("Testarticle"),
+            self.checkout_service.search_article("Testarticle 1"),
+        )
+        self.assertIsNone(first)
+        assert second is not None
+        self.assertEqual([article.name for article in second], ["Testarticle 1"])
+
+    async def test_search_article_interrupted(self):
+        conn = self.db.connect()
+        conn.set_progress_handler(lambda: 1, 1)
+        try:
+            self.assertIsNone(await self.checkout_service.search_article("Testarticle"))
+        finally:
+            conn.set_progress_handler(None, 1)
+
+    async def test_checkout(self):
+        articles = await self.inventory_service.get_articles(self.category_id)
+        self.assertEqual(len(articles), 2)
+
+        self.assertTrue(await self.checkout_service.add_article(articles[0], 2))
+        self.assertEqual(await self.checkout_service.get_total(), Money(400))
+
+        receipt = await self.checkout_service.checkout()
+        assert receipt is not None
+        self.assertEqual(receipt.total(), Money(400))
+
+        carts = await self.cart_service.get_carts()
+        paid = [cart for cart in carts if cart.paid]
+        self.assertEqual(len(paid), 1)
+        self.assertEqual(await self.cart_service.get_cart_total(paid[0].id), 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import os
+import tempfile
+import unittest
+
+from app.db.cart_journal import CartJournal
+from app.db.db import DB
+from app.db.repos.article_repo import ArticleRepo
+from app.db.repos.cart_item_repo import CartItemRepo
+from app.db.repos.cart_repo import CartRepo
+from app.db.repos.category_repo import CategoryRepo
+from app.db.repos.receipt_repo import ReceiptRepo
+from app.models.article import Article
+from app.models.money import Money
+from app.services.buffered_checkout_service import BufferedCheckoutService
+
+
+class TestBufferedCheckoutService(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.tmp.name, "cart.journal")
+        self.db = DB(":memory:")
+
+        category_id = CategoryRepo(self.db).create("Testcategory 1")
+        assert category_id is not None
+
+        self.article_repo = ArticleRepo(self.db)
+        self.cart_repo = CartRepo(self.db)
+        self.cart_item_repo = CartItemRepo(self.db)
+        self.receipt_repo = ReceiptRepo(self.db)
+
+        article1_id = self.article_repo.create("Testarticle 1", Money(200), category_id)
+        article2_id = self.article_repo.create("Testarticle 2", Money(300), category_id)
+        assert article1_id is not None
+        assert article2_id is not None
+        article1 = self.article_repo.get_one(article1_id)
+        article2 = self.article_repo.get_one(article2_id)
+        assert article1 is not None
+        assert article2 is not None
+        self.article1: Article = article1
+        self.article2: Article = article2
+
+        self.journal = CartJournal(self.journal_path)
+        self.checkout_service = self.__service(self.journal)
+
+    def tearDown(self) -> None:
+        self.journal.close()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def __service(self, journal: CartJournal) -> BufferedCheckoutService:
+        return BufferedCheckoutService(
+            self.article_repo,
+            self.cart_repo,
+            self.cart_item_repo,
+            self.receipt_repo,
+            self.db,
+            journal,
+        )
+
+    def test_add_article_stays_in_memory(self):
+        self.assertTrue(self.checkout_service.add_article(self.article1, 2))
+        self.assertTrue(self.checkout_service.add_article(self.article1, 1))
+        self.assertTrue(self.checkout_service.add_article(self.article2, 1))
+
+        items = self.checkout_service.get_cart_items()
+        self.assertEqual([(item.id, item.quantity) for item in items], [(1, 3), (2, 1)])
+        self.assertEqual(self.checkout_service.get_total(), Money(900))
+        self.assertEqual(self.checkout_service.get_item_count(), 4)
+        cart_item = self.checkout_service.get_cart_item_by_article(self.article1.id)
+        assert cart_item is not None
+        self.assertEqual((cart_item.id, cart_item.quantity), (1, 3))
+
+        self.assertEqual(self.cart_repo.get_all(), [])
+        self.assertEqual(self.cart_item_repo.get_all(), [])
+
+    def test_remove_article(self):
+        self.checkout_service.add_article(self.article1, 1)
+
+        self.assertTrue(self.checkout_service.remove_article(1))
+        self.assertFalse(self.checkout_service.remove_article(1))
+        self.assertEqual(self.checkout_service.get_cart_items(), [])
+
+    def test_restore_from_journal(self):
+        self.checkout_service.add_article(self.article1, 2)
+        self.checkout_service.add_article(self.article2, 1)
+        self.checkout_service.remove_article(1)
+        self.journal.close()
+
+        # a new lane process after a crash
+        journal = CartJournal(self.journal_path)
+        restored = self.__service(journal)
+        self.assertEqual(
+            restored.get_cart_items(), self.checkout_service.get_cart_items()
+        )
+
+        # local ids continue after the restored ones
+        restored.add_article(self.article1, 1)
+        self.assertEqual([item.id for item in restored.get_cart_items()], [2, 3])
+        journal.close()
+
+    def test_checkout(self):
+        self.checkout_service.add_article(self.article1, 2)
+        self.checkout_service.add_article(self.article2, 1)
+
+        receipt = self.checkout_service.checkout()
+        assert receipt is not None
+        self.assertEqual(receipt.total(), Money(700))
+
+        carts = self.cart_repo.get_all()
+        self.assertEqual(len(carts), 1)
+        self.assertTrue(carts[0].paid)
+        self.assertEqual(carts[0].paid_at, receipt.paid_at)
+        self.assertEqual(self.cart_item_repo.get_total(carts[0]), Money(700))
+
+        record = self.receipt_repo.get_one(carts[0].id)
+        assert record is not None
+        self.assertEqual(
+            record.number, f"{receipt.paid_at.strftime('%Y%m%d')}-{carts[0].id:06d}"
+        )
+
+        self.assertEqual(self.checkout_service.get_cart_items(), [])
+        self.assertEqual(self.journal.replay(), [])
+
+    def test_restore_after_stored_checkout(self):
+        self.checkout_service.add_article(self.article1, 2)
+        # the lane crashes after the commit, before the journal is cleared
+        self.checkout_service.reset = lambda: None
+        self.assertIsNotNone(self.checkout_service.checkout())
+        self.journal.close()
+
+        journal = CartJournal(self.journal_path)
+        restored = self.__service(journal)
+        self.assertEqual(restored.get_cart_items(), [])
+        self.assertIsNone(restored.checkout())
+        self.assertEqual(len(self.cart_repo.get_all()), 1)
+        self.assertEqual(journal.replay(), [])
+        journal.close()
+
+    def test_restore_after_failed_checkout(self):
+        self.checkout_service.add_article(self.article1, 1)
+        fake_article = Article(id=999, name="test", price=Money(200), category_id=1)
+        self.checkout_service.add_article(fake_article, 1)
+        self.assertIsNone(self.checkout_service.checkout())
+        self.journal.close()
+
+        journal = CartJournal(self.journal_path)
+        restored = self.__service(journal)
+        self.assertEqual(len(restored.get_cart_items()), 2)
+        journal.close()
+
+    def test_journal_error_refuses_changes(self):
+        journal = CartJournal(os.path.join(self.tmp.name, "missing", "cart.journal"))
+        service = self.__service(journal)
+
+        self.assertFalse(service.add_article(self.article1, 1))
+        self.assertEqual(service.get_cart_items(), [])
+        self.assertEqual(service.get_total(), Money(0))
+
+    def test_checkout_empty(self):
+        self.assertIsNone(self.checkout_service.checkout())
+        self.assertEqual(self.cart_repo.get_all(), [])
+
+    def test_checkout_deleted_article(self):
+        self.checkout_service.add_article(self.article1, 1)
+        fake_article = Article(id=999, name="test", price=Money(200), category_id=1)
+        self.checkout_service.add_article(fake_article, 1)
+
+        self.assertIsNone(self.checkout_service.checkout())
+
+        # nothing is stored and the cart stays open
+        self.assertEqual(self.cart_repo.get_all(), [])
+        self.assertEqual(len(self.checkout_service.get_cart_items()), 2)
+        self.assertEqual(len(self.journal.replay()), 2)
+
+    def test_reset(self):
+        self.checkout_service.add_article(self.article1, 1)
+        self.checkout_service.reset()
+
+        self.assertEqual(self.checkout_service.get_cart_items(), [])
+        self.assertEqual(self.journal.replay(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
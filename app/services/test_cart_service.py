@@ -1,11 +1,16 @@
+from datetime import datetime
 import unittest
 
 from app.db.db import DB
+from app.db.query_budget import query_budget
 from app.db.repos.article_repo import ArticleRepo
 from app.db.repos.cart_item_repo import CartItemRepo
 from app.db.repos.cart_repo import CartRepo
 from app.db.repos.category_repo import CategoryRepo
+from app.db.repos.receipt_repo import ReceiptRepo
 from app.services.cart_service import CartService
+from app.models.money import Money
+from app.models.receipt import Receipt
 
 
 class TestCartService(unittest.TestCase):
@@ -14,15 +19,21 @@ class TestCartService(unittest.TestCase):
         self.cart_repo = CartRepo(self.db)
 
         self.category_repo = CategoryRepo(self.db)
-        self.article_repo = ArticleRepo(self.db, self.category_repo)
-        self.cart_item_repo = CartItemRepo(self.db, self.cart_repo, self.article_repo)
+        self.article_repo = ArticleRepo(self.db)
+        self.cart_item_repo = CartItemRepo(self.db)
 
         self.category_id = self.category_repo.create("Testcategory")
         assert self.category_id is not None
 
-        self.article1_id = self.article_repo.create("Article 1", 1.0, self.category_id)
-        self.article2_id = self.article_repo.create("Article 2", 2.0, self.category_id)
-        self.article3_id = self.article_repo.create("Article 3", 3.0, self.category_id)
+        self.article1_id = self.article_repo.create(
+            "Article 1", Money(100), self.category_id
+        )
+        self.article2_id = self.article_repo.create(
+            "Article 2", Money(200), self.category_id
+        )
+        self.article3_id = self.article_repo.create(
+            "Article 3", Money(300), self.category_id
+        )
         assert self.article1_id is not None
         assert self.article2_id is not None
         assert self.article3_id is not None
@@ -34,40 +45,67 @@ class TestCartService(unittest.TestCase):
         assert self.article2 is not None
         assert self.article3 is not None
 
-        self.cart1_id = self.cart_repo.create()
-        self.cart2_id = self.cart_repo.create()
-        assert self.cart1_id is not None
-        assert self.cart2_id is not None
-
-        self.cart1 = self.cart_repo.get_one(self.cart1_id)
-        self.cart2 = self.cart_repo.get_one(self.cart2_id)
+        self.cart1 = self.cart_repo.create()
+        self.cart2 = self.cart_repo.create()
         assert self.cart1 is not None
         assert self.cart2 is not None
 
-        self.cart_item1_id = self.cart_item_repo.create(self.cart1, self.article1, 1)
-        self.cart_item2_id = self.cart_item_repo.create(self.cart1, self.article2, 2)
-        self.cart_item3_id = self.cart_item_repo.create(self.cart2, self.article3, 3)
-        assert self.cart_item1_id is not None
-        assert self.cart_item2_id is not None
-        assert self.cart_item3_id is not None
-
-        self.cart_item1 = self.cart_item_repo.get_one(self.cart_item1_id)
-        self.cart_item2 = self.cart_item_repo.get_one(self.cart_item2_id)
+        self.cart_item1 = self.cart_item_repo.create(self.cart1, self.article1, 1)
+        self.cart_item2 = self.cart_item_repo.create(self.cart1, self.article2, 2)
+        self.cart_item3 = self.cart_item_repo.create(self.cart2, self.article3, 3)
+        assert self.cart_item1 is not None
+        assert self.cart_item2 is not None
+        assert self.cart_item3 is not None
 
-        self.cart_service = CartService(self.cart_repo, self.cart_item_repo)
+        self.receipt_repo = ReceiptRepo(self.db)
+        self.cart_service = CartService(
+            self.cart_repo, self.cart_item_repo, self.receipt_repo
+        )
 
     def tearDown(self) -> None:
         self.db.close()
 
     def test_get_carts(self):
-        result = self.cart_service.get_carts()
+        with query_budget(self.db, 1):
+            result = self.cart_service.get_carts()
         self.assertEqual(result, [self.cart1, self.cart2])
 
     def test_get_cart_items(self):
         assert self.cart1 is not None
-        result = self.cart_service.get_cart_items(self.cart1.id)
+        with query_budget(self.db, 2):
+            result = self.cart_service.get_cart_items(self.cart1.id)
 
         self.assertEqual(result, [self.cart_item1, self.cart_item2])
 
+    def test_get_cart_total(self):
+        assert self.cart1 is not None
+        with query_budget(self.db, 1):
+            total = self.cart_service.get_cart_total(self.cart1.id)
+        self.assertEqual(total, Money(500))
+        self.assertEqual(self.cart_service.get_cart_total(999), Money(0))
+
     def test_get_cart_items_negative(self):
         self.assertEqual(self.cart_service.get_cart_items(999), [])
+
+    def test_get_receipt_body(self):
+        assert self.cart1 is not None
+        self.assertIsNone(self.cart_service.get_receipt_body(self.cart1.id))
+
+        # paid before receipts were stored, the body is built from the items
+        self.cart1.paid = True
+        self.cart1.paid_at = datetime(2024, 1, 1, 12, 0)
+        self.cart_repo.update(self.cart1)
+        # stored receipt, cart and its items, the cart is looked up once
+        with query_budget(self.db, 3):
+            body = self.cart_service.get_receipt_body(self.cart1.id)
+        assert body is not None
+        self.assertIn("| Article 2 | 2 | 2.00 | 4.00 |", body)
+
+    def test_get_receipt_body_stored(self):
+        assert self.cart2 is not None
+        self.cart2.paid_at = datetime(2024, 1, 1, 12, 0)
+        receipt = Receipt(self.cart2.paid_at, [])
+        self.receipt_repo.create(self.cart2, "20240101-000002", receipt, "stored")
+        with query_budget(self.db, 1):
+            body = self.cart_service.get_receipt_body(self.cart2.id)
+        self.assertEqual(body, "stored")
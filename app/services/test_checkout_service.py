@@ -2,15 +2,18 @@ from datetime import datetime
 import unittest
 
 from app.db.db import DB
+from app.db.query_budget import query_budget
 from app.db.repos.article_repo import ArticleRepo
 from app.db.repos.cart_item_repo import CartItemRepo
 from app.db.repos.cart_repo import CartRepo
 from app.db.repos.category_repo import CategoryRepo
+from app.db.repos.receipt_repo import ReceiptRepo
 from app.models.article import Article
 from app.models.cart_item import CartItem
 from app.models.receipt import Receipt
 from app.models.receipt_item import ReceiptItem
 from app.services.checkout_service import CheckoutService
+from app.models.money import Money
 
 
 class TestCheckoutService(unittest.TestCase):
@@ -21,16 +24,16 @@ class TestCheckoutService(unittest.TestCase):
         self.category_id = self.category_repo.create("Testcategory 1")
         assert self.category_id is not None
 
-        self.article_repo = ArticleRepo(self.db, self.category_repo)
+        self.article_repo = ArticleRepo(self.db)
 
         self.article1_id = self.article_repo.create(
-            "Testarticle 1", 2.0, self.category_id
+            "Testarticle 1", Money(200), self.category_id
         )
         self.article2_id = self.article_repo.create(
-            "Testarticle 2", 3.0, self.category_id
+            "Testarticle 2", Money(300), self.category_id
         )
         self.article3_id = self.article_repo.create(
-            "Testarticle 3 2", 4.0, self.category_id
+            "Testarticle 3 2", Money(400), self.category_id
         )
         assert self.article1_id is not None
         assert self.article2_id is not None
@@ -66,10 +69,16 @@ class TestCheckoutService(unittest.TestCase):
         )
 
         self.cart_repo = CartRepo(self.db)
-        self.cart_item_repo = CartItemRepo(self.db, self.cart_repo, self.article_repo)
+        self.cart_item_repo = CartItemRepo(self.db)
+
+        self.receipt_repo = ReceiptRepo(self.db)
 
         self.checkout_service = CheckoutService(
-            self.article_repo, self.cart_repo, self.cart_item_repo
+            self.article_repo,
+            self.cart_repo,
+            self.cart_item_repo,
+            self.receipt_repo,
+            self.db,
         )
 
     def tearDown(self) -> None:
@@ -85,7 +94,9 @@ class TestCheckoutService(unittest.TestCase):
         assert self.article1 is not None
 
         quantity = 2
-        added = self.checkout_service.add_article(self.article1, quantity)
+        # the open cart and the line
+        with query_budget(self.db, 2):
+            added = self.checkout_service.add_article(self.article1, quantity)
         self.assertTrue(added)
 
         expected = CartItem(
@@ -110,9 +121,10 @@ class TestCheckoutService(unittest.TestCase):
         added = self.checkout_service.add_article(self.article1, quantity)
         self.assertTrue(added)
 
-        added_existing = self.checkout_service.add_article(
-            self.article1_model, quantity
-        )
+        with query_budget(self.db, 1):
+            added_existing = self.checkout_service.add_article(
+                self.article1_model, quantity
+            )
         self.assertTrue(added_existing)
 
         expected = CartItem(
@@ -129,7 +141,7 @@ class TestCheckoutService(unittest.TestCase):
         self.assertEqual(cart_item, expected)
 
     def test_add_article_negative(self):
-        fake_article = Article(id=999, name="test", price=2.0, category_id=9999)
+        fake_article = Article(id=999, name="test", price=Money(200), category_id=9999)
 
         added = self.checkout_service.add_article(fake_article, 2)
         self.assertFalse(added)
@@ -163,7 +175,9 @@ class TestCheckoutService(unittest.TestCase):
         self.checkout_service.add_article(self.article2, quantities[1])
         self.checkout_service.add_article(self.article3, quantities[2])
 
-        result = self.checkout_service.checkout()
+        # marks the cart paid and stores the receipt, the items come from memory
+        with query_budget(self.db, 2):
+            result = self.checkout_service.checkout()
 
         cart = self.cart_repo.get_one(1)
         assert cart is not None
@@ -191,3 +205,97 @@ class TestCheckoutService(unittest.TestCase):
         )
 
         self.assertEqual(result, expected)
+
+        # the receipt is stored with the cart
+        record = self.receipt_repo.get_one(cart.id)
+        assert record is not None
+        self.assertEqual(record.total, expected.total())
+        self.assertEqual(record.item_count, sum(quantities))
+        self.assertEqual(record.paid_at, cart.paid_at)
+        self.assertEqual(record.number, f"{cart.paid_at:%Y%m%d}-{cart.id:06d}")
+        self.assertIn("Testarticle 3 2", record.body)
+
+    def test_checkout_paid_cart(self):
+        assert self.article1 is not None
+        self.checkout_service.add_article(self.article1, 1)
+        cart = self.cart_repo.get_one(1)
+        assert cart is not None
+
+        # paid somewhere else in the meantime, the checkout must not store a second receipt
+        cart.paid = True
+        cart.paid_at = datetime(2024, 1, 1, 12, 0)
+        self.cart_repo.update(cart)
+
+        self.assertIsNone(self.checkout_service.checkout())
+        self.assertIsNone(self.receipt_repo.get_one(cart.id))
+
+    def test_get_cart_items_and_total(self):
+        assert self.article1 is not None
+        assert self.article2 is not None
+
+        self.checkout_service.add_article(self.article1, 2)
+        self.checkout_service.add_article(self.article2, 1)
+        self.checkout_service.add_article(self.article1, 1)
+
+        with query_budget(self.db, 0):
+            items = self.checkout_service.get_cart_items()
+            self.assertEqual(self.checkout_service.get_total(), Money(900))
+            self.assertEqual(self.checkout_service.get_item_count(), 4)
+        self.assertEqual(items, self.cart_item_repo.get_all())
+
+        # copies, changing them does not change the cart
+        items[0].quantity = 99
+        self.assertEqual(self.checkout_service.get_total(), Money(900))
+
+        self.checkout_service.remove_article(items[0].id)
+        self.assertEqual(self.checkout_service.get_total(), Money(300))
+        self.assertEqual(self.checkout_service.get_item_count(), 1)
+
+    def test_checkout_starts_new_cart(self):
+        assert self.article1 is not None
+
+        self.checkout_service.add_article(self.article1, 1)
+        self.assertIsNotNone(self.checkout_service.checkout())
+        self.assertEqual(self.checkout_service.get_cart_items(), [])
+
+        # the paid cart is left alone
+        self.checkout_service.add_article(self.article1, 1)
+        items = self.checkout_service.get_cart_items()
+        self.assertEqual([(item.cart_id, item.quantity) for item in items], [(2, 1)])
+
+    def test_get_cart_item_by_article(self):
+        assert self.article1 is not None
+        assert self.article2 is not None
+
+        self.assertIsNone(
+            self.checkout_service.get_cart_item_by_article(self.article1.id)
+        )
+
+        self.checkout_service.add_article(self.article1, 1)
+        self.checkout_service.add_article(self.article1, 2)
+
+        cart_item = self.checkout_service.get_cart_item_by_article(self.article1.id)
+        assert cart_item is not None
+        self.assertEqual(cart_item, self.cart_item_repo.get_one(cart_item.id))
+        self.assertEqual(cart_item.quantity, 3)
+        self.assertIsNone(
+            self.checkout_service.get_cart_item_by_article(self.article2.id)
+        )
+
+    def test_add_by_code(self):
+        assert self.article2 is not None
+        self.article2.barcode = "7610000000017"
+        self.article_repo.update(self.article2)
+
+        cart_item = self.checkout_service.add_by_code("7610000000017\n")
+        assert cart_item is not None
+        self.assertEqual(cart_item.article_id, self.article2.id)
+        self.assertEqual(cart_item.quantity, 1)
+
+        cart_item = self.checkout_service.add_by_code("7610000000017", 2)
+        assert cart_item is not None
+        self.assertEqual(cart_item.quantity, 3)
+        self.assertEqual(self.checkout_service.get_total(), Money(900))
+
+        self.assertIsNone(self.checkout_service.add_by_code("4000000000000"))
+        self.assertEqual(len(self.checkout_service.get_cart_items()), 1)
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from app.db.db import DB
+from app.db.db_config import DBConfig
+from app.db.instrumentation import Instrumentation, instrument
+from app.db.repos.cached_article_repo import CachedArticleRepo
+from app.db.repos.category_repo import CategoryRepo
+from app.models.money import Money
+from app.services.diagnostics_service import DiagnosticsService
+
+
+class TestDiagnosticsService(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DB(config=DBConfig(path=os.path.join(self.tmp.name, "cashier.db")))
+        self.instrumentation = Instrumentation()
+        self.db.set_trace(self.instrumentation.trace)
+        self.article_repo = instrument(
+            CachedArticleRepo(self.db),
+            self.instrumentation,
+            "repo.article",
+            exclude=("stats",),
+        )
+        self.diagnostics_service = DiagnosticsService(
+            self.db, self.instrumentation, self.article_repo
+        )
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_get_diagnostics(self):
+        category_id = CategoryRepo(self.db).create("Drinks")
+        assert category_id is not None
+        article_id = self.article_repo.create("Water", Money(150), category_id)
+        assert article_id is not None
+        self.article_repo.get_one(article_id)
+
+        diagnostics = self.diagnostics_service.get_diagnostics()
+        self.assertEqual(diagnostics.operations["repo.article.get_one"].calls, 1)
+        self.assertNotIn("repo.article.stats", diagnostics.operations)
+        self.assertGreater(diagnostics.statements, 0)
+        assert diagnostics.cache is not None
+        self.assertEqual(diagnostics.cache.hits, 1)
+        self.assertGreater(diagnostics.db_size, 0)
+        self.assertGreater(diagnostics.wal_size, 0)
+        self.assertEqual(diagnostics.busy_errors, 0)
+        self.assertEqual(diagnostics.pending_calls, 0)
+
+    def test_in_memory_database_has_no_files(self):
+        db = DB(":memory:")
+        try:
+            diagnostics = DiagnosticsService(db, Instrumentation()).get_diagnostics()
+        finally:
+            db.close()
+        self.assertEqual(diagnostics.db_size, 0)
+        self.assertEqual(diagnostics.wal_size, 0)
+        self.assertIsNone(diagnostics.cache)
@@ -6,13 +6,14 @@ from app.db.repos.category_repo import CategoryRepo
 from app.models.article import Article
 from app.models.category import Category
 from app.services.inventory_service import InventoryService
+from app.models.money import Money
 
 
 class TestInventoryService(unittest.TestCase):
     def setUp(self) -> None:
         self.db = DB(":memory:")
         self.category_repo = CategoryRepo(self.db)
-        self.article_repo = ArticleRepo(self.db, self.category_repo)
+        self.article_repo = ArticleRepo(self.db)
 
         self.inventory_service = InventoryService(self.category_repo, self.article_repo)
 
@@ -62,14 +63,14 @@ class TestInventoryService(unittest.TestCase):
         self.assertIsNotNone(category_id)
 
         article_id = self.inventory_service.create_article(
-            "Testarticle 1", 2.0, category_id
+            "Testarticle 1", Money(200), category_id
         )
         assert article_id is not None
         self.assertIsNotNone(article_id)
 
         article = self.article_repo.get_one(article_id)
         expected = Article(
-            id=1, name="Testarticle 1", price=2.0, category_id=category_id
+            id=1, name="Testarticle 1", price=Money(200), category_id=category_id
         )
 
         self.assertEqual(article, expected)
@@ -80,7 +81,7 @@ class TestInventoryService(unittest.TestCase):
         self.assertIsNotNone(category_id)
 
         article_id = self.inventory_service.create_article(
-            "Testarticle 1", 2.0, category_id
+            "Testarticle 1", Money(200), category_id
         )
         assert article_id is not None
         self.assertIsNotNone(article_id)
@@ -95,15 +96,21 @@ class TestInventoryService(unittest.TestCase):
         assert category_id is not None
         self.assertIsNotNone(category_id)
 
-        self.inventory_service.create_article("Testarticle 1", 2.0, category_id)
-        self.inventory_service.create_article("Testarticle 2", 5.0, category_id)
-        self.inventory_service.create_article("Testarticle 3", 4.0, category_id)
+        self.inventory_service.create_article("Testarticle 1", Money(200), category_id)
+        self.inventory_service.create_article("Testarticle 2", Money(500), category_id)
+        self.inventory_service.create_article("Testarticle 3", Money(400), category_id)
 
         articles = self.inventory_service.get_articles()
         expected = [
-            Article(id=1, name="Testarticle 1", price=2.0, category_id=category_id),
-            Article(id=2, name="Testarticle 2", price=5.0, category_id=category_id),
-            Article(id=3, name="Testarticle 3", price=4.0, category_id=category_id),
+            Article(
+                id=1, name="Testarticle 1", price=Money(200), category_id=category_id
+            ),
+            Article(
+                id=2, name="Testarticle 2", price=Money(500), category_id=category_id
+            ),
+            Article(
+                id=3, name="Testarticle 3", price=Money(400), category_id=category_id
+            ),
         ]
 
         self.assertEqual(articles, expected)
@@ -116,14 +123,18 @@ class TestInventoryService(unittest.TestCase):
         self.assertIsNotNone(category1_id)
         self.assertIsNotNone(category2_id)
 
-        self.inventory_service.create_article("Testarticle 1", 2.0, category1_id)
-        self.inventory_service.create_article("Testarticle 2", 5.0, category2_id)
-        self.inventory_service.create_article("Testarticle 3", 4.0, category2_id)
+        self.inventory_service.create_article("Testarticle 1", Money(200), category1_id)
+        self.inventory_service.create_article("Testarticle 2", Money(500), category2_id)
+        self.inventory_service.create_article("Testarticle 3", Money(400), category2_id)
 
         articles = self.inventory_service.get_articles(category2_id)
         expected = [
-            Article(id=2, name="Testarticle 2", price=5.0, category_id=category2_id),
-            Article(id=3, name="Testarticle 3", price=4.0, category_id=category2_id),
+            Article(
+                id=2, name="Testarticle 2", price=Money(500), category_id=category2_id
+            ),
+            Article(
+                id=3, name="Testarticle 3", price=Money(400), category_id=category2_id
+            ),
         ]
 
         self.assertEqual(articles, expected)
@@ -0,0 +1,59 @@
+from datetime import date, datetime
+import unittest
+
+from app.db.db import DB
+from app.db.repos.article_repo import ArticleRepo
+from app.db.repos.cart_item_repo import CartItemRepo
+from app.db.repos.cart_repo import CartRepo
+from app.db.repos.category_repo import CategoryRepo
+from app.db.repos.sales_repo import SalesRepo
+from app.models.money import Money
+from app.models.sales_summary import SalesSummary
+from app.services.report_service import ReportService
+
+
+class TestReportService(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = DB(":memory:")
+        category_id = CategoryRepo(self.db).create("Drinks")
+        assert category_id is not None
+        article_repo = ArticleRepo(self.db)
+        article_id = article_repo.create("Water", Money(150), category_id)
+        assert article_id is not None
+        article = article_repo.get_one(article_id)
+        assert article is not None
+
+        cart_repo = CartRepo(self.db)
+        cart = cart_repo.create()
+        assert cart is not None
+        CartItemRepo(self.db).create(cart, article, 3)
+        cart.paid = True
+        cart.paid_at = datetime(2024, 1, 1, 12, 0)
+        cart_repo.update(cart)
+
+        self.report_service = ReportService(SalesRepo(self.db))
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_get_end_of_day(self):
+        self.assertEqual(
+            self.report_service.get_end_of_day(date(2024, 1, 1)),
+            SalesSummary("2024-01-01", Money(450), 1, 3),
+        )
+
+    def test_get_end_of_day_without_sales(self):
+        self.assertEqual(
+            self.report_service.get_end_of_day(date(2024, 1, 2)),
+            SalesSummary("2024-01-02", Money(0), 0, 0),
+        )
+
+    def test_get_top_articles(self):
+        articles = self.report_service.get_top_articles(
+            date(2024, 1, 1), date(2024, 1, 31)
+        )
+        self.assertEqual([article.article_name for article in articles], ["Water"])
+
+
+if __name__ == "__main__":
+    unittest.main()
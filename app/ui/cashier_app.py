@@ -1,43 +1,130 @@
+from typing import Optional, TypeVar
 from textual.app import App
+from textual.binding import Binding
 from textual.widgets import Header, Footer, TabPane, TabbedContent
 
+from app.db.cart_journal import CartJournal
 from app.db.db import DB
+from app.db.db_config import DBConfig
+from app.db.executor import DBExecutor
+from app.db.instrumentation import Instrumentation, instrument
 from app.db.repos.category_repo import CategoryRepo
-from app.db.repos.article_repo import ArticleRepo
+from app.db.repos.cached_article_repo import CachedArticleRepo
 from app.db.repos.cart_repo import CartRepo
 from app.db.repos.cart_item_repo import CartItemRepo
+from app.db.repos.receipt_repo import ReceiptRepo
 
+from app.services.buffered_checkout_service import BufferedCheckoutService
 from app.services.checkout_service import CheckoutService
 from app.services.inventory_service import InventoryService
 from app.services.cart_service import CartService
+from app.services.diagnostics_service import DiagnosticsService
+from app.services.async_services import (
+    AsyncCartService,
+    AsyncCheckoutService,
+    AsyncInventoryService,
+)
+from app.ui.screens.diagnostics_modal import DiagnosticsModal
 from app.ui.widgets.purchases import Purchases
 from app.ui.widgets.checkout import Checkout
 from app.ui.widgets.inventory import Inventory
 
+T = TypeVar("T")
+
 
 class CashierApp(App):
     CSS_PATH = ["./styles/main.tcss"]
     TITLE = "Cashier"
+    BINDINGS = [Binding("f12", "diagnostics", "Diagnostics", show=False)]
 
-    def __init__(self):
+    def __init__(
+        self,
+        db_config: Optional[DBConfig] = None,
+        cart_journal: Optional[str] = None,
+        instrumentation: Optional[str] = None,
+    ):
+        """
+        with a cart_journal path the open cart is kept in memory and journaled to that file,
+        it is only written to the database at checkout
+        the statements and timings of every repo and service call are recorded for the
+        diagnostics (F12), with an instrumentation path they are written to that file as JSON on exit
+        """
         super().__init__()
-        self.__db = DB("cashier.db")
+        self.__db = DB(config=db_config)
+        self.__executor = DBExecutor(self.__db)
+
+        self.__instrumentation_path = instrumentation
+        self.instrumentation = Instrumentation()
+        self.__db.set_trace(self.instrumentation.trace)
 
         # repos
-        category_repo = CategoryRepo(self.__db)
-        article_repo = ArticleRepo(self.__db, category_repo)
-        cart_repo = CartRepo(self.__db)
-        cart_item_repo = CartItemRepo(self.__db, cart_repo, article_repo)
-
-        # services
-        self.__checkout_service = CheckoutService(
-            article_repo, cart_repo, cart_item_repo
+        category_repo = self.__instrument(CategoryRepo(self.__db), "repo.category")
+        article_repo = self.__instrument(CachedArticleRepo(self.__db), "repo.article")
+        self.__article_repo = article_repo
+        cart_repo = self.__instrument(CartRepo(self.__db), "repo.cart")
+        cart_item_repo = self.__instrument(CartItemRepo(self.__db), "repo.cart_item")
+        receipt_repo = self.__instrument(ReceiptRepo(self.__db), "repo.receipt")
+
+        # services, the widgets only use the async variants
+        self.__cart_journal: Optional[CartJournal] = None
+        if cart_journal is not None:
+            # a durable database gets a durable journal
+            self.__cart_journal = CartJournal(
+                cart_journal, fsync=self.__db.config.synchronous == "FULL"
+            )
+            checkout_service = BufferedCheckoutService(
+                article_repo,
+                cart_repo,
+                cart_item_repo,
+                receipt_repo,
+                self.__db,
+                self.__cart_journal,
+            )
+        else:
+            checkout_service = CheckoutService(
+                article_repo, cart_repo, cart_item_repo, receipt_repo, self.__db
+            )
+        self.__checkout_service = AsyncCheckoutService(
+            self.__instrument(checkout_service, "service.checkout"), self.__executor
+        )
+        self.__inventory_service = AsyncInventoryService(
+            self.__instrument(
+                InventoryService(category_repo, article_repo), "service.inventory"
+            ),
+            self.__executor,
+        )
+        self.__cart_service = AsyncCartService(
+            self.__instrument(
+                CartService(cart_repo, cart_item_repo, receipt_repo), "service.cart"
+            ),
+            self.__executor,
         )
-        self.__inventory_service = InventoryService(category_repo, article_repo)
-        self.__cart_service = CartService(cart_repo, cart_item_repo)
+
+        self.__diagnostics_service = DiagnosticsService(
+            self.__db, self.instrumentation, article_repo, self.__executor
+        )
+
+    def __instrument(self, target: T, prefix: str) -> T:
+        # stats is read by the diagnostics every second, it is no database work
+        return instrument(target, self.instrumentation, prefix, exclude=("stats",))
+
+    def on_mount(self) -> None:
+        # scans are resolved from memory, so load the catalog before the first one
+        self.run_worker(self.__executor.run(self.__article_repo.warm), group="warm")
+
+    def action_diagnostics(self) -> None:
+        if isinstance(self.screen, DiagnosticsModal):
+            self.screen.dismiss()
+            return
+        self.push_screen(DiagnosticsModal(self.__diagnostics_service))
 
     def on_exit(self) -> None:
+        self.__executor.shutdown()
+        if self.__cart_journal is not None:
+            self.__cart_journal.close()
         self.__db.close()
+        if self.__instrumentation_path:
+            self.instrumentation.dump(self.__instrumentation_path)
 
     def compose(self):
         yield Header()
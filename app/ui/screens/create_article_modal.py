@@ -5,6 +5,7 @@ from textual.screen import ModalScreen
 from textual.widgets import Button, Input, Label, Select
 
 from app.models.category import Category
+from app.models.money import Money
 
 
 class CreateArticleModal(ModalScreen[dict | None]):
@@ -20,6 +21,7 @@ class CreateArticleModal(ModalScreen[dict | None]):
                 placeholder="Price, e.g. 2.5", id="create_article_price", type="number"
             ),
             Select(id="create_article_categories", options=self.__categories),
+            Input(placeholder="Barcode (optional)", id="create_article_barcode"),
             HorizontalGroup(
                 Button(
                     label="Create Article",
@@ -46,6 +48,7 @@ class CreateArticleModal(ModalScreen[dict | None]):
             name = self.query_one("#create_article_name", Input).value.strip()
             price_raw = self.query_one("#create_article_price", Input).value.strip()
             category_raw = self.query_one("#create_article_categories", Select).value
+            barcode = self.query_one("#create_article_barcode", Input).value.strip()
 
             if not name or price_raw is None or category_raw is None:
                 self.app.notify(
@@ -54,7 +57,7 @@ class CreateArticleModal(ModalScreen[dict | None]):
                 return
 
             try:
-                price = float(price_raw)
+                price = Money.parse(price_raw)
                 category = int(category_raw)
             except ValueError:
                 return
@@ -66,7 +69,8 @@ class CreateArticleModal(ModalScreen[dict | None]):
             self.dismiss(
                 {
                     "name": name,
-                    "price": float(price),
+                    "price": price,
                     "category_id": int(category),
+                    "barcode": barcode or None,
                 }
             )
@@ -0,0 +1,138 @@
+import time
+from collections import deque
+from typing import Deque, Dict
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Button, DataTable, Label, Static
+
+from app.models.diagnostics import Diagnostics
+from app.models.operation_stats import OperationStats
+from app.services.diagnostics_service import DiagnosticsService
+
+# the event loop lag is measured by a timer, a late tick means the loop was blocked
+LAG_INTERVAL = 0.1
+# seconds of lag samples kept for the maximum
+LAG_WINDOW = 5
+REFRESH_INTERVAL = 1.0
+
+
+def format_bytes(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    value = size / 1024
+    for unit in ("KB", "MB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+class DiagnosticsModal(ModalScreen):
+    """
+    live counters of the app: operation latencies and statements, the article cache,
+    the database files and the event loop lag
+    only reads counters, opening it does not add work to the DB thread
+    """
+
+    BINDINGS = [Binding("escape", "close", "Close")]
+
+    def __init__(self, diagnostics_service: DiagnosticsService) -> None:
+        super().__init__()
+        self.__diagnostics_service = diagnostics_service
+        self.__lags: Deque[float] = deque(maxlen=int(LAG_WINDOW / LAG_INTERVAL))
+        self.__last_tick = time.perf_counter()
+
+    def compose(self) -> ComposeResult:
+        yield Vertical(
+            Label("Diagnostics"),
+            Static(id="diagnostics_summary"),
+            DataTable(id="diagnostics_operations", cursor_type="row"),
+            Button(
+                label="Close",
+                variant="error",
+                id="diagnostics_close",
+                flat=True,
+            ),
+            id="diagnostics",
+            classes="dialog",
+        )
+
+    def on_mount(self) -> None:
+        table = self.query_one("#diagnostics_operations", DataTable)
+        table.add_column("Operation", key="operation")
+        table.add_column("Calls", key="calls")
+        table.add_column("Last ms", key="last")
+        table.add_column("Mean ms", key="mean")
+        table.add_column("p95 ms", key="p95")
+        table.add_column("Max ms", key="max")
+        table.add_column("Stmts/call", key="statements")
+        table.add_column("Rows/call", key="rows")
+        table.add_column("Total ms", key="total")
+
+        self.__last_tick = time.perf_counter()
+        self.set_interval(LAG_INTERVAL, self.__tick)
+        self.set_interval(REFRESH_INTERVAL, self.__refresh)
+        self.__refresh()
+
+    def action_close(self) -> None:
+        self.dismiss()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "diagnostics_close":
+            self.dismiss()
+
+    def __tick(self) -> None:
+        now = time.perf_counter()
+        self.__lags.append(max(0.0, now - self.__last_tick - LAG_INTERVAL))
+        self.__last_tick = now
+
+    def __refresh(self) -> None:
+        diagnostics = self.__diagnostics_service.get_diagnostics()
+        self.query_one("#diagnostics_summary", Static).update(
+            self.__summary(diagnostics)
+        )
+
+        table = self.query_one("#diagnostics_operations", DataTable)
+        for name, stats in diagnostics.operations.items():
+            cells = self.__cells(stats)
+            if name not in table.rows:
+                table.add_row(name, *cells.values(), key=name)
+                continue
+            for column, value in cells.items():
+                table.update_cell(name, column, value)
+        # where the time went, slowest operations first
+        table.sort("total", key=float, reverse=True)
+
+    def __cells(self, stats: OperationStats) -> Dict[str, str]:
+        return {
+            "calls": str(stats.calls),
+            "last": f"{stats.last_us / 1000:.2f}",
+            "mean": f"{stats.mean_us / 1000:.2f}",
+            "p95": f"{stats.percentile_us(0.95) / 1000:.2f}",
+            "max": f"{stats.max_us / 1000:.2f}",
+            "statements": f"{stats.statements_per_call:.1f}",
+            "rows": f"{stats.rows_per_call:.1f}",
+            "total": f"{stats.total_us / 1000:.1f}",
+        }
+
+    def __summary(self, diagnostics: Diagnostics) -> str:
+        lines = [
+            f"DB thread: {diagnostics.pending_calls} calls pending, "
+            f"{diagnostics.statements} statements, {diagnostics.busy_errors} busy errors",
+            f"Database: {format_bytes(diagnostics.db_size)}, "
+            f"WAL {format_bytes(diagnostics.wal_size)}",
+        ]
+        if diagnostics.cache is not None:
+            cache = diagnostics.cache
+            lines.append(
+                f"Article cache: {cache.hit_rate:.1%} hits, {cache.size} articles, "
+                f"{cache.evictions} evictions"
+            )
+        lag = self.__lags[-1] if self.__lags else 0.0
+        lines.append(
+            f"Event loop lag: {lag * 1000:.0f} ms, "
+            f"max {max(self.__lags, default=0.0) * 1000:.0f} ms in {LAG_WINDOW} s"
+        )
+        return "\n".join(lines)
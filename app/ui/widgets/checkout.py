@@ -1,28 +1,47 @@
-from typing import List, Optional, Tuple
+import asyncio
+import time
+from typing import Any, Coroutine, List, Optional, Tuple
 from textual.containers import Horizontal, HorizontalGroup, Vertical
 from textual.widget import Widget
 from textual.widgets import Button, DataTable, Digits, Input, Label, ListItem, ListView
 
 from app.models.article import Article
-from app.services.checkout_service import CheckoutService
+from app.models.cart_item import CartItem
+from app.services.async_services import AsyncCheckoutService
 from app.ui.screens.checkout_receipt_modal import CheckoutReceiptModal
 
 
 class Checkout(Widget):
-    def __init__(self, checkout_service: CheckoutService) -> None:
+    # search results shown at once, more are shown on request
+    VISIBLE_RESULTS = 20
+    # scanners send the keys of a code faster than anyone types
+    SCAN_KEY_INTERVAL = 0.03
+
+    def __init__(self, checkout_service: AsyncCheckoutService) -> None:
         super().__init__()
         self.__checkout_service = checkout_service
         self.__articles_found: List[Article] = []
+        # (item id, label) of the mounted article list items
+        self.__article_rows: List[Tuple[str, str]] = []
+        self.__visible_results = self.VISIBLE_RESULTS
         self.__article_selected: Optional[int] = None
         self.__cart_item_selected: Optional[int] = None
         self.quantity: List[Tuple[str, str]] = [(str(x), str(x)) for x in range(1, 10)]
         self.__search_timer = None
+        self.__last_input_change = 0.0
+        # changes to the cart run one at a time, in the order they were started
+        self.__cart_lock = asyncio.Lock()
 
     def on_mount(self) -> None:
         self.query_one("#checkout_settings_article_search", Input).focus()
         table = self.query_one("#checkout_cart_items_table", DataTable)
-        table.add_columns("ID", "Article", "Price", "Quantity", "Line Total")
-        self.__refresh_cart_items()
+        # keyed columns, so single cells can be updated
+        table.add_column("ID", key="id")
+        table.add_column("Article", key="article")
+        table.add_column("Price", key="price")
+        table.add_column("Quantity", key="quantity")
+        table.add_column("Line Total", key="line_total")
+        self.__run_cart_worker(self.__refresh_cart_items())
 
     def compose(self):
         yield Horizontal(
@@ -83,39 +102,76 @@ class Checkout(Widget):
         )
 
     async def __refresh_articles(self) -> None:
+        """
+        keeps the list items shared with the previous results,
+        only the differing tail is removed and the new items are mounted in one batch
+        """
         self.query_one("#checkout_settings_button_add", Button).disabled = True
         self.__article_selected = None
         lv = self.query_one("#checkout_settings_article_list", ListView)
-        await lv.clear()
-        if len(self.__articles_found) > 0:
-            for article in self.__articles_found:
-                await lv.append(
-                    ListItem(
-                        Label(f"{article.name} - CHF {article.price}"),
-                        id=f"art-{article.id}",
-                    )
-                )
 
-    def __refresh_cart_items(self) -> None:
+        visible = self.__articles_found[: self.__visible_results]
+        rows = [
+            (f"art-{article.id}", f"{article.name} - CHF {article.price}")
+            for article in visible
+        ]
+        hidden = len(self.__articles_found) - len(visible)
+        if hidden > 0:
+            rows.append(("art-more", f"Show {min(hidden, self.VISIBLE_RESULTS)} more"))
+
+        shared = 0
+        for shown, row in zip(self.__article_rows, rows):
+            if shown != row:
+                break
+            shared += 1
+
+        lv.index = None
+        if shared < len(self.__article_rows):
+            await lv.remove_items(range(shared, len(self.__article_rows)))
+        if shared < len(rows):
+            await lv.extend([ListItem(Label(text), id=id) for id, text in rows[shared:]])
+        self.__article_rows = rows
+
+    async def __refresh_cart_items(self) -> None:
+        """
+        reloads the whole table, only used on mount and after a reset
+        adding and removing articles update single rows
+        """
+        cart_items = await self.__checkout_service.get_cart_items()
         table = self.query_one("#checkout_cart_items_table", DataTable)
         table.clear(columns=False)
-        cart_items = self.__checkout_service.get_cart_items()
-        total = 0
         for cart_item in cart_items:
-            line_total = cart_item.unit_price * cart_item.quantity
-            total += line_total
-            table.add_row(
-                str(cart_item.id),
-                cart_item.article_name,
-                str(cart_item.unit_price),
-                str(cart_item.quantity),
-                f"CHF {line_total:.2f}",
-            )
-        self.query_one("#checkout_settings_total_display", Digits).update(
-            f"{total:.2f}"
+            self.__add_cart_item_row(table, cart_item)
+        await self.__refresh_total()
+
+    def __add_cart_item_row(self, table: DataTable, cart_item: CartItem) -> None:
+        table.add_row(
+            str(cart_item.id),
+            cart_item.article_name,
+            str(cart_item.unit_price),
+            str(cart_item.quantity),
+            f"CHF {cart_item.line_total()}",
+            key=str(cart_item.id),
         )
+
+    def __update_cart_item_row(self, cart_item: CartItem) -> None:
+        table = self.query_one("#checkout_cart_items_table", DataTable)
+        row_key = str(cart_item.id)
+        if row_key not in table.rows:
+            self.__add_cart_item_row(table, cart_item)
+            return
+        table.update_cell(row_key, "quantity", str(cart_item.quantity))
+        table.update_cell(row_key, "line_total", f"CHF {cart_item.line_total()}")
+
+    async def __refresh_total(self) -> None:
+        total = await self.__checkout_service.get_total()
+        self.query_one("#checkout_settings_total_display", Digits).update(str(total))
         self.__cart_item_selected = None
         self.query_one("#checkout_cart_items_button_delete", Button).disabled = True
+        # a cart restored from the journal can be checked out right away
+        empty = self.query_one("#checkout_cart_items_table", DataTable).row_count == 0
+        self.query_one("#checkout_settings_button_checkout", Button).disabled = empty
+        self.query_one("#checkout_settings_button_abort", Button).disabled = empty
 
     def on_input_changed(self, event: Input.Changed) -> None:
         if event.input.id != "checkout_settings_article_search":
@@ -125,26 +181,73 @@ class Checkout(Widget):
         if self.__search_timer:
             self.__search_timer.stop()
 
-        # Start a new debounce timer (300ms)
+        now = time.monotonic()
+        burst = now - self.__last_input_change < self.SCAN_KEY_INTERVAL
+        self.__last_input_change = now
+
         text = event.input.value
+        if burst:
+            # a scanner burst is complete once its keys stop, even without an Enter
+            self.__search_timer = self.set_timer(
+                self.SCAN_KEY_INTERVAL * 3,
+                lambda: self.__run_cart_worker(self.__scan(text)),
+            )
+            return
+
+        # Start a new debounce timer (300ms)
         self.__search_timer = self.set_timer(
             0.3,
-            lambda: self._perform_search(text),
+            lambda: self.run_worker(
+                self._perform_search(text), group="search", exclusive=True
+            ),
         )
 
-    def _perform_search(self, text: str) -> None:
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id != "checkout_settings_article_search":
+            return
+
+        # Enter ends a scan or a typed code, no need to wait for the debounce
+        if self.__search_timer:
+            self.__search_timer.stop()
+        self.__run_cart_worker(self.__scan(event.value))
+
+    async def __scan(self, code: str) -> None:
+        """
+        adds the article with this barcode, unknown codes are searched as text
+        """
+        if not code.strip():
+            return
+        cart_item = await self.__checkout_service.add_by_code(code, 1)
+        if cart_item is None:
+            self.run_worker(self._perform_search(code), group="search", exclusive=True)
+            return
+
+        self.__update_cart_item_row(cart_item)
+        await self.__refresh_total()
+        # ready for the next scan
+        self.query_one("#checkout_settings_article_search", Input).value = ""
+
+    async def _perform_search(self, text: str) -> None:
+        self.__visible_results = self.VISIBLE_RESULTS
         if len(text) < 2:
             self.__articles_found = []
-            self.run_worker(self.__refresh_articles(), exclusive=True)
+            await self.__refresh_articles()
             return
 
-        self.__articles_found = self.__checkout_service.search_article(text)
-        self.run_worker(self.__refresh_articles(), exclusive=True)
+        articles = await self.__checkout_service.search_article(text)
+        # a newer search is already running
+        if articles is None:
+            return
+        self.__articles_found = articles
+        await self.__refresh_articles()
 
-    def on_list_view_selected(self, event: ListView.Selected) -> None:
+    async def on_list_view_selected(self, event: ListView.Selected) -> None:
         if event.list_view.id == "checkout_settings_article_list":
             id = event.item.id
-            if id and id.startswith("art-"):
+            if id == "art-more":
+                self.__visible_results += self.VISIBLE_RESULTS
+                await self.__refresh_articles()
+            elif id and id.startswith("art-"):
                 self.__article_selected = int(id.split("-", 1)[1])
                 self.query_one("#checkout_settings_button_add", Button).disabled = False
 
@@ -160,16 +263,27 @@ class Checkout(Widget):
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         match event.button.id:
             case "checkout_settings_button_add":
-                self.run_worker(self.__add_article_to_cart(), exclusive=True)
+                self.__run_cart_worker(self.__add_article_to_cart())
             case "checkout_cart_items_button_delete":
-                self.run_worker(self.__remove_cart_item_from_cart(), exclusive=True)
+                self.__run_cart_worker(self.__remove_cart_item_from_cart())
             case "checkout_settings_button_abort":
-                self.run_worker(self.__abort(), exclusive=True)
+                self.__run_cart_worker(self.__abort())
             case "checkout_settings_button_checkout":
-                self.run_worker(self.__checkout(), exclusive=True)
+                self.__run_cart_worker(self.__checkout())
             case _:
                 return
 
+    def __run_cart_worker(self, work: Coroutine[Any, Any, None]) -> None:
+        """
+        cart workers are never cancelled by a newer one, the change of a cancelled worker
+        could already be committed while its rows were not updated yet
+        """
+        self.run_worker(self.__locked(work), group="cart")
+
+    async def __locked(self, work: Coroutine[Any, Any, None]) -> None:
+        async with self.__cart_lock:
+            await work
+
     async def __add_article_to_cart(self) -> None:
         if self.__article_selected is not None:
             article = None
@@ -179,39 +293,30 @@ class Checkout(Widget):
                     break
             if article is None:
                 return
-            added = self.__checkout_service.add_article(article, 1)
+            added = await self.__checkout_service.add_article(article, 1)
             if added:
-                self.query_one(
-                    "#checkout_settings_button_checkout", Button
-                ).disabled = False
-                self.query_one(
-                    "#checkout_settings_button_abort", Button
-                ).disabled = False
-                self.__refresh_cart_items()
+                cart_item = await self.__checkout_service.get_cart_item_by_article(
+                    article.id
+                )
+                if cart_item is not None:
+                    self.__update_cart_item_row(cart_item)
+                await self.__refresh_total()
 
     async def __remove_cart_item_from_cart(self) -> None:
         if self.__cart_item_selected is not None:
-            removed = self.__checkout_service.remove_article(self.__cart_item_selected)
+            cart_item_id = self.__cart_item_selected
+            removed = await self.__checkout_service.remove_article(cart_item_id)
             if removed:
-                self.__cart_item_selected = None
-                self.__refresh_cart_items()
-                self.query_one(
-                    "#checkout_cart_items_button_delete", Button
-                ).disabled = True
-                if len(self.__checkout_service.get_cart_items()) == 0:
-                    self.query_one(
-                        "#checkout_settings_button_checkout", Button
-                    ).disabled = True
-                    self.query_one(
-                        "#checkout_settings_button_abort", Button
-                    ).disabled = True
+                table = self.query_one("#checkout_cart_items_table", DataTable)
+                table.remove_row(str(cart_item_id))
+                await self.__refresh_total()
 
     async def __abort(self) -> None:
-        self.__checkout_service.reset()
+        await self.__checkout_service.reset()
         await self.__reset()
 
     async def __checkout(self) -> None:
-        receipt = self.__checkout_service.checkout()
+        receipt = await self.__checkout_service.checkout()
         self.log("checkout", receipt)
         if receipt is not None:
             self.app.push_screen(CheckoutReceiptModal(receipt))
@@ -230,6 +335,7 @@ class Checkout(Widget):
         self.__article_selected = None
         self.__cart_item_selected = None
         self.__articles_found = []
+        self.__visible_results = self.VISIBLE_RESULTS
 
-        self.__refresh_cart_items()
+        await self.__refresh_cart_items()
         await self.__refresh_articles()
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Tuple
 from textual.app import ComposeResult
 from textual.containers import (
     Horizontal,
@@ -8,13 +8,15 @@ from textual.containers import (
 from textual.widget import Widget
 from textual.widgets import Button, DataTable, Label, ListItem, ListView
 
-from app.services.inventory_service import InventoryService
+from app.models.article import Article
+from app.services.async_services import AsyncInventoryService
 from app.ui.screens.create_article_modal import CreateArticleModal
 from app.ui.screens.create_category_modal import CreateCategoryModal
+from app.ui.widgets.paged_table import PagedTable
 
 
 class Inventory(Widget):
-    def __init__(self, inventory_service: InventoryService):
+    def __init__(self, inventory_service: AsyncInventoryService):
         super().__init__()
         self.__inventory_service = inventory_service
         self.__selected_category_id: Optional[int] = None
@@ -45,7 +47,16 @@ class Inventory(Widget):
             ),
             Vertical(
                 Label("Articles", classes="title"),
-                DataTable(id="inventory_articles_table"),
+                PagedTable(
+                    load_page=lambda after: self.__inventory_service.get_articles_page(
+                        self.__selected_category_id, after
+                    ),
+                    to_row=self.__article_row,
+                    count=lambda: self.__inventory_service.count_articles(
+                        self.__selected_category_id
+                    ),
+                    id="inventory_articles_table",
+                ),
                 HorizontalGroup(
                     Button(
                         label="Create Article",
@@ -71,13 +82,13 @@ class Inventory(Widget):
         table.add_columns("ID", "Name", "Price", "Category", "Created at")
 
         await self.refresh_categories()
-        self.refresh_articles()
+        await self.refresh_articles()
 
         lv = self.query_one("#inventory_categories_list", ListView)
         lv.index = 0
 
     async def refresh_categories(self) -> None:
-        categories = self.__inventory_service.get_categories()
+        categories = await self.__inventory_service.get_categories()
         self.query_one("#inventory_categories_button_delete", Button).disabled = True
         lv = self.query_one("#inventory_categories_list", ListView)
 
@@ -88,26 +99,24 @@ class Inventory(Widget):
         for category in categories:
             await lv.append(ListItem(Label(category.name), id=f"cat-{category.id}"))
 
-    def refresh_articles(self) -> None:
+    async def refresh_articles(self) -> None:
         self.__selected_article_id = None
         self.query_one("#inventory_articles_button_delete", Button).disabled = True
-        articles = self.__inventory_service.get_articles(self.__selected_category_id)
-        table = self.query_one("#inventory_articles_table", DataTable)
-        table.clear(columns=False)
-
-        for article in articles:
-            created_at = (
-                article.created_at.strftime("%d.%m.%y %H:%M")
-                if article.created_at is not None
-                else ""
-            )
-            table.add_row(
-                str(article.id),
-                article.name,
-                str(article.price),
-                str(article.category_id),
-                created_at,
-            )
+        await self.query_one("#inventory_articles_table", PagedTable).reload()
+
+    def __article_row(self, article: Article) -> Tuple[str, ...]:
+        created_at = (
+            article.created_at.strftime("%d.%m.%y %H:%M")
+            if article.created_at is not None
+            else ""
+        )
+        return (
+            str(article.id),
+            article.name,
+            str(article.price),
+            str(article.category_id),
+            created_at,
+        )
 
     def on_list_view_selected(self, event: ListView.Selected) -> None:
         if event.list_view.id != "inventory_categories_list":
@@ -120,7 +129,7 @@ class Inventory(Widget):
             self.query_one(
                 "#inventory_categories_button_delete", Button
             ).disabled = True
-            self.refresh_articles()
+            self.run_worker(self.refresh_articles(), group="articles", exclusive=True)
             return
 
         if item_id and item_id.startswith("cat-"):
@@ -129,7 +138,7 @@ class Inventory(Widget):
             self.query_one(
                 "#inventory_categories_button_delete", Button
             ).disabled = False
-            self.refresh_articles()
+            self.run_worker(self.refresh_articles(), group="articles", exclusive=True)
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         match event.button.id:
@@ -149,7 +158,7 @@ class Inventory(Widget):
         if name is None:
             return
 
-        category_id = self.__inventory_service.create_category(name)
+        category_id = await self.__inventory_service.create_category(name)
         if category_id is None:
             return
 
@@ -159,7 +168,7 @@ class Inventory(Widget):
         if self.__selected_category_id is None:
             return
 
-        if self.__inventory_service.delete_category(self.__selected_category_id):
+        if await self.__inventory_service.delete_category(self.__selected_category_id):
             self.app.notify("Category has been deleted.", severity="information")
             self.__selected_category_id = None
             self.query_one(
@@ -167,12 +176,12 @@ class Inventory(Widget):
             ).disabled = True
             self.query_one("#inventory_articles_button_delete", Button).disabled = True
             await self.refresh_categories()
-            self.refresh_articles()
+            await self.refresh_articles()
         else:
             self.app.notify("Category could not be deleted", severity="warning")
 
     async def __create_article_workflow(self) -> None:
-        categories = self.__inventory_service.get_categories()
+        categories = await self.__inventory_service.get_categories()
         if not categories:
             self.app.notify("Please create a category first.", severity="warning")
             return
@@ -181,19 +190,24 @@ class Inventory(Widget):
         if payload is None:
             return
 
-        article_id = self.__inventory_service.create_article(
-            payload["name"], payload["price"], payload["category_id"]
+        article_id = await self.__inventory_service.create_article(
+            payload["name"],
+            payload["price"],
+            payload["category_id"],
+            payload["barcode"],
         )
         if article_id is None:
             return
 
-        self.refresh_articles()
+        await self.refresh_articles()
 
     async def __delete_article_workflow(self) -> None:
         if self.__selected_article_id is None:
             return
 
-        deleted = self.__inventory_service.delete_article(self.__selected_article_id)
+        deleted = await self.__inventory_service.delete_article(
+            self.__selected_article_id
+        )
         if not deleted:
             self.app.notify("Could not delete article", severity="warning")
             return
@@ -201,7 +215,7 @@ class Inventory(Widget):
         self.__selected_article_id = None
         self.query_one("#inventory_articles_button_delete", Button).disabled = True
 
-        self.refresh_articles()
+        await self.refresh_articles()
 
     def on_data_table_cell_selected(self, event: DataTable.CellSelected) -> None:
         if event.data_table.id != "inventory_articles_table":
@@ -0,0 +1,77 @@
+from typing import Any, Awaitable, Callable, Optional, Sequence
+from textual.widgets import DataTable
+
+from app.models.page import Cursor, Page
+
+# rows left below the viewport before the next page is fetched
+PREFETCH_ROWS = 20
+
+
+class PagedTable(DataTable):
+    """
+    DataTable that fetches its rows page by page while the user scrolls down
+    load_page gets the cursor of the previous page (None for the first one),
+    to_row turns an item into the cells of its row,
+    count returns the estimated number of items shown in the border subtitle
+    """
+
+    def __init__(
+        self,
+        load_page: Callable[[Optional[Cursor]], Awaitable[Page[Any]]],
+        to_row: Callable[[Any], Sequence[Any]],
+        count: Optional[Callable[[], Awaitable[int]]] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.__load_page = load_page
+        self.__to_row = to_row
+        self.__count = count
+        self.__total = 0
+        self.__cursor: Optional[Cursor] = None
+        self.__has_more = False
+        self.__loading = False
+        # bumped on reload, pages of an older generation are dropped
+        self.__generation = 0
+
+    async def reload(self) -> None:
+        self.__generation += 1
+        generation = self.__generation
+        self.clear(columns=False)
+        self.__cursor = None
+        self.__has_more = True
+        self.__loading = False
+        if self.__count is not None:
+            total = await self.__count()
+            if generation != self.__generation:
+                return
+            self.__total = total
+        await self.__load_next()
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if self.__has_more and not self.__loading:
+            if new_value >= self.max_scroll_y - PREFETCH_ROWS:
+                # set before the worker starts, the scroll events until then must not
+                # start another worker for the same cursor
+                self.__loading = True
+                self.run_worker(self.__load_next(), group="paged_table")
+
+    async def __load_next(self) -> None:
+        generation = self.__generation
+        self.__loading = True
+        try:
+            page = await self.__load_page(self.__cursor)
+        finally:
+            if generation == self.__generation:
+                self.__loading = False
+        if generation != self.__generation:
+            return
+
+        for item in page.items:
+            self.add_row(*self.__to_row(item))
+        self.__cursor = page.next_cursor
+        self.__has_more = page.has_more
+        if self.__count is not None:
+            self.border_subtitle = (
+                f"{self.row_count} of ~{max(self.__total, self.row_count)}"
+            )
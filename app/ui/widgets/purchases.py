@@ -1,26 +1,53 @@
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from textual.containers import Horizontal, HorizontalGroup, Vertical
 from textual.widget import Widget
-from textual.widgets import DataTable, Label, Markdown, Switch
-from app.services.cart_service import CartService
-from app.factories.receipt_builder import ReceiptBuilder
+from textual.widgets import DataTable, Label, Markdown, Select, Switch
+from app.models.cart import Cart
+from app.models.cart_filter import CartFilter
+from app.services.async_services import AsyncCartService
+from app.ui.widgets.paged_table import PagedTable
+
+PAID_RANGES = [
+    ("All time", "all"),
+    ("Today", "today"),
+    ("Last 7 days", "week"),
+    ("This month", "month"),
+]
 
 
 class Purchases(Widget):
-    def __init__(self, cart_service: CartService):
+    def __init__(self, cart_service: AsyncCartService):
         super().__init__()
         self.__cart_service = cart_service
-        self.__receipt_builder = ReceiptBuilder()
         self.__cart_item_selected: Optional[int] = None
         self.__show_paid_only: bool = False
+        self.__paid_range: str = "all"
 
     def compose(self):
         yield (
             Horizontal(
                 Vertical(
                     Label("Carts"),
-                    DataTable(id="purchases_carts_table"),
+                    PagedTable(
+                        load_page=lambda after: self.__cart_service.get_carts_page(
+                            after,
+                            sort="id" if self.__paid_range == "all" else "paid_at",
+                            cart_filter=self.__cart_filter(),
+                        ),
+                        to_row=self.__cart_row,
+                        count=lambda: self.__cart_service.count_carts(
+                            self.__cart_filter()
+                        ),
+                        id="purchases_carts_table",
+                    ),
                     HorizontalGroup(
+                        Select(
+                            PAID_RANGES,
+                            value="all",
+                            allow_blank=False,
+                            id="purchases_carts_range",
+                        ),
                         Label(
                             "Show paid carts only", id="purchases_carts_switch_label"
                         ),
@@ -49,25 +76,38 @@ class Purchases(Widget):
             "Paid at",
             "Created at",
         )
-        self.__refresh_carts()
+        self.run_worker(self.__refresh_carts(), group="carts", exclusive=True)
 
-    def __refresh_carts(self) -> None:
-        table = self.query_one("#purchases_carts_table", DataTable)
-        table.clear(columns=False)
+    async def __refresh_carts(self) -> None:
         self.__cart_item_selected = None
-        carts = self.__cart_service.get_carts()
-        if self.__show_paid_only:
-            carts_filtered = [cart for cart in carts if cart.paid]
-        else:
-            carts_filtered = carts
-        for cart in carts_filtered:
-            status = "Completed" if cart.paid else "Open"
-            table.add_row(
-                str(cart.id),
-                status,
-                cart.paid_at.strftime("%d.%m.%Y %H:%M") if cart.paid_at else "",
-                cart.created_at.strftime("%d.%m.%Y %H:%M") if cart.created_at else "",
-            )
+        await self.query_one("#purchases_carts_table", PagedTable).reload()
+
+    def __cart_filter(self) -> CartFilter:
+        paid = True if self.__show_paid_only else None
+        if self.__paid_range == "all":
+            return CartFilter(paid=paid)
+
+        # ranges end with today, in local time like the paid_at column
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        match self.__paid_range:
+            case "week":
+                paid_from = today - timedelta(days=6)
+            case "month":
+                paid_from = today.replace(day=1)
+            case _:
+                paid_from = today
+        return CartFilter(
+            paid=paid, paid_from=paid_from, paid_to=today + timedelta(days=1)
+        )
+
+    def __cart_row(self, cart: Cart) -> Tuple[str, ...]:
+        status = "Completed" if cart.paid else "Open"
+        return (
+            str(cart.id),
+            status,
+            cart.paid_at.strftime("%d.%m.%Y %H:%M") if cart.paid_at else "",
+            cart.created_at.strftime("%d.%m.%Y %H:%M") if cart.created_at else "",
+        )
 
     def on_data_table_cell_selected(self, event: DataTable.CellSelected) -> None:
         if event.data_table.id != "purchases_carts_table":
@@ -79,17 +119,32 @@ class Purchases(Widget):
         row_key = event.cell_key.row_key
         row = table.get_row(row_key)
         self.__cart_item_selected = int(row[0])
-        receipt_model = self.__cart_service.get_receipt(self.__cart_item_selected)
-        if receipt_model:
-            if receipt_model.paid_at is not None:
-                reciept = self.__receipt_builder.build(receipt_model)
-                self.query_one("#purchases_receipt_markdown", Markdown).update(reciept)
+        self.run_worker(
+            self.__show_receipt(self.__cart_item_selected),
+            group="receipt",
+            exclusive=True,
+        )
+
+    async def __show_receipt(self, cart_id: int) -> None:
+        # a single lookup of the receipt stored at checkout
+        reciept = await self.__cart_service.get_receipt_body(cart_id)
+        if reciept is not None:
+            self.query_one("#purchases_receipt_markdown", Markdown).update(reciept)
+
+    def on_select_changed(self, event: Select.Changed) -> None:
+        if event.select.id != "purchases_carts_range":
+            return
+        self.__paid_range = str(event.value)
+        self.run_worker(self.__refresh_carts(), group="carts", exclusive=True)
+        self.query_one("#purchases_receipt_markdown", Markdown).update(
+            "Select a completed cart to view receipt"
+        )
 
     def on_switch_changed(self, event: Switch.Changed):
         if event.switch.id == "purchases_carts_switch":
             sw = self.query_one("#purchases_carts_switch", Switch)
             self.__show_paid_only = sw.value
-            self.__refresh_carts()
+            self.run_worker(self.__refresh_carts(), group="carts", exclusive=True)
             self.__cart_item_selected = None
             self.query_one("#purchases_receipt_markdown", Markdown).update(
                 "Select a completed cart to view receipt"
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import List, Optional
+from app.db.db import DB
+from app.db.db_config import DBConfig
+from bench.benchmarks import benchmarks
+from bench.compare import compare, format_table, regressions
+from bench.generator import DatasetSpec, generate
+from bench.load import OPERATIONS, Mix, format_report, lane_specs, run_load
+from bench.runner import Results, environment, measure
+
+
+def run(args: argparse.Namespace) -> int:
+    spec = DatasetSpec(
+        categories=args.categories,
+        articles=args.articles,
+        carts=args.carts,
+        seed=args.seed,
+    )
+    pattern = re.compile(args.filter) if args.filter else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DB(config=DBConfig.profile(args.profile, os.path.join(tmp, "bench.db")))
+        try:
+            start = time.perf_counter()
+            dataset = generate(db, spec)
+            print(
+                f"generated {len(dataset.article_ids)} articles, {len(dataset.cart_ids)} carts "
+                f"and {dataset.cart_items} cart items in {time.perf_counter() - start:.1f}s",
+                file=sys.stderr,
+            )
+
+            results = Results(
+                meta={
+                    **environment(),
+                    "profile": args.profile,
+                    "runs": args.runs,
+                    "dataset": {
+                        **asdict(spec),
+                        "end": spec.end.isoformat(),
+                        "cart_items": dataset.cart_items,
+                    },
+                }
+            )
+            for benchmark in benchmarks(db, dataset, os.path.join(tmp, "cart.journal")):
+                if pattern is not None and not pattern.search(benchmark.name):
+                    continue
+                result = measure(benchmark, runs=args.runs)
+                results.results[result.name] = result
+                print(
+                    f"{result.name:<48} {result.median_us:12.1f} us  p95 {result.p95_us:12.1f} us",
+                    file=sys.stderr,
+                )
+        finally:
+            db.close()
+
+    if args.output == "-":
+        print(results.to_json())
+    else:
+        results.save(args.output)
+    return 0
+
+
+def run_compare(args: argparse.Namespace) -> int:
+    base = Results.load(args.base)
+    head = Results.load(args.head)
+    if base.meta.get("dataset") != head.meta.get("dataset"):
+        print("warning: the runs used different datasets", file=sys.stderr)
+    changes = compare(base, head)
+    print(format_table(changes, args.threshold))
+    slower = regressions(changes, args.threshold)
+    if slower:
+        print(
+            f"\n{len(slower)} benchmarks are more than {args.threshold:.0%} slower",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+def parse_mix(text: str) -> Mix:
+    """
+    "search=30,add=50,checkout=20", operations left out keep their default weight
+    """
+    weights = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name.strip()!r}")
+        weights[name.strip()] = float(weight)
+    return Mix(**weights)
+
+
+def run_load_command(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db
+        if path is None:
+            # a fresh store, the lanes only add to it
+            path = os.path.join(tmp, "load.db")
+            db = DB(config=DBConfig.profile(args.profile, path))
+            generate(
+                db,
+                DatasetSpec(articles=args.articles, carts=args.carts, seed=args.seed),
+            )
+            db.close()
+
+        specs = lane_specs(
+            args.lanes,
+            DBConfig.profile(args.profile, path),
+            args.duration,
+            args.mix,
+            args.think_ms,
+            args.seed,
+        )
+        load_report = run_load(specs, processes=not args.threads)
+
+    print(format_report(load_report), file=sys.stderr)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "meta": {
+                        **environment(),
+                        "profile": args.profile,
+                        "mix": asdict(args.mix),
+                        "think_ms": args.think_ms,
+                        "threads": args.threads,
+                    },
+                    "lanes": load_report.lanes,
+                    "elapsed": load_report.elapsed,
+                    "ops_per_second": load_report.ops_per_second,
+                    "checkouts_per_second": load_report.checkouts_per_second,
+                    "busy_errors": load_report.busy_errors,
+                    "operations": {
+                        name: asdict(stats)
+                        for name, stats in load_report.operations.items()
+                    },
+                },
+                file,
+                indent=2,
+                sort_keys=True,
+            )
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench",
+        description="benchmarks of the cashier repos and services",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser(
+        "run", help="generate a dataset and run the benchmarks"
+    )
+    run_parser.add_argument("--categories", type=int, default=DatasetSpec.categories)
+    run_parser.add_argument("--articles", type=int, default=DatasetSpec.articles)
+    run_parser.add_argument("--carts", type=int, default=DatasetSpec.carts)
+    run_parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    run_parser.add_argument(
+        "--profile", default="default", help="PRAGMA profile of the database"
+    )
+    run_parser.add_argument(
+        "--runs", type=int, default=30, help="timed runs per benchmark"
+    )
+    run_parser.add_argument(
+        "--filter", help="only benchmarks whose name matches this regex"
+    )
+    run_parser.add_argument(
+        "-o", "--output", default="-", help="results file, - for stdout"
+    )
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown reported as regression, 0.1 is 10 %%",
+    )
+    compare_parser.set_defaults(handler=run_compare)
+
+    load_parser = commands.add_parser(
+        "load", help="run concurrent cashier sessions against one database file"
+    )
+    load_parser.add_argument("--lanes", type=int, default=4)
+    load_parser.add_argument(
+        "--duration", type=float, default=10, help="seconds every lane runs"
+    )
+    load_parser.add_argument(
+        "--think-ms", type=float, default=50, help="mean pause between operations"
+    )
+    load_parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=Mix(),
+        help="operation weights, e.g. search=30,add=45,remove=5,abort=2,checkout=18",
+    )
+    load_parser.add_argument(
+        "--threads",
+        action="store_true",
+        help="run the lanes as threads of one process instead of processes",
+    )
+    load_parser.add_argument(
+        "--db", help="existing database to load, a generated one by default"
+    )
+    load_parser.add_argument("--articles", type=int, default=DatasetSpec.articles)
+    load_parser.add_argument("--carts", type=int, default=2000)
+    load_parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    load_parser.add_argument(
+        "--profile", default="default", help="PRAGMA profile of the database"
+    )
+    load_parser.add_argument("-o", "--output", help="write the report as JSON")
+    load_parser.set_defaults(handler=run_load_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+import random
+from datetime import timedelta
+from itertools import cycle
+from typing import Callable, Iterator, List, TypeVar
+from app.db.cart_journal import CartJournal
+from app.db.db import DB
+from app.db.repos.article_repo import ArticleRepo
+from app.db.repos.cached_article_repo import CachedArticleRepo
+from app.db.repos.cart_item_repo import CartItemRepo
+from app.db.repos.cart_repo import CartRepo
+from app.db.repos.category_repo import CategoryRepo
+from app.db.repos.receipt_repo import ReceiptRepo
+from app.db.repos.sales_repo import SalesRepo
+from app.models.cart_filter import CartFilter
+from app.services.buffered_checkout_service import BufferedCheckoutService
+from app.services.cart_service import CartService
+from app.services.checkout_service import CheckoutService
+from app.services.inventory_service import InventoryService
+from app.services.report_service import ReportService
+from bench.generator import Dataset
+from bench.runner import Benchmark
+
+T = TypeVar("T")
+
+# typed by a cashier, from a single word to most of a name
+SEARCHES = ["ch", "choc", "mineral wa", "organic apple", "swiss cheese 250g"]
+
+# lines of the basket paid by the checkout benchmarks
+BASKET_SIZE = 8
+
+
+def next_of(values: List[T], seed: int) -> Callable[[], T]:
+    """
+    endless shuffled iteration, so repeated calls do not hit the same row
+    """
+    values = list(values)
+    random.Random(seed).shuffle(values)
+    iterator: Iterator[T] = cycle(values)
+    return lambda: next(iterator)
+
+
+def benchmarks(db: DB, dataset: Dataset, journal_path: str) -> List[Benchmark]:
+    """
+    one benchmark per repo and service method on the hot paths of a lane
+    the writing ones add to the dataset, their numbers include the commit
+    """
+    article_repo = ArticleRepo(db)
+    cached_article_repo = CachedArticleRepo(db)
+    cached_article_repo.warm()
+    cart_repo = CartRepo(db)
+    cart_item_repo = CartItemRepo(db)
+    receipt_repo = ReceiptRepo(db)
+    sales_repo = SalesRepo(db)
+
+    checkout_service = CheckoutService(
+        cached_article_repo, cart_repo, cart_item_repo, receipt_repo, db
+    )
+    buffered_checkout_service = BufferedCheckoutService(
+        cached_article_repo,
+        cart_repo,
+        cart_item_repo,
+        receipt_repo,
+        db,
+        CartJournal(journal_path),
+    )
+    cart_service = CartService(cart_repo, cart_item_repo, receipt_repo)
+    inventory_service = InventoryService(CategoryRepo(db), cached_article_repo)
+    report_service = ReportService(sales_repo)
+
+    article_id = next_of(dataset.article_ids, 1)
+    barcode = next_of(dataset.barcodes, 2)
+    cart_id = next_of(dataset.cart_ids, 3)
+    category_id = next_of(dataset.category_ids, 4)
+    search = next_of(SEARCHES, 5)
+    article = next_of(cached_article_repo.get_all(), 6)
+
+    day_to = dataset.day_to.date()
+    day_from = dataset.day_from.date()
+    last_month = day_to - timedelta(days=30)
+    deep_cursor = article_repo.get_page(limit=len(dataset.article_ids) // 2).next_cursor
+    paid_last_month = CartFilter(
+        paid=True,
+        paid_from=dataset.day_to - timedelta(days=30),
+        paid_to=dataset.day_to + timedelta(days=1),
+    )
+
+    def fill_basket(service: CheckoutService) -> Callable[[], None]:
+        def setup() -> None:
+            service.reset()
+            for _ in range(BASKET_SIZE):
+                service.add_article(article(), 1)
+
+        return setup
+
+    return [
+        # repos
+        Benchmark(
+            "repo.article.get_one",
+            lambda: article_repo.get_one(article_id()),
+            number=100,
+        ),
+        Benchmark(
+            "repo.article.search", lambda: article_repo.search(search()), number=20
+        ),
+        Benchmark(
+            "repo.article.get_by_barcode",
+            lambda: article_repo.get_by_barcode(barcode()),
+            number=100,
+        ),
+        Benchmark(
+            "repo.article.get_page", lambda: article_repo.get_page(limit=100), number=10
+        ),
+        Benchmark(
+            "repo.article.get_page_deep",
+            lambda: article_repo.get_page(after=deep_cursor, limit=100),
+            number=10,
+        ),
+        Benchmark(
+            "repo.article.get_page_by_category_name",
+            lambda: article_repo.get_page(category_id(), limit=100, sort="name"),
+            number=10,
+        ),
+        Benchmark(
+            "repo.cached_article.get_one",
+            lambda: cached_article_repo.get_one(article_id()),
+            number=1000,
+        ),
+        Benchmark(
+            "repo.cached_article.search",
+            lambda: cached_article_repo.search(search()),
+            number=100,
+        ),
+        Benchmark(
+            "repo.cached_article.get_by_barcode",
+            lambda: cached_article_repo.get_by_barcode(barcode()),
+            number=1000,
+        ),
+        Benchmark(
+            "repo.cart.get_one", lambda: cart_repo.get_one(cart_id()), number=100
+        ),
+        Benchmark(
+            "repo.cart.get_page",
+            lambda: cart_repo.get_page(limit=100, descending=True),
+            number=10,
+        ),
+        Benchmark(
+            "repo.cart.get_page_paid_last_month",
+            lambda: cart_repo.get_page(
+                limit=100, sort="paid_at", descending=True, cart_filter=paid_last_month
+            ),
+            number=10,
+        ),
+        Benchmark(
+            "repo.cart.count_estimate",
+            lambda: cart_repo.count_estimate(paid_last_month),
+            number=10,
+        ),
+        Benchmark(
+            "repo.cart_item.get_all",
+            lambda: cart_item_repo.get_all(cart_repo.get_one(cart_id())),
+            number=100,
+        ),
+        Benchmark(
+            "repo.cart_item.get_total",
+            lambda: cart_item_repo.get_total(cart_repo.get_one(cart_id())),
+            number=100,
+        ),
+        Benchmark(
+            "repo.sales.get_daily_year",
+            lambda: sales_repo.get_daily(day_from, day_to),
+            number=10,
+        ),
+        Benchmark(
+            "repo.sales.get_by_article_year",
+            lambda: sales_repo.get_by_article(day_from, day_to, 10),
+            number=5,
+        ),
+        # services
+        Benchmark(
+            "service.checkout.search_article",
+            lambda: checkout_service.search_article(search()),
+            number=100,
+        ),
+        Benchmark(
+            "service.checkout.add_article",
+            lambda: checkout_service.add_article(article(), 1),
+            setup=checkout_service.reset,
+        ),
+        Benchmark(
+            "service.checkout.add_by_code",
+            lambda: checkout_service.add_by_code(barcode()),
+            setup=checkout_service.reset,
+        ),
+        Benchmark(
+            "service.checkout.checkout",
+            checkout_service.checkout,
+            setup=fill_basket(checkout_service),
+        ),
+        Benchmark(
+            "service.buffered_checkout.add_article",
+            lambda: buffered_checkout_service.add_article(article(), 1),
+            setup=buffered_checkout_service.reset,
+        ),
+        Benchmark(
+            "service.buffered_checkout.checkout",
+            buffered_checkout_service.checkout,
+            setup=fill_basket(buffered_checkout_service),
+        ),
+        Benchmark(
+            "service.cart.get_carts_page",
+            lambda: cart_service.get_carts_page(limit=100),
+            number=10,
+        ),
+        Benchmark(
+            "service.cart.get_receipt_body",
+            lambda: cart_service.get_receipt_body(cart_id()),
+            number=20,
+        ),
+        Benchmark(
+            "service.inventory.get_articles_page",
+            lambda: inventory_service.get_articles_page(category_id(), limit=100),
+            number=10,
+        ),
+        Benchmark(
+            "service.report.get_daily_sales_month",
+            lambda: report_service.get_daily_sales(last_month, day_to),
+            number=20,
+        ),
+        Benchmark(
+            "service.report.get_top_articles_month",
+            lambda: report_service.get_top_articles(last_month, day_to),
+            number=5,
+        ),
+        Benchmark(
+            "service.report.get_category_sales_month",
+            lambda: report_service.get_category_sales(last_month, day_to),
+            number=5,
+        ),
+    ]
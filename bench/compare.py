@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from bench.runner import Results
+
+
+@dataclass(frozen=True)
+class Change:
+    name: str
+    base_us: Optional[float]
+    head_us: Optional[float]
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """
+        head / base of the medians, above 1 is slower
+        """
+        if self.base_us is None or self.head_us is None or self.base_us <= 0:
+            return None
+        return self.head_us / self.base_us
+
+
+def compare(base: Results, head: Results) -> List[Change]:
+    """
+    medians of all benchmarks found in either run, sorted by name
+    """
+    names = sorted(set(base.results) | set(head.results))
+    return [
+        Change(
+            name,
+            base.results[name].median_us if name in base.results else None,
+            head.results[name].median_us if name in head.results else None,
+        )
+        for name in names
+    ]
+
+
+def regressions(changes: List[Change], threshold: float) -> List[Change]:
+    """
+    benchmarks that got slower by more than threshold, 0.1 is 10 %
+    """
+    return [
+        change
+        for change in changes
+        if change.ratio is not None and change.ratio > 1 + threshold
+    ]
+
+
+def format_table(changes: List[Change], threshold: float) -> str:
+    def us(value: Optional[float]) -> str:
+        return f"{value:12.1f}" if value is not None else f"{'-':>12}"
+
+    width = max([len(change.name) for change in changes] + [9])
+    lines = [f"{'benchmark':<{width}} {'base us':>12} {'head us':>12} {'change':>8}"]
+    for change in changes:
+        ratio = change.ratio
+        if ratio is None:
+            mark = f"{'-':>8}"
+        else:
+            mark = f"{(ratio - 1) * 100:+7.1f}%"
+            if ratio > 1 + threshold:
+                mark += " slower"
+            elif ratio < 1 - threshold:
+                mark += " faster"
+        lines.append(
+            f"{change.name:<{width}} {us(change.base_us)} {us(change.head_us)} {mark}"
+        )
+    return "\n".join(lines)
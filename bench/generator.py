@@ -0,0 +1,243 @@
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List, Tuple
+from app.db.db import DB
+
+CATEGORY_NAMES = [
+    "Beverages",
+    "Bakery",
+    "Dairy",
+    "Fruit",
+    "Vegetables",
+    "Meat",
+    "Fish",
+    "Frozen",
+    "Snacks",
+    "Sweets",
+    "Household",
+    "Drugstore",
+    "Pasta & Rice",
+    "Canned Food",
+    "Coffee & Tea",
+    "Spices",
+    "Breakfast",
+    "Wine",
+    "Beer",
+    "Pet Food",
+]
+
+ADJECTIVES = [
+    "Organic",
+    "Fresh",
+    "Classic",
+    "Swiss",
+    "Light",
+    "Premium",
+    "Spicy",
+    "Sweet",
+    "Smoked",
+    "Crunchy",
+    "Wholegrain",
+    "Alpine",
+    "Roasted",
+    "Mild",
+    "Extra",
+    "Family",
+]
+
+NOUNS = [
+    "Apple Juice",
+    "Mineral Water",
+    "Bread",
+    "Croissant",
+    "Milk",
+    "Yogurt",
+    "Cheese",
+    "Butter",
+    "Banana",
+    "Tomato",
+    "Potato",
+    "Chicken",
+    "Salmon",
+    "Pizza",
+    "Chips",
+    "Chocolate",
+    "Detergent",
+    "Shampoo",
+    "Spaghetti",
+    "Rice",
+    "Beans",
+    "Coffee",
+    "Tea",
+    "Paprika",
+    "Muesli",
+    "Red Wine",
+    "Lager",
+    "Cat Food",
+]
+
+SIZES = ["", "100g", "250g", "500g", "1kg", "0.5l", "1l", "1.5l", "6x0.5l", "XL"]
+
+# pieces of one line, most lines are a single piece
+QUANTITIES = (1, 2, 3, 4, 6)
+QUANTITY_WEIGHTS = (70, 15, 8, 4, 3)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    size of a synthetic shop, the same spec and seed always generate the same rows
+    """
+
+    categories: int = 20
+    articles: int = 5000
+    carts: int = 20000
+    # the carts are paid within this many days before end
+    days: int = 365
+    end: datetime = datetime(2025, 12, 31, 20, 0)
+    # share of carts that were never paid
+    open_share: float = 0.01
+    seed: int = 42
+
+
+@dataclass
+class Dataset:
+    """
+    what the generator wrote, benchmarks pick their arguments from here
+    """
+
+    spec: DatasetSpec
+    category_ids: List[int] = field(default_factory=list)
+    article_ids: List[int] = field(default_factory=list)
+    article_names: List[str] = field(default_factory=list)
+    barcodes: List[str] = field(default_factory=list)
+    cart_ids: List[int] = field(default_factory=list)
+    cart_items: int = 0
+
+    @property
+    def day_from(self) -> datetime:
+        return self.spec.end - timedelta(days=self.spec.days)
+
+    @property
+    def day_to(self) -> datetime:
+        return self.spec.end
+
+
+def ean13(number: int) -> str:
+    """
+    12 digit number with the EAN-13 check digit appended
+    """
+    digits = f"{number:012d}"
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+
+def basket_size(rng: random.Random) -> int:
+    # log-normal, median around 6 lines with a long tail of big shops
+    return max(1, min(60, round(rng.lognormvariate(1.8, 0.7))))
+
+
+def price(rng: random.Random) -> int:
+    # log-normal around CHF 3.30, rounded to 5 Rappen
+    return max(20, round(rng.lognormvariate(5.8, 0.8) / 5) * 5)
+
+
+def paid_at(rng: random.Random, spec: DatasetSpec) -> datetime:
+    # opening hours 08:00 to 20:00 with a lunch and an evening peak
+    day = spec.end.date() - timedelta(days=rng.randrange(spec.days))
+    hour = rng.choices(range(8, 20), weights=(2, 3, 3, 4, 6, 5, 3, 3, 4, 6, 7, 5))[0]
+    return datetime(day.year, day.month, day.day, hour) + timedelta(
+        seconds=rng.randrange(3600)
+    )
+
+
+def generate(db: DB, spec: DatasetSpec = DatasetSpec()) -> Dataset:
+    """
+    fills an empty database with categories, articles and historical carts
+    rows are written with plain SQL, the triggers keep totals and sales aggregates
+    """
+    rng = random.Random(spec.seed)
+    dataset = Dataset(spec)
+
+    with db.transaction():
+        with db.write() as conn:
+            conn.executemany(
+                "INSERT INTO categories (id, name) VALUES (?, ?)",
+                [
+                    (id, CATEGORY_NAMES[(id - 1) % len(CATEGORY_NAMES)])
+                    for id in range(1, spec.categories + 1)
+                ],
+            )
+            dataset.category_ids = list(range(1, spec.categories + 1))
+
+            articles: List[Tuple[int, str, int, int, str]] = []
+            for id in range(1, spec.articles + 1):
+                name = " ".join(
+                    part
+                    for part in (
+                        rng.choice(ADJECTIVES),
+                        rng.choice(NOUNS),
+                        rng.choice(SIZES),
+                    )
+                    if part
+                )
+                barcode = ean13(761000000000 + id)
+                articles.append(
+                    (id, name, price(rng), rng.choice(dataset.category_ids), barcode)
+                )
+            conn.executemany(
+                "INSERT INTO articles (id, name, price, category_id, barcode) VALUES (?, ?, ?, ?, ?)",
+                articles,
+            )
+            dataset.article_ids = [article[0] for article in articles]
+            dataset.article_names = [article[1] for article in articles]
+            dataset.barcodes = [article[4] for article in articles]
+
+            # a few articles sell far more often than the rest
+            cum_weights = list(
+                accumulate(1 / (rank**0.8) for rank in range(1, spec.articles + 1))
+            )
+
+            carts = []
+            items = []
+            payments = []
+            for cart_id in range(1, spec.carts + 1):
+                paid = paid_at(rng, spec)
+                created = int(
+                    (paid - timedelta(minutes=rng.randrange(1, 10))).timestamp()
+                )
+                carts.append((cart_id, created, created))
+
+                lines: Dict[int, int] = {}
+                for article in rng.choices(
+                    articles, cum_weights=cum_weights, k=basket_size(rng)
+                ):
+                    quantity = rng.choices(QUANTITIES, weights=QUANTITY_WEIGHTS)[0]
+                    lines[article[0]] = lines.get(article[0], 0) + quantity
+                for article_id, quantity in lines.items():
+                    _, name, unit_price, _, _ = articles[article_id - 1]
+                    items.append((article_id, cart_id, quantity, unit_price, name))
+
+                if rng.random() >= spec.open_share:
+                    payments.append((int(paid.timestamp()), cart_id))
+
+            conn.executemany(
+                "INSERT INTO carts (id, created_at, updated_at) VALUES (?, ?, ?)", carts
+            )
+            conn.executemany(
+                "INSERT INTO m2m_carts_articles (article_id, cart_id, quantity, unit_price, article_name) VALUES (?, ?, ?, ?, ?)",
+                items,
+            )
+            # paying fires the sales triggers like a real checkout
+            conn.executemany(
+                "UPDATE carts SET paid = 1, paid_at = ? WHERE id = ?", payments
+            )
+            dataset.cart_ids = [cart[0] for cart in carts]
+            dataset.cart_items = len(items)
+
+    db.flush()
+    with db.write() as conn:
+        conn.execute("ANALYZE")
+    return dataset
@@ -0,0 +1,252 @@
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from app.db.db import DB
+from app.db.db_config import DBConfig
+from app.db.repos.cached_article_repo import CachedArticleRepo
+from app.db.repos.cart_item_repo import CartItemRepo
+from app.db.repos.cart_repo import CartRepo
+from app.db.repos.receipt_repo import ReceiptRepo
+from app.models.article import Article
+from app.services.checkout_service import CheckoutService
+from bench.runner import percentile
+
+OPERATIONS = ("search", "add", "remove", "abort", "checkout")
+
+
+@dataclass(frozen=True)
+class Mix:
+    """
+    relative weights of the next operation of a session
+    operations that need items fall back to add while the cart is empty
+    """
+
+    search: float = 30
+    add: float = 45
+    remove: float = 5
+    abort: float = 2
+    checkout: float = 18
+
+    def weights(self) -> List[float]:
+        return [getattr(self, operation) for operation in OPERATIONS]
+
+
+@dataclass(frozen=True)
+class LaneSpec:
+    """
+    one simulated cashier, picklable so it can run in another process
+    """
+
+    lane: int
+    db_config: DBConfig
+    duration: float
+    mix: Mix = Mix()
+    # mean pause between two operations, exponentially distributed
+    think_ms: float = 50
+    seed: int = 42
+
+
+@dataclass
+class LaneResult:
+    lane: int
+    # operation -> latencies in milliseconds
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    busy_errors: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass(frozen=True)
+class LoadStats:
+    """
+    latencies of one operation over all lanes, not to be confused with
+    app.models.operation_stats.OperationStats of the instrumentation
+    """
+
+    count: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+@dataclass
+class LoadReport:
+    lanes: int
+    elapsed: float
+    operations: Dict[str, LoadStats]
+    busy_errors: int
+
+    @property
+    def ops_per_second(self) -> float:
+        count = sum(stats.count for stats in self.operations.values())
+        return count / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def checkouts_per_second(self) -> float:
+        stats = self.operations.get("checkout")
+        if stats is None or self.elapsed <= 0:
+            return 0.0
+        return (stats.count - stats.errors) / self.elapsed
+
+
+def run_lane(spec: LaneSpec) -> LaneResult:
+    """
+    runs one cashier session loop until spec.duration seconds have passed
+    the lane has its own DB connections, repos and CheckoutService like a real lane process
+    """
+    rng = random.Random(spec.seed * 1000 + spec.lane)
+    db = DB(config=spec.db_config)
+    article_repo = CachedArticleRepo(db)
+    checkout_service = CheckoutService(
+        article_repo, CartRepo(db), CartItemRepo(db), ReceiptRepo(db), db
+    )
+    articles = article_repo.get_all()
+    result = LaneResult(spec.lane)
+    in_cart: List[int] = []
+
+    def search() -> bool:
+        # the first letters of a word of an article name, as typed by the cashier
+        word = rng.choice(re.findall(r"\w+", rng.choice(articles).name) or ["a"])
+        checkout_service.search_article(word[: rng.randint(2, 5)])
+        return True
+
+    def add() -> bool:
+        article: Article = rng.choice(articles)
+        if not checkout_service.add_article(article, rng.choice((1, 1, 1, 2))):
+            return False
+        cart_item = checkout_service.get_cart_item_by_article(article.id)
+        if cart_item is not None and cart_item.id not in in_cart:
+            in_cart.append(cart_item.id)
+        return True
+
+    def remove() -> bool:
+        cart_item_id = in_cart.pop(rng.randrange(len(in_cart)))
+        return checkout_service.remove_article(cart_item_id)
+
+    def abort() -> bool:
+        checkout_service.reset()
+        in_cart.clear()
+        return True
+
+    def checkout() -> bool:
+        if checkout_service.checkout() is None:
+            return False
+        in_cart.clear()
+        return True
+
+    handlers: Dict[str, Callable[[], bool]] = {
+        "search": search,
+        "add": add,
+        "remove": remove,
+        "abort": abort,
+        "checkout": checkout,
+    }
+    weights = spec.mix.weights()
+
+    try:
+        start = time.perf_counter()
+        while time.perf_counter() - start < spec.duration:
+            operation = rng.choices(OPERATIONS, weights=weights)[0]
+            if operation in ("remove", "abort", "checkout") and not in_cart:
+                operation = "add"
+
+            began = time.perf_counter()
+            try:
+                ok = handlers[operation]()
+            except Exception:
+                ok = False
+            result.latencies.setdefault(operation, []).append(
+                (time.perf_counter() - began) * 1000
+            )
+            if not ok:
+                result.errors[operation] = result.errors.get(operation, 0) + 1
+
+            if spec.think_ms > 0:
+                time.sleep(rng.expovariate(1 / spec.think_ms) / 1000)
+        result.elapsed = time.perf_counter() - start
+    finally:
+        result.busy_errors = db.busy_errors
+        db.close()
+    return result
+
+
+def run_load(specs: List[LaneSpec], processes: bool = True) -> LoadReport:
+    """
+    runs all lanes at the same time, in separate processes or in threads of this one
+    """
+    pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with pool(max_workers=len(specs)) as executor:
+        results = list(executor.map(run_lane, specs))
+    # the session time of the slowest lane, without starting the processes
+    return report(results, max(result.elapsed for result in results))
+
+
+def report(results: List[LaneResult], elapsed: float) -> LoadReport:
+    operations: Dict[str, LoadStats] = {}
+    for operation in OPERATIONS:
+        samples = sorted(
+            latency
+            for result in results
+            for latency in result.latencies.get(operation, [])
+        )
+        if not samples:
+            continue
+        operations[operation] = LoadStats(
+            count=len(samples),
+            errors=sum(result.errors.get(operation, 0) for result in results),
+            p50_ms=percentile(samples, 0.50),
+            p95_ms=percentile(samples, 0.95),
+            p99_ms=percentile(samples, 0.99),
+            max_ms=samples[-1],
+        )
+    return LoadReport(
+        lanes=len(results),
+        elapsed=elapsed,
+        operations=operations,
+        busy_errors=sum(result.busy_errors for result in results),
+    )
+
+
+def format_report(load_report: LoadReport) -> str:
+    lines = [
+        f"{'operation':<10} {'count':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    ]
+    for operation, stats in load_report.operations.items():
+        lines.append(
+            f"{operation:<10} {stats.count:>8} {stats.errors:>7} {stats.p50_ms:>9.2f} "
+            f"{stats.p95_ms:>9.2f} {stats.p99_ms:>9.2f} {stats.max_ms:>9.2f}"
+        )
+    lines.append("")
+    lines.append(
+        f"{load_report.lanes} lanes, {load_report.elapsed:.1f}s, "
+        f"{load_report.ops_per_second:.1f} ops/s, "
+        f"{load_report.checkouts_per_second:.1f} checkouts/s, "
+        f"{load_report.busy_errors} busy errors"
+    )
+    return "\n".join(lines)
+
+
+def lane_specs(
+    lanes: int,
+    db_config: DBConfig,
+    duration: float,
+    mix: Optional[Mix] = None,
+    think_ms: float = 50,
+    seed: int = 42,
+) -> List[LaneSpec]:
+    return [
+        LaneSpec(
+            lane=lane,
+            db_config=db_config,
+            duration=duration,
+            mix=mix if mix is not None else Mix(),
+            think_ms=think_ms,
+            seed=seed,
+        )
+        for lane in range(lanes)
+    ]
@@ -0,0 +1,126 @@
+import json
+import platform
+import sqlite3
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# version of the results file, bump it when the layout changes
+RESULTS_FORMAT = 1
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """
+    fn is timed once per call, setup runs untimed before every call
+    """
+
+    name: str
+    fn: Callable[[], Any]
+    setup: Optional[Callable[[], Any]] = None
+    # calls per run, fast operations need many calls to be measurable
+    number: int = 1
+
+
+@dataclass(frozen=True)
+class Result:
+    """
+    timings of one benchmark in microseconds per call
+    """
+
+    name: str
+    runs: int
+    number: int
+    min_us: float
+    median_us: float
+    mean_us: float
+    p95_us: float
+    max_us: float
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1_000_000 / self.median_us if self.median_us > 0 else 0.0
+
+
+@dataclass
+class Results:
+    meta: Dict[str, Any] = field(default_factory=dict)
+    results: Dict[str, Result] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "format": RESULTS_FORMAT,
+                "meta": self.meta,
+                "results": {name: asdict(r) for name, r in self.results.items()},
+            },
+            indent=2,
+            sort_keys=True,
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "Results":
+        data = json.loads(text)
+        if data.get("format") != RESULTS_FORMAT:
+            raise ValueError(f"Unsupported results format {data.get('format')!r}")
+        return cls(
+            meta=data["meta"],
+            results={name: Result(**r) for name, r in data["results"].items()},
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_json())
+
+    @classmethod
+    def load(cls, path: str) -> "Results":
+        with open(path, encoding="utf-8") as file:
+            return cls.from_json(file.read())
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """
+    nearest rank percentile of sorted samples
+    """
+    index = max(0, min(len(samples) - 1, round(q * len(samples)) - 1))
+    return samples[index]
+
+
+def measure(benchmark: Benchmark, runs: int = 30, warmup: int = 3) -> Result:
+    samples: List[float] = []
+    for run in range(warmup + runs):
+        if benchmark.setup is not None:
+            benchmark.setup()
+        start = time.perf_counter_ns()
+        for _ in range(benchmark.number):
+            benchmark.fn()
+        elapsed = time.perf_counter_ns() - start
+        if run >= warmup:
+            samples.append(elapsed / 1000 / benchmark.number)
+
+    samples.sort()
+    return Result(
+        name=benchmark.name,
+        runs=runs,
+        number=benchmark.number,
+        min_us=samples[0],
+        median_us=statistics.median(samples),
+        mean_us=statistics.fmean(samples),
+        p95_us=percentile(samples, 0.95),
+        max_us=samples[-1],
+    )
+
+
+def environment() -> Dict[str, Any]:
+    """
+    where the numbers were taken, only runs from the same machine compare well
+    """
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
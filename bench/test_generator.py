@@ -0,0 +1,50 @@
+import unittest
+from dataclasses import replace
+
+from app.db.db import DB
+from bench.generator import DatasetSpec, generate
+
+SPEC = DatasetSpec(categories=5, articles=200, carts=300, days=30)
+
+# the rows a benchmark reads, created_at of articles and categories is the time of the run
+TABLES = {
+    "categories": "SELECT id, name FROM categories ORDER BY id",
+    "articles": "SELECT id, name, price, category_id, barcode FROM articles ORDER BY id",
+    "carts": "SELECT id, paid, paid_at, total, created_at FROM carts ORDER BY id",
+    "m2m_carts_articles": "SELECT article_id, cart_id, quantity, unit_price, article_name FROM m2m_carts_articles ORDER BY id",
+    "sales_by_article_daily": "SELECT * FROM sales_by_article_daily ORDER BY day, article_id",
+}
+
+
+def snapshot(spec: DatasetSpec):
+    db = DB(":memory:")
+    try:
+        dataset = generate(db, spec)
+        with db.read() as conn:
+            rows = {
+                table: [tuple(row) for row in conn.execute(query)]
+                for table, query in TABLES.items()
+            }
+    finally:
+        db.close()
+    return dataset, rows
+
+
+class TestGenerator(unittest.TestCase):
+    def test_same_seed_same_dataset(self):
+        first, first_rows = snapshot(SPEC)
+        second, second_rows = snapshot(SPEC)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first_rows, second_rows)
+        self.assertEqual(len(first_rows["carts"]), SPEC.carts)
+        self.assertEqual(len(first_rows["m2m_carts_articles"]), first.cart_items)
+
+    def test_other_seed_other_dataset(self):
+        _, first_rows = snapshot(SPEC)
+        _, other_rows = snapshot(replace(SPEC, seed=7))
+        self.assertNotEqual(first_rows["articles"], other_rows["articles"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,15 @@
+import os
+
+from app.db.db_config import DBConfig
 from app.ui.cashier_app import CashierApp
 
 
 def main():
-    cashier_app = CashierApp()
+    cashier_app = CashierApp(
+        DBConfig.from_env(),
+        os.environ.get("CASHIER_CART_JOURNAL"),
+        os.environ.get("CASHIER_INSTRUMENTATION"),
+    )
     cashier_app.run()
 
 
@@ -1 +1 @@
-python3 -m unittest discover -s app -p "*.py" -t app
+python3 -m unittest discover -s app -p "*.py" -t app && python3 -m unittest discover -s bench -p "test_*.py" -t .